@@ -40,6 +40,7 @@ setup(
     ],
     python_requires=">=3.9",
     install_requires=requirements,
+    extras_require={"zstd": ["zstandard>=0.20"]},
     entry_points={
         "console_scripts": [
             "pii-detect=pii_detect.cli:main",
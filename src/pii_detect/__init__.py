@@ -2,7 +2,28 @@
 PII Detection package using Microsoft Presidio
 """
 
-from .cli import main, print_results
-from .detector import PIIDetector
+import importlib
+from typing import Any
 
-__all__ = ["PIIDetector", "main", "print_results"]
+__all__ = ["AsyncPIIDetector", "PIIDetector", "main", "print_results"]
+
+# Exports are imported on first use, so importing the package, or running the
+# CLI for --help or a usage error, does not load the detector's dependencies
+_EXPORTS = {
+    "AsyncPIIDetector": ".async_detector",
+    "PIIDetector": ".detector",
+    "main": ".cli",
+    "print_results": ".cli",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,223 @@
+"""
+Compressed file and archive readers for PII detection
+Streams the contents of gzip, bzip2, xz and Zstandard files, and the members
+of zip and tar archives, without extracting anything to disk
+"""
+
+import io
+import posixpath
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, NamedTuple, Optional
+
+# Separates an archive's path from a member's name in reported file names,
+# as in ``logs.tar.gz!app/server.log``
+MEMBER_SEPARATOR = "!"
+
+# Suffixes of single compressed files, and of tar archives in one word
+COMPRESSION_SUFFIXES = [".gz", ".bz2", ".xz", ".zst"]
+_TAR_SUFFIXES = {".tgz": ".gz", ".tbz2": ".bz2", ".tbz": ".bz2", ".txz": ".xz"}
+
+# Last suffixes of the files this module can open, to add to a directory
+# walk's extension filter
+CONTAINER_SUFFIXES = [*COMPRESSION_SUFFIXES, ".zip", ".tar", *_TAR_SUFFIXES]
+
+ENCRYPTED_MEMBER_REASON = "encrypted archive member"
+
+
+class ArchiveError(ValueError):
+    """Raised when a compressed file or archive cannot be read"""
+
+
+class Member(NamedTuple):
+    """A file in an archive.
+
+    ``stream`` reads the member's stored content, and is only valid until the
+    next member is read. ``size`` is its length as recorded in the archive,
+    and ``skipped`` the reason it cannot be read, if any.
+    """
+
+    name: str
+    size: Optional[int]
+    stream: Optional[BinaryIO]
+    skipped: Optional[str] = None
+
+
+def _suffix(name: str) -> str:
+    return posixpath.splitext(name)[1].lower()
+
+
+def compression(name: str) -> Optional[str]:
+    """Return the compression suffix of a file name, such as ``.gz`` for
+    ``app.log.gz`` or ``logs.tgz``, if it has one"""
+    suffix = _suffix(name)
+    if suffix in COMPRESSION_SUFFIXES:
+        return suffix
+    return _TAR_SUFFIXES.get(suffix)
+
+
+def inner_suffix(name: str) -> str:
+    """Return the suffix of a file name once any compression suffix is
+    removed, e.g. ``.log`` for ``app.log.gz``"""
+    suffix = _suffix(name)
+    if suffix in _TAR_SUFFIXES:
+        return ".tar"
+    if suffix in COMPRESSION_SUFFIXES:
+        return _suffix(name[: -len(suffix)])
+    return suffix
+
+
+def archive_format(name: str) -> Optional[str]:
+    """Return ``"zip"`` or ``"tar"`` if a file name is that of an archive"""
+    if _suffix(name) == ".zip":
+        return "zip"
+    if inner_suffix(name) == ".tar":
+        return "tar"
+    return None
+
+
+def matches_extensions(name: str, extensions: Iterable[str]) -> bool:
+    """Return whether a file's suffix, with or without its compression
+    suffix, is one of ``extensions``"""
+    suffixes = {extension.lower() for extension in extensions}
+    return _suffix(name) in suffixes or inner_suffix(name) in suffixes
+
+
+def original_name(name: str, names: Dict[str, str]) -> str:
+    """Map a reported file name, or an archive member's ``archive!member``
+    name, through ``names``, from the paths that were scanned to the paths to
+    report"""
+    if name in names:
+        return names[name]
+    # The archive's own path may contain the separator too
+    index = name.find(MEMBER_SEPARATOR)
+    while index != -1:
+        if name[:index] in names:
+            return names[name[:index]] + name[index:]
+        index = name.find(MEMBER_SEPARATOR, index + 1)
+    return name
+
+
+def decompress(stream: BinaryIO, name: str) -> BinaryIO:
+    """Wrap a stream of the file ``name`` so it reads decompressed data,
+    chosen by the name's compression suffix"""
+    # Imported here, as most scans never open a compressed file
+    suffix = compression(name)
+    if suffix == ".gz":
+        import gzip
+
+        return gzip.GzipFile(fileobj=stream)
+    if suffix == ".bz2":
+        import bz2
+
+        return bz2.BZ2File(stream)
+    if suffix == ".xz":
+        import lzma
+
+        return lzma.LZMAFile(stream)
+    if suffix == ".zst":
+        return _zstd_reader(stream)
+    return stream
+
+
+def _zstd_reader(stream: BinaryIO) -> BinaryIO:
+    """Read Zstandard data with the standard library where it has a codec
+    (Python 3.14), or else the optional zstandard package"""
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+
+        return zstd.ZstdFile(stream)
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        raise ArchiveError(
+            "reading .zst files requires the zstandard package "
+            "(pip install 'pii-detect[zstd]')"
+        )
+    return zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+
+
+@contextmanager
+def open_compressed(file_path: Path) -> Iterator[BinaryIO]:
+    """Open a compressed file for reading its decompressed content"""
+    with open(file_path, "rb") as raw:
+        with decompress(raw, file_path.name) as stream:
+            yield stream
+
+
+def iter_members(file_path: Path) -> Iterator[Member]:
+    """Yield the regular files in a zip or tar archive, in the order they are
+    stored. Tar archives, compressed or not, are read in a single pass."""
+    if archive_format(file_path.name) == "zip":
+        yield from _iter_zip_members(file_path)
+    else:
+        yield from _iter_tar_members(file_path)
+
+
+def _member_name(name: str) -> str:
+    return posixpath.normpath(name).lstrip("/")
+
+
+def _iter_zip_members(file_path: Path) -> Iterator[Member]:
+    import zipfile
+
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                name = _member_name(info.filename)
+                if info.flag_bits & 0x1:
+                    yield Member(name, info.file_size, None, ENCRYPTED_MEMBER_REASON)
+                    continue
+                with archive.open(info) as stream:
+                    yield Member(name, info.file_size, stream)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"invalid zip archive: {e}")
+
+
+def _iter_tar_members(file_path: Path) -> Iterator[Member]:
+    import tarfile
+
+    with open(file_path, "rb") as raw:
+        with decompress(raw, file_path.name) as stream:
+            try:
+                # Streaming mode never seeks, so compressed archives are only
+                # decompressed once
+                with tarfile.open(fileobj=stream, mode="r|") as archive:
+                    for info in archive:
+                        if not info.isfile():
+                            continue
+                        member = archive.extractfile(info)
+                        yield Member(_member_name(info.name), info.size, member)
+            except tarfile.TarError as e:
+                raise ArchiveError(f"invalid tar archive: {e}")
+
+
+class _PrefixedStream(io.RawIOBase):
+    """Reads ``prefix``, then the rest of ``stream``"""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = memoryview(prefix)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def prefixed(prefix: bytes, stream: BinaryIO) -> BinaryIO:
+    """Return a stream that puts back ``prefix``, already read from the
+    start of ``stream``"""
+    return io.BufferedReader(_PrefixedStream(prefix, stream))
@@ -0,0 +1,244 @@
+"""
+Asyncio interface for PII detection
+Runs a PIIDetector off the event loop, coalescing concurrent requests into
+micro-batches, with a bounded queue for backpressure and per-call timeouts
+"""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .detector import DEFAULT_BATCH_SIZE, PIIDetector
+
+# How long the first request of a batch waits for others to join it
+DEFAULT_MAX_BATCH_DELAY = 0.005
+DEFAULT_MAX_PENDING = 1000
+
+Results = List[List[Dict[str, Any]]]
+_Request = Tuple[str, "asyncio.Future[List[Dict[str, Any]]]"]
+
+# The detector of a worker process in a process pool
+_worker_detector: Optional[PIIDetector] = None
+
+
+def _init_worker(options: Dict[str, Any]):
+    global _worker_detector
+    _worker_detector = PIIDetector(**options)
+
+
+def _analyze_in_worker(texts: List[str]) -> Results:
+    if _worker_detector is None:
+        raise RuntimeError("worker process has no detector")
+    return _analyze_batch(_worker_detector, texts)
+
+
+def _analyze_batch(detector: PIIDetector, texts: List[str]) -> Results:
+    return detector.analyze_texts(texts, batch_size=len(texts))
+
+
+class AsyncPIIDetector:
+    """Analyze text from asyncio code without blocking the event loop.
+
+    Requests made while others are waiting are coalesced into batches of up to
+    ``max_batch_size`` texts; the first request of a batch waits at most
+    ``max_batch_delay`` seconds for company. At most ``max_pending`` requests
+    are queued, after which callers wait for room, so a burst of traffic
+    cannot grow memory without bound.
+
+    With ``workers`` of 1, batches run one at a time on a dedicated thread,
+    since the Presidio analyzer is not safe to share between threads. With
+    more, they run in a pool of processes that each build their own detector
+    from ``detector_options`` (or the options of ``detector``). If a worker
+    process dies, the batches it broke fail and the pool is replaced.
+
+    Use as an async context manager, or call ``close`` when done::
+
+        async with AsyncPIIDetector(mode="fast") as detector:
+            entities = await detector.analyze_text(text, timeout=1.0)
+    """
+
+    def __init__(
+        self,
+        detector: Optional[PIIDetector] = None,
+        workers: int = 1,
+        max_batch_size: int = DEFAULT_BATCH_SIZE,
+        max_batch_delay: float = DEFAULT_MAX_BATCH_DELAY,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        **detector_options: Any,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_batch_delay < 0:
+            raise ValueError("max_batch_delay must not be negative")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        if detector is not None and detector_options:
+            raise ValueError("pass either a detector or detector options, not both")
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_pending = max_pending
+        self.detector = detector
+        self._options = detector._options if detector is not None else detector_options
+
+        self._executor: Optional[Executor] = None
+        self._analyze: Callable[[List[str]], Results] = _analyze_in_worker
+        self._queue: Optional["asyncio.Queue[_Request]"] = None
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+        self._batches: Set["asyncio.Task[None]"] = set()
+        self._starting: Optional["asyncio.Future[None]"] = None
+
+    async def __aenter__(self) -> "AsyncPIIDetector":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Load the detectors and start taking requests. Called by the first
+        request if not called before."""
+        if self._starting is not None:
+            return await asyncio.shield(self._starting)
+        loop = asyncio.get_running_loop()
+        self._starting = loop.create_future()
+        try:
+            if self.workers > 1:
+                self._executor = self._new_process_pool()
+                # Load every worker's model now rather than on first use
+                await asyncio.gather(
+                    *(
+                        loop.run_in_executor(self._executor, _analyze_in_worker, [""])
+                        for _ in range(self.workers)
+                    )
+                )
+            else:
+                self._executor = ThreadPoolExecutor(1, thread_name_prefix="pii-detect")
+                if self.detector is None:
+                    # Loading the spaCy model takes seconds, so not on the loop
+                    self.detector = await loop.run_in_executor(
+                        self._executor, partial(PIIDetector, **self._options)
+                    )
+                self._analyze = partial(_analyze_batch, self.detector)
+            self._queue = asyncio.Queue(self.max_pending)
+            self._dispatcher = loop.create_task(
+                self._dispatch(self._queue, asyncio.Semaphore(self.workers))
+            )
+        except BaseException as e:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._starting.set_exception(e)
+            # Retrieve it so an unawaited failure is not logged
+            self._starting.exception()
+            self._starting = None
+            raise
+        self._starting.set_result(None)
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self._options,)
+        )
+
+    async def close(self):
+        """Stop taking requests, let batches already running finish and shut
+        down the executor. Queued requests are cancelled."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+            self._queue = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._executor is not None:
+            executor = self._executor
+            self._executor = None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+        self._starting = None
+
+    async def analyze_text(
+        self, text: str, timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze text for PII entities.
+
+        Raises ``asyncio.TimeoutError`` if the result is not ready within
+        ``timeout`` seconds, including time spent waiting for queue room.
+        Cancelling the call, or timing out, withdraws the text if its batch
+        has not started; a batch already running is left to finish.
+        """
+        return await asyncio.wait_for(self._submit(text), timeout)
+
+    async def analyze_texts(
+        self, texts: List[str], timeout: Optional[float] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Analyze many texts for PII entities, returning results in the same
+        order"""
+        return await asyncio.wait_for(
+            asyncio.gather(*(self._submit(text) for text in texts)), timeout
+        )
+
+    async def _submit(self, text: str) -> List[Dict[str, Any]]:
+        await self.start()
+        if self._queue is None:
+            raise RuntimeError("AsyncPIIDetector was closed while starting")
+        future: "asyncio.Future[List[Dict[str, Any]]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        await self._queue.put((text, future))
+        return await future
+
+    async def _dispatch(
+        self, queue: "asyncio.Queue[_Request]", slots: asyncio.Semaphore
+    ):
+        """Gather queued requests into batches and hand them to the executor,
+        with at most one batch per worker running at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free worker first, so requests made meanwhile join
+            # the next batch
+            await slots.acquire()
+            batch = [await queue.get()]
+            if self.max_batch_delay and queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.max_batch_delay)
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            # Requests cancelled or timed out while queued are dropped
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                slots.release()
+                continue
+            task = loop.create_task(self._run_batch(batch, slots))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[_Request], slots: asyncio.Semaphore):
+        texts = [text for text, _ in batch]
+        executor = self._executor
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                executor, self._analyze, texts
+            )
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and self._executor is executor:
+                # A worker died and took the pool with it, so later batches
+                # run in a new one
+                executor.shutdown(wait=False)
+                self._executor = self._new_process_pool()
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            slots.release()
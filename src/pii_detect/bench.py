@@ -0,0 +1,381 @@
+"""
+Benchmarking for PII detection
+Generates reproducible synthetic corpora with known, seeded PII and measures
+how fast and how accurately a PIIDetector scans them
+"""
+
+import json
+import math
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+from .detector import PIIDetector, package_version
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "David"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller"]
+
+# Lower case words only, so filler never looks like PII to the detector or
+# the prefilter
+_FILLER_WORDS = (
+    "the a of and to in is was for on with as by at from this that it be are "
+    "request served cache queue worker retry payload value updated config "
+    "report invoice order shipped pending done build step check result"
+).split()
+
+# Sentences that carry PII, with a placeholder for each seeded entity
+_PII_SENTENCES = [
+    "please contact {EMAIL_ADDRESS} about the invoice",
+    "call {PERSON} on {PHONE_NUMBER} about the order",
+    "the card {CREDIT_CARD} was declined twice",
+    "login for {EMAIL_ADDRESS} came from {IP_ADDRESS}",
+    "{PERSON} asked for the report to be sent again",
+]
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+SEEDED_ENTITIES = [
+    "CREDIT_CARD",
+    "EMAIL_ADDRESS",
+    "IP_ADDRESS",
+    "PERSON",
+    "PHONE_NUMBER",
+]
+
+
+class CorpusSpec(NamedTuple):
+    """Size and mix of a synthetic corpus"""
+
+    small_files: int = 200
+    log_files: int = 2
+    log_lines: int = 5000
+    csv_files: int = 4
+    csv_rows: int = 1000
+    json_files: int = 4
+    json_records: int = 500
+    pii_rate: float = 0.2
+    seed: int = 0
+
+
+class SeededEntity(NamedTuple):
+    """A piece of PII written into a corpus file, by character offsets"""
+
+    entity_type: str
+    start: int
+    end: int
+
+
+class _Document:
+    """Text built up piece by piece, remembering where PII was written"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.length = 0
+        self.entities: List[SeededEntity] = []
+
+    def text(self, text: str):
+        self.parts.append(text)
+        self.length += len(text)
+
+    def pii(self, entity_type: str, value: str):
+        self.entities.append(
+            SeededEntity(entity_type, self.length, self.length + len(value))
+        )
+        self.text(value)
+
+    def write(self, file_path: Path) -> List[SeededEntity]:
+        file_path.write_text("".join(self.parts), encoding="utf-8")
+        return self.entities
+
+
+def _luhn_complete(digits: str) -> str:
+    """Append the check digit that makes ``digits`` pass the Luhn check"""
+    total = 0
+    for i, digit in enumerate(reversed(digits)):
+        value = int(digit) * (2 if i % 2 == 0 else 1)
+        total += value - 9 if value > 9 else value
+    return digits + str(-total % 10)
+
+
+def fake_value(rng: random.Random, entity_type: str) -> str:
+    """Return a plausible, synthetic value of ``entity_type``"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    if entity_type == "PERSON":
+        return f"{first} {last}"
+    if entity_type == "EMAIL_ADDRESS":
+        return f"{first.lower()}.{last.lower()}{rng.randint(1, 99)}@example.com"
+    if entity_type == "PHONE_NUMBER":
+        return f"({rng.randint(201, 989)}) 555-{rng.randint(100, 9999):04d}"
+    if entity_type == "CREDIT_CARD":
+        number = _luhn_complete(
+            "4" + "".join(str(rng.randint(0, 9)) for _ in range(14))
+        )
+        return " ".join(number[i : i + 4] for i in range(0, 16, 4))
+    if entity_type == "IP_ADDRESS":
+        return ".".join(str(rng.randint(1, 254)) for _ in range(4))
+    raise ValueError(f"No fake values for {entity_type}")
+
+
+def _filler(rng: random.Random) -> str:
+    return " ".join(rng.choice(_FILLER_WORDS) for _ in range(rng.randint(6, 12)))
+
+
+def _sentence(rng: random.Random, document: _Document, pii_rate: float):
+    """Write a line of filler, or with probability ``pii_rate`` one with PII"""
+    if rng.random() >= pii_rate:
+        document.text(_filler(rng))
+        return
+    template = rng.choice(_PII_SENTENCES)
+    position = 0
+    for match in _PLACEHOLDER.finditer(template):
+        document.text(template[position : match.start()])
+        document.pii(match.group(1), fake_value(rng, match.group(1)))
+        position = match.end()
+    document.text(template[position:])
+
+
+def _small_file(rng: random.Random, spec: CorpusSpec) -> _Document:
+    document = _Document()
+    for _ in range(rng.randint(3, 12)):
+        _sentence(rng, document, spec.pii_rate)
+        document.text(".\n")
+    return document
+
+
+def _log_file(rng: random.Random, spec: CorpusSpec) -> _Document:
+    document = _Document()
+    for line in range(spec.log_lines):
+        level = rng.choice(["info", "info", "info", "warn", "error"])
+        document.text(f"[{line:08d}] {level} ")
+        _sentence(rng, document, spec.pii_rate)
+        document.text("\n")
+    return document
+
+
+def _csv_file(rng: random.Random, spec: CorpusSpec) -> _Document:
+    document = _Document()
+    document.text("id,name,email,phone,note\n")
+    for row in range(spec.csv_rows):
+        document.text(f"{row},")
+        # Only some rows are filled in, at the corpus PII rate
+        if rng.random() < spec.pii_rate:
+            document.pii("PERSON", fake_value(rng, "PERSON"))
+            document.text(",")
+            document.pii("EMAIL_ADDRESS", fake_value(rng, "EMAIL_ADDRESS"))
+            document.text(",")
+            document.pii("PHONE_NUMBER", fake_value(rng, "PHONE_NUMBER"))
+        else:
+            document.text(",,")
+        document.text(f",{_filler(rng)}\n")
+    return document
+
+
+def _json_file(rng: random.Random, spec: CorpusSpec) -> _Document:
+    document = _Document()
+    document.text("[\n")
+    for record in range(spec.json_records):
+        separator = ",\n" if record < spec.json_records - 1 else "\n"
+        document.text(f'  {{"id": {record}, "note": "')
+        _sentence(rng, document, spec.pii_rate)
+        document.text('", "client": "')
+        if rng.random() < spec.pii_rate:
+            document.pii("IP_ADDRESS", fake_value(rng, "IP_ADDRESS"))
+        document.text(f'"}}{separator}')
+    document.text("]\n")
+    return document
+
+
+def generate_corpus(
+    directory: Path, spec: CorpusSpec = CorpusSpec()
+) -> Dict[Path, List[SeededEntity]]:
+    """Write a synthetic corpus into ``directory`` and return the PII seeded
+    into each file. The same ``spec`` always gives the same files."""
+    # Seeded for a reproducible corpus, not for anything security related
+    rng = random.Random(spec.seed)  # nosec B311
+    directory.mkdir(parents=True, exist_ok=True)
+    kinds = [
+        ("small", ".txt", spec.small_files, _small_file),
+        ("app", ".log", spec.log_files, _log_file),
+        ("table", ".csv", spec.csv_files, _csv_file),
+        ("records", ".json", spec.json_files, _json_file),
+    ]
+    truth = {}
+    for name, suffix, count, build in kinds:
+        for i in range(count):
+            file_path = directory / f"{name}_{i:04d}{suffix}"
+            truth[file_path] = build(rng, spec).write(file_path)
+    return truth
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of ``values``"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak resident set size in bytes of this process and its workers"""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return scale * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+def score(
+    truth: Dict[Path, List[SeededEntity]],
+    results: Iterable[Dict[str, Any]],
+    entity_types: Iterable[str],
+) -> Dict[str, Any]:
+    """Compare detected entities with the seeded ones.
+
+    Only ``entity_types`` that were seeded are scored. A detection is a true
+    positive if it overlaps an unmatched seeded entity of the same type.
+    Detections of types that were never seeded are counted as ``unscored``.
+    """
+    scored = set(entity_types) & set(SEEDED_ENTITIES)
+    counts = {name: {"tp": 0, "fp": 0, "fn": 0} for name in sorted(scored)}
+    unscored = 0
+    for result in results:
+        expected = [
+            e for e in truth.get(Path(result["file"]), []) if e.entity_type in scored
+        ]
+        matched = set()
+        for entity in result["entities"]:
+            if entity["entity_type"] not in scored:
+                unscored += 1
+                continue
+            hit = next(
+                (
+                    i
+                    for i, seeded in enumerate(expected)
+                    if i not in matched
+                    and seeded.entity_type == entity["entity_type"]
+                    and seeded.start < entity["end"]
+                    and entity["start"] < seeded.end
+                ),
+                None,
+            )
+            if hit is None:
+                counts[entity["entity_type"]]["fp"] += 1
+            else:
+                matched.add(hit)
+                counts[entity["entity_type"]]["tp"] += 1
+        for i, seeded in enumerate(expected):
+            if i not in matched:
+                counts[seeded.entity_type]["fn"] += 1
+
+    tp, fp, fn = (sum(c[key] for c in counts.values()) for key in ("tp", "fp", "fn"))
+    return {
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "recall": tp / (tp + fn) if tp + fn else 1.0,
+        "true_positives": tp,
+        "false_positives": fp,
+        "false_negatives": fn,
+        "unscored": unscored,
+        "by_type": counts,
+    }
+
+
+def run_benchmark(
+    detector: PIIDetector,
+    truth: Dict[Path, List[SeededEntity]],
+    workers: int = 1,
+) -> Dict[str, Any]:
+    """Scan the files in ``truth`` and report throughput, latency, memory and
+    accuracy.
+
+    Throughput is measured over one ``analyze_files`` pass, with batching and
+    ``workers``. Per-file latency is measured by a second pass that analyzes
+    each file alone in this process.
+    """
+    file_paths = sorted(truth)
+    total_bytes = sum(file_path.stat().st_size for file_path in file_paths)
+    kwargs = {"workers": workers} if workers > 1 else {}
+
+    started = time.perf_counter()
+    results = list(detector.analyze_files(file_paths, **kwargs))
+    elapsed = time.perf_counter() - started
+
+    latencies = []
+    for file_path in file_paths:
+        file_started = time.perf_counter()
+        detector.analyze_file(file_path)
+        latencies.append(time.perf_counter() - file_started)
+
+    errors = [result for result in results if result.get("error")]
+    peak_rss = _peak_rss()
+    return {
+        "pii_detect": package_version("pii-detect"),
+        **detector.metadata,
+        "workers": workers,
+        "files": len(file_paths),
+        "bytes": total_bytes,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "files_per_second": len(file_paths) / elapsed if elapsed else 0.0,
+        "mb_per_second": total_bytes / 1024 / 1024 / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": 1000 * _percentile(latencies, 50),
+            "p99": 1000 * _percentile(latencies, 99),
+            "max": 1000 * max(latencies, default=0.0),
+        },
+        "peak_rss_mb": None if peak_rss is None else peak_rss / 1024 / 1024,
+        "accuracy": score(truth, results, detector.entities),
+    }
+
+
+def print_report(report: Dict[str, Any], output_format: str = "text"):
+    """Print a benchmark report as text or JSON"""
+    if output_format == "json":
+        print(json.dumps(report, indent=2))
+        return
+
+    accuracy = report["accuracy"]
+    latency = report["latency_ms"]
+    rows: List[Tuple[str, str]] = [
+        ("Version", report["pii_detect"]),
+        ("Mode", f"{report['mode']} ({report['model'] or 'no model'})"),
+        ("Workers", str(report["workers"])),
+        ("Files", f"{report['files']} ({report['bytes'] / 1024 / 1024:.1f} MB)"),
+        ("Errors", str(report["errors"])),
+        ("Time", f"{report['seconds']:.2f} s"),
+        (
+            "Throughput",
+            f"{report['files_per_second']:.1f} files/s, "
+            f"{report['mb_per_second']:.2f} MB/s",
+        ),
+        ("Latency", f"p50 {latency['p50']:.1f} ms, p99 {latency['p99']:.1f} ms"),
+        (
+            "Peak RSS",
+            (
+                "unknown"
+                if report["peak_rss_mb"] is None
+                else f"{report['peak_rss_mb']:.0f} MB"
+            ),
+        ),
+        ("Precision", f"{accuracy['precision']:.3f}"),
+        ("Recall", f"{accuracy['recall']:.3f}"),
+    ]
+    print("=== PII Detection Benchmark ===")
+    for label, value in rows:
+        print(f"{label + ':':<12}{value}")
+    for name, counts in accuracy["by_type"].items():
+        print(
+            f"  {name:<14}tp {counts['tp']:>6}  fp {counts['fp']:>6}  "
+            f"fn {counts['fn']:>6}"
+        )
+    if accuracy["unscored"]:
+        print(f"  {accuracy['unscored']} detections of types that were not seeded")
@@ -0,0 +1,150 @@
+"""
+Persistent result cache for PII detection
+Stores entities found per file, keyed by a hash of the file content and the
+detector configuration, so unchanged files are never re-analyzed
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+DEFAULT_CACHE_MAX_SIZE = 256 * 1024 * 1024
+CACHE_FILE_NAME = "results.sqlite3"
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "pii-detect"
+
+
+def hash_file(file_path: Path, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, reading it in blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_bytes(content: bytes) -> str:
+    """Return the SHA-256 hex digest of ``content``"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def fingerprint(config: Dict[str, Any]) -> str:
+    """Return a stable digest of a detector configuration"""
+    encoded = json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed cache of per-file entity results.
+
+    Entries are evicted least-recently-used first once the stored results
+    exceed ``max_size`` bytes. Several processes may share one cache
+    directory. The directory and database are created readable by their
+    owner only.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self._conn: Optional[sqlite3.Connection] = None
+        self._size = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The database connection, opened on first use so that building a
+        detector has no filesystem side effects"""
+        if self._conn is None:
+            # Results include the text of the PII found, so only the current
+            # user may read them
+            self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            db_path = self.cache_dir / CACHE_FILE_NAME
+            os.close(os.open(db_path, os.O_RDWR | os.O_CREAT, 0o600))
+            os.chmod(db_path, 0o600)
+            conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " entities TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)"
+            )
+            conn.commit()
+            self._conn = conn
+            self._size = self._stored_size()
+        return self._conn
+
+    def _stored_size(self) -> int:
+        row = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        return int(row[0])
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached entities for ``key``, or None on a miss"""
+        row = self.conn.execute(
+            "SELECT entities FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, entities: List[Dict[str, Any]]):
+        """Store the entities found for ``key``"""
+        encoded = json.dumps(entities)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (key, entities, size, accessed)"
+                " VALUES (?, ?, ?, ?)",
+                (key, encoded, len(encoded), time.time()),
+            )
+        self._size += len(encoded)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its budget"""
+        # Other processes may have written too, so start from the real size
+        self._size = self._stored_size()
+        excess = self._size - self.max_size
+        if excess <= 0:
+            return
+        stale = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM results ORDER BY accessed"
+        ):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        with self.conn:
+            self.conn.executemany("DELETE FROM results WHERE key = ?", stale)
+        self._size = self._stored_size()
+
+    def __len__(self) -> int:
+        return int(self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0])
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
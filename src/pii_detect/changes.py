@@ -0,0 +1,176 @@
+"""
+Git-aware selection of files and lines to scan
+Asks git which files (and optionally which lines) a commit range or the index
+changed, so CI checks only analyze what is new
+"""
+
+import os
+import re
+import subprocess  # nosec B404
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+LineRanges = List[Tuple[int, int]]
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(Exception):
+    """Raised when git cannot report changes"""
+
+
+def _git(args: List[str], cwd: Path, stdin: Optional[str] = None) -> str:
+    try:
+        completed = subprocess.run(  # nosec B603 B607
+            ["git", "-c", "core.quotePath=false", *args],
+            cwd=cwd,
+            input=stdin,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except FileNotFoundError:
+        raise GitError("git is not installed or not on PATH")
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.strip() or f"git {' '.join(args)} failed")
+    return completed.stdout
+
+
+def _diff_args(since: Optional[str], staged: bool) -> List[str]:
+    # Pin the output format so user diff settings cannot change it
+    diff = ["diff", "--no-color", "--no-ext-diff", "--src-prefix=a/", "--dst-prefix=b/"]
+    if staged:
+        return [*diff, "--cached"]
+    if since:
+        return [*diff, since]
+    raise ValueError("either since or staged must be given")
+
+
+def _repo_root(path: Path) -> Path:
+    start = path if path.is_dir() else path.parent
+    return Path(_git(["rev-parse", "--show-toplevel"], start).strip())
+
+
+def _display_path(file_path: Path) -> Path:
+    """Show paths relative to the working directory when they are inside it"""
+    try:
+        return Path(os.path.relpath(file_path))
+    except ValueError:
+        return file_path
+
+
+def _within(file_path: Path, scope: Path) -> bool:
+    return file_path == scope or scope in file_path.parents
+
+
+def changed_files(
+    path: Path, since: Optional[str] = None, staged: bool = False
+) -> List[Path]:
+    """Return existing files under ``path`` changed since ``since`` (a git
+    ref, compared with the working tree) or staged in the index"""
+    root = _repo_root(path)
+    scope = path.resolve()
+    output = _git(
+        [*_diff_args(since, staged), "--name-only", "--diff-filter=ACMR", "-z", "--"],
+        root,
+    )
+    files = []
+    for name in output.split("\0"):
+        if not name:
+            continue
+        file_path = root / name
+        if _within(file_path.resolve(), scope) and file_path.is_file():
+            files.append(_display_path(file_path))
+    return files
+
+
+def export_staged(path: Path, directory: Path) -> List[Tuple[Path, Path]]:
+    """Write the content staged in the index for each file under ``path``
+    staged for commit into ``directory``, which may differ from the working
+    tree. Returns the path of each copy with the file's path as
+    ``changed_files`` reports it."""
+    root = _repo_root(path)
+    scope = path.resolve()
+    output = _git(
+        [*_diff_args(None, True), "--name-only", "--diff-filter=ACMR", "-z", "--"],
+        root,
+    )
+    names = [
+        name
+        for name in output.split("\0")
+        if name and _within((root / name).resolve(), scope)
+    ]
+    if not names:
+        return []
+    # Paths are read from stdin, so no number of files outgrows the command line
+    _git(
+        ["checkout-index", f"--prefix={directory}{os.sep}", "-z", "--stdin"],
+        root,
+        stdin="\0".join(names),
+    )
+    # Submodules and other entries that are not regular files are left out
+    return [
+        (directory / name, _display_path(root / name))
+        for name in names
+        if (directory / name).is_file()
+    ]
+
+
+def changed_lines(
+    path: Path, since: Optional[str] = None, staged: bool = False
+) -> Dict[Path, LineRanges]:
+    """Return the added or modified line ranges (1-based, inclusive) of each
+    changed file under ``path``"""
+    root = _repo_root(path)
+    scope = path.resolve()
+    output = _git(
+        [*_diff_args(since, staged), "--unified=0", "--diff-filter=ACMR", "--"], root
+    )
+
+    ranges: Dict[Path, LineRanges] = {}
+    current: Optional[LineRanges] = None
+    # "+++ " names the new file only in a file's header. In a hunk, it is an
+    # added line starting with "++ ".
+    in_header = False
+    for line in output.splitlines():
+        if line.startswith("diff --git "):
+            in_header = True
+            current = None
+            continue
+        if in_header:
+            if line.startswith("+++ "):
+                name = line[4:]
+                if name.startswith("b/"):
+                    file_path = root / name[2:]
+                    if _within(file_path.resolve(), scope):
+                        current = ranges.setdefault(_display_path(file_path), [])
+                continue
+            if not line.startswith("@@"):
+                continue
+            in_header = False
+        match = _HUNK_HEADER.match(line)
+        if match and current is not None:
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            if count > 0:
+                current.append((start, start + count - 1))
+    return ranges
+
+
+def restrict_to_lines(result: Dict[str, Any], line_ranges: LineRanges):
+    """Drop entities of a file result that start outside ``line_ranges``"""
+    if result.get("error") or not result["entities"]:
+        return result
+
+    entities = [
+        entity
+        for entity in result["entities"]
+        if any(first <= entity["line"] <= last for first, last in line_ranges)
+    ]
+
+    return {
+        **result,
+        "pii_found": len(entities) > 0,
+        "pii_count": len(entities),
+        "entities": entities,
+    }
@@ -5,29 +5,95 @@ Detects personally identifiable information in text files or directories
 """
 
 import argparse
+import io
 import json
 import sys
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from .detector import PIIDetector
+from . import bench, changes, daemon, output, tail, walk
+from .archive import archive_format, matches_extensions, original_name
+from .cache import DEFAULT_CACHE_MAX_SIZE, default_cache_dir
+from .detector import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_DISABLED_COMPONENTS,
+    DEFAULT_EXCLUDED_ENTITIES,
+    DEFAULT_EXTENSIONS,
+    DEFAULT_MAX_FILE_SIZE,
+    DEFAULT_MODE,
+    DEFAULT_MODEL,
+    MODELS,
+    MODES,
+    OVERSIZE_POLICIES,
+    PIIDetector,
+    package_version,
+)
+from .overlaps import DEFAULT_OVERLAP_POLICY, OVERLAP_POLICIES
+from .reader import DEFAULT_CHUNK_OVERLAP, DEFAULT_CHUNK_SIZE
+from .stats import ScanStats
 
+MEGABYTE = 1024 * 1024
 
-def print_results(results: List[Dict[str, Any]], output_format: str = "text"):
-    """Print results in specified format"""
+# Formats written file by file as results arrive, rather than all at the end
+STREAMING_FORMATS = ["ndjson", "sarif"]
+
+# Options of the bench command that set the size of its corpus
+CORPUS_SIZE_OPTIONS = [
+    ("small_files", "Small text files"),
+    ("log_files", "Large log files"),
+    ("log_lines", "Lines per log file"),
+    ("csv_files", "CSV files"),
+    ("csv_rows", "Rows per CSV file"),
+    ("json_files", "JSON files"),
+    ("json_records", "Records per JSON file"),
+]
+
+
+def print_results(
+    results: Iterable[Dict[str, Any]],
+    output_format: str = "text",
+    metadata: Optional[Dict[str, Any]] = None,
+    stats: Optional[ScanStats] = None,
+):
+    """Print results in specified format. ``metadata`` describes the detector
+    that produced them, see ``PIIDetector.metadata``. ``stats`` collected
+    while producing the results are printed after them."""
+    if output_format == "ndjson":
+        output.write_ndjson(results, sys.stdout, stats)
+        return
+
+    if output_format == "sarif":
+        output.write_sarif(results, sys.stdout, package_version(), metadata, stats)
+        return
+
+    results = list(results)
     if output_format == "json":
-        print(json.dumps(results, indent=2))
+        if stats is not None:
+            print(json.dumps({"results": results, "stats": stats.to_dict()}, indent=2))
+        else:
+            print(json.dumps(results, indent=2))
         return
 
     # Text format
-    total_files = len(results)
+    skipped_files = sum(1 for r in results if r.get("skipped"))
+    total_files = len(results) - skipped_files
     files_with_pii = sum(1 for r in results if r.get("pii_found", False))
     total_pii_entities = sum(r.get("pii_count", 0) for r in results)
 
     print("\n=== PII Detection Results ===")
     print(f"Files analyzed: {total_files}")
+    if skipped_files:
+        print(f"Files skipped: {skipped_files}")
     print(f"Files with PII: {files_with_pii}")
     print(f"Total PII entities found: {total_pii_entities}")
+    if metadata and metadata.get("mode") == "fast":
+        print(
+            "Mode: fast (not detected: "
+            f"{', '.join(metadata.get('disabled_entities', []))})"
+        )
+    elif metadata and metadata.get("model"):
+        print(f"Model: {metadata['model']}")
     print("=" * 30)
 
     for result in results:
@@ -35,18 +101,693 @@ def print_results(results: List[Dict[str, Any]], output_format: str = "text"):
             print(f"\n❌ ERROR in {result['file']}: {result['error']}")
             continue
 
+        if result.get("skipped"):
+            print(f"\n⏭️  {result['file']} - Skipped: {result['skipped']}")
+            continue
+
         if result.get("pii_found", False):
             print(f"\n🔍 {result['file']} - {result['pii_count']} PII entities found: ")
             for entity in result["entities"]:
                 print(
                     f"  • {entity['entity_type']}: '{entity['text']}' "
-                    f"(confidence: {entity['score']: .2f})"
+                    f"(confidence: {entity['score']: .2f}) "
+                    f"at line {entity['line']}, column {entity['column']}"
+                    f"{_field_note(entity)}"
                 )
+                if entity.get("context"):
+                    print(f"    {entity['context']!r}")
         else:
             print(f"\n✅ {result['file']} - No PII detected")
 
+    if stats is not None:
+        print("\n=== Scan Stats ===")
+        for line in stats.summary():
+            print(line)
+
+
+def _field_note(entity: Dict[str, Any]) -> str:
+    """Name the CSV column or JSON path of an entity from structured data"""
+    field = entity.get("path") or entity.get("field")
+    return f" in field {field}" if field else ""
+
+
+def _add_detector_arguments(parser: argparse.ArgumentParser):
+    """Add the options that configure the PIIDetector itself"""
+    parser.add_argument(
+        "--config",
+        metavar="FILE",
+        help="JSON file of option defaults, keyed by long option name, e.g. "
+        '{"mode": "full", "model": "en_core_web_sm"}; options given on the '
+        "command line take precedence",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Characters of a file analyzed at a time "
+        f"(default: {DEFAULT_CHUNK_SIZE})",
+    )
+
+    parser.add_argument(
+        "--chunk-overlap",
+        type=int,
+        default=DEFAULT_CHUNK_OVERLAP,
+        help="Characters shared between consecutive chunks so entities on a "
+        f"chunk boundary are not lost (default: {DEFAULT_CHUNK_OVERLAP})",
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Small files or chunks passed through the NLP pipeline together "
+        f"(default: {DEFAULT_BATCH_SIZE})",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for the result cache of unchanged files "
+        f"(default: {default_cache_dir()})",
+    )
+
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=DEFAULT_CACHE_MAX_SIZE // MEGABYTE,
+        help="Maximum size of the result cache in MB, least recently used "
+        f"results are evicted first (default: {DEFAULT_CACHE_MAX_SIZE // MEGABYTE})",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Analyze every file without reading or writing the result cache",
+    )
+
+    parser.add_argument(
+        "--entities",
+        action="append",
+        metavar="TYPES",
+        help="Comma-separated entity types to detect, e.g. EMAIL_ADDRESS,PERSON "
+        "(can be used multiple times, default: all supported types)",
+    )
+
+    parser.add_argument(
+        "--exclude-entities",
+        action="append",
+        metavar="TYPES",
+        help="Comma-separated entity types not to detect (can be used multiple "
+        f"times, default: {','.join(DEFAULT_EXCLUDED_ENTITIES)})",
+    )
+
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default=DEFAULT_MODE,
+        help="'fast' skips the spaCy NER model and only runs pattern-based "
+        "recognizers, so names and locations are not detected "
+        f"(default: {DEFAULT_MODE})",
+    )
+
+    parser.add_argument(
+        "--model",
+        metavar="NAME",
+        help="spaCy pipeline used in full mode: "
+        f"{', '.join(MODELS)} (smallest and fastest first), or the name or path "
+        f"of another installed pipeline (default: {DEFAULT_MODEL})",
+    )
+
+    parser.add_argument(
+        "--disable-components",
+        metavar="NAMES",
+        default=",".join(DEFAULT_DISABLED_COMPONENTS),
+        help="Comma-separated spaCy pipeline components not to load; adding "
+        "tagger,attribute_ruler,lemmatizer is faster but weakens context "
+        f"scoring (default: {','.join(DEFAULT_DISABLED_COMPONENTS)})",
+    )
+
+    parser.add_argument(
+        "--max-file-size",
+        type=int,
+        default=DEFAULT_MAX_FILE_SIZE // MEGABYTE,
+        help="Size in MB above which files get the --oversize treatment, 0 for "
+        f"no limit (default: {DEFAULT_MAX_FILE_SIZE // MEGABYTE})",
+    )
+
+    parser.add_argument(
+        "--oversize",
+        choices=OVERSIZE_POLICIES,
+        default="skip",
+        help="Skip files over --max-file-size, or stream them through the "
+        "analyzer in chunks anyway (default: skip)",
+    )
+
+    parser.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="Pass all text to the NLP pipeline, not just the lines that could "
+        "hold PII",
+    )
+
+    parser.add_argument(
+        "--context",
+        type=int,
+        default=0,
+        metavar="CHARS",
+        help="Include up to this many characters either side of each entity, "
+        "from the same line, as its context (default: 0, no context)",
+    )
+
+    parser.add_argument(
+        "--no-structured",
+        action="store_true",
+        help="Analyze CSV, JSON and JSON Lines files as plain text instead of "
+        "value by value",
+    )
+
+    parser.add_argument(
+        "--field-sample",
+        type=int,
+        metavar="N",
+        help="Analyze at most N values of each CSV column or JSON field "
+        "(default: all)",
+    )
+
+    parser.add_argument(
+        "--classify-after",
+        type=int,
+        metavar="N",
+        help="Stop analyzing a CSV column or JSON field once N of its values "
+        "held the same entity type (default: never)",
+    )
+
+    parser.add_argument(
+        "--no-archives",
+        action="store_true",
+        help="Do not decompress .gz, .bz2, .xz and .zst files or look inside "
+        ".zip and .tar archives",
+    )
+
+    parser.add_argument(
+        "--first-match",
+        action="store_true",
+        help="Stop analyzing each file at its first finding, running pattern "
+        "recognizers before NER. Results may not list every entity",
+    )
+
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        default=0.0,
+        metavar="SCORE",
+        help="Drop entities with a confidence score below SCORE, from 0 to 1 "
+        "(default: 0, keep all)",
+    )
+
+    parser.add_argument(
+        "--overlaps",
+        choices=OVERLAP_POLICIES,
+        default=DEFAULT_OVERLAP_POLICY,
+        help="How to report overlapping entities: keep them all, keep the "
+        "highest scoring or longest, or merge those of a type that overlap or "
+        f"are only separated by spaces (default: {DEFAULT_OVERLAP_POLICY})",
+    )
+
+
+def _entity_list(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Flatten repeated, comma-separated entity options"""
+    if values is None:
+        return None
+    return [
+        name.strip() for value in values for name in value.split(",") if name.strip()
+    ]
+
+
+def _config_value(action: argparse.Action, value: Any) -> Any:
+    """Check a --config value the way the option is checked on the command
+    line. Repeatable options take a list, or a single string as one value."""
+    if action.nargs == 0:
+        if not isinstance(value, bool):
+            raise TypeError("expected true or false")
+        return value
+    if isinstance(action, argparse._AppendAction):
+        values = [value] if isinstance(value, str) else value
+        if not isinstance(values, list) or not all(
+            isinstance(item, str) for item in values
+        ):
+            raise TypeError("expected a list of strings or a string")
+        return values
+    expected = action.type or str
+    if isinstance(value, str) and expected is not str:
+        try:
+            value = expected(value)
+        except ValueError:
+            raise ValueError(f"expected {expected.__name__}, got {value!r}") from None
+    elif expected is float and type(value) is int:
+        value = float(value)
+    if type(value) is not expected:
+        raise TypeError(f"expected {expected.__name__}, got {value!r}")
+    if action.choices is not None and value not in action.choices:
+        raise ValueError(
+            f"{value!r} is not one of {', '.join(map(str, action.choices))}"
+        )
+    return value
+
+
+def _parse_args(
+    parser: argparse.ArgumentParser, argv: Optional[List[str]] = None
+) -> argparse.Namespace:
+    """Parse arguments, taking defaults from the --config file if one is given"""
+    args, _ = parser.parse_known_args(argv)
+    if args.config:
+        try:
+            with open(args.config, encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read --config {args.config}: {e}")
+        if not isinstance(config, dict):
+            parser.error(f"--config {args.config} must hold a JSON object")
+        defaults = {name.replace("-", "_"): value for name, value in config.items()}
+        unknown = sorted(set(defaults) - (set(vars(args)) - {"config"}))
+        if unknown:
+            parser.error(
+                f"unknown options in --config {args.config}: {', '.join(unknown)}"
+            )
+        actions = {action.dest: action for action in parser._actions}
+        for name, value in defaults.items():
+            try:
+                defaults[name] = _config_value(actions[name], value)
+            except (TypeError, ValueError) as e:
+                option = name.replace("_", "-")
+                parser.error(f"invalid {option!r} in --config {args.config}: {e}")
+        parser.set_defaults(**defaults)
+    return parser.parse_args(argv)
+
+
+def _component_list(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _detector_options(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Build PIIDetector keyword arguments from parsed options"""
+    if not 0 <= args.chunk_overlap < args.chunk_size:
+        parser.error("--chunk-overlap must be at least 0 and less than --chunk-size")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.cache_max_size < 1:
+        parser.error("--cache-max-size must be at least 1")
+    if args.max_file_size < 0:
+        parser.error("--max-file-size must not be negative")
+    if args.context < 0:
+        parser.error("--context must not be negative")
+    if args.field_sample is not None and args.field_sample < 1:
+        parser.error("--field-sample must be at least 1")
+    if args.classify_after is not None and args.classify_after < 1:
+        parser.error("--classify-after must be at least 1")
+    if not 0 <= args.min_score <= 1:
+        parser.error("--min-score must be between 0 and 1")
+    return {
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+        "batch_size": args.batch_size,
+        "cache_dir": (
+            None if args.no_cache else str(args.cache_dir or default_cache_dir())
+        ),
+        "cache_max_size": args.cache_max_size * MEGABYTE,
+        "entities": _entity_list(args.entities),
+        "exclude_entities": _entity_list(args.exclude_entities),
+        "mode": args.mode,
+        "model": args.model,
+        "disabled_components": _component_list(args.disable_components),
+        "prefilter": not args.no_prefilter,
+        "max_file_size": args.max_file_size * MEGABYTE or None,
+        "oversize": args.oversize,
+        "context_width": args.context,
+        "structured": not args.no_structured,
+        "field_sample": args.field_sample,
+        "classify_after": args.classify_after,
+        "archives": not args.no_archives,
+        "first_match": args.first_match,
+        "min_score": args.min_score,
+        "overlaps": args.overlaps,
+    }
+
+
+def _create_detector(
+    parser: argparse.ArgumentParser, options: Dict[str, Any], load_model: bool = True
+) -> PIIDetector:
+    """Build a PIIDetector, reporting bad entity choices as usage errors"""
+    try:
+        return PIIDetector(**options, load_model=load_model)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def _analyze_path(
+    detector,
+    path: Path,
+    kwargs: Dict[str, Any],
+    file_paths: Optional[List[Path]] = None,
+    stream: bool = False,
+) -> Iterable[Dict[str, Any]]:
+    if file_paths is not None:
+        return detector.analyze_files(file_paths, **kwargs)
+    if path.is_file():
+        if archive_format(path.name) is not None:
+            # Archives give a result per member
+            return detector.analyze_files([path], extensions=kwargs.get("extensions"))
+        return [detector.analyze_file(path)]
+    if stream:
+        return detector.iter_directory(path, **kwargs)
+    return detector.analyze_directory(path, **kwargs)
+
+
+def _scanned_suffix(name: str, extensions: List[str], archives: bool) -> bool:
+    """Return whether a directory walk would scan a file named ``name``"""
+    if not archives:
+        return Path(name).suffix.lower() in extensions
+    return archive_format(name) is not None or matches_extensions(name, extensions)
+
+
+def _select_changed_files(
+    path: Path, args: argparse.Namespace, staged_dir: Optional[Path]
+) -> Tuple[List[Path], Dict[str, str], Optional[Dict[Path, changes.LineRanges]]]:
+    """Pick the files changed since ``args.since``, or staged, that a scan of
+    ``path`` would cover, with the same extension and exclude matching as a
+    directory walk.
+
+    Staged scans read the content in the index, copied to ``staged_dir``, and
+    return the copies with a map from each copy to the file's own path. With
+    ``--changed-lines``, the changed line ranges of each file are returned too.
+    """
+    extensions = args.extensions or DEFAULT_EXTENSIONS
+    try:
+        scope = (path if path.is_dir() else path.parent).resolve()
+        if staged_dir is not None:
+            copies = changes.export_staged(path, staged_dir)
+        else:
+            copies = [
+                (file_path, file_path)
+                for file_path in changes.changed_files(path, args.since)
+            ]
+        copies = [
+            (copy, file_path)
+            for copy, file_path in copies
+            if _scanned_suffix(file_path.name, extensions, not args.no_archives)
+            and not walk.is_excluded(
+                args.exclude or [], file_path.resolve().relative_to(scope)
+            )
+        ]
+        line_ranges = None
+        if args.changed_lines:
+            line_ranges = changes.changed_lines(path, args.since, args.staged)
+    except changes.GitError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    staged_names = {}
+    if staged_dir is not None:
+        staged_names = {str(copy): str(file_path) for copy, file_path in copies}
+    return [copy for copy, _ in copies], staged_names, line_ranges
+
+
+def _watch_for_pii(
+    results: Iterable[Dict[str, Any]], found: List[Dict[str, Any]], fail_fast: bool
+) -> Iterator[Dict[str, Any]]:
+    """Yield results, adding those with PII to ``found``. With ``fail_fast``,
+    stop after the first of them."""
+    for result in results:
+        yield result
+        if result.get("pii_found"):
+            found.append(result)
+            if fail_fast:
+                return
+
+
+def _scan_stream(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, options: Dict[str, Any]
+):
+    """Analyze standard input, or a file followed as it grows, printing
+    findings as each batch of lines is analyzed"""
+    if args.path == "-":
+        # Line endings are kept so entity offsets match the input
+        lines: Iterable[str] = io.TextIOWrapper(
+            sys.stdin.buffer, encoding="utf-8", errors="ignore", newline=""
+        )
+    else:
+        if not Path(args.path).is_file():
+            print(f"Error: '{args.path}' is not a file")
+            sys.exit(1)
+            return
+        lines = tail.follow_lines(Path(args.path))
+
+    detector = _create_detector(parser, options)
+    found: List[Dict[str, Any]] = []
+    results = _watch_for_pii(
+        detector.iter_stream(lines, args.path, args.max_batch_delay / 1000),
+        found,
+        args.fail_fast,
+    )
+    try:
+        print_results(
+            results,
+            args.format,
+            metadata=detector.metadata,
+            stats=detector.stats if args.stats else None,
+        )
+    except KeyboardInterrupt:
+        pass
+    if args.stats_file and detector.stats is not None:
+        _write_stats_file(args.stats_file, detector.stats)
+    if found and (args.first_match or args.fail_fast):
+        sys.exit(1)
+
+
+def _write_stats_file(file_name: str, stats: ScanStats):
+    with open(file_name, "w", encoding="utf-8") as f:
+        f.write(stats.to_prometheus())
+
+
+def serve_main(argv: List[str]):
+    """Run the long-lived scan daemon"""
+    parser = argparse.ArgumentParser(
+        prog="pii-detect serve",
+        description="Keep a warm PII detector resident for fast CLI scans",
+    )
+    parser.add_argument(
+        "--socket",
+        help="Unix socket to listen on (default: $PII_DETECT_SOCKET or a "
+        "per-user path in the runtime directory)",
+    )
+    _add_detector_arguments(parser)
+    args = _parse_args(parser, argv)
+
+    detector = _create_detector(parser, _detector_options(parser, args))
+    socket_path = args.socket or daemon.default_socket_path()
+    print(f"Serving PII detection on {socket_path}")
+    try:
+        daemon.serve(detector, socket_path)
+    except KeyboardInterrupt:
+        pass
+    except daemon.DaemonError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def server_main(argv: List[str]):
+    """Run the HTTP scanning service"""
+    # asyncio is only needed here, so other commands start without it
+    import asyncio
+
+    from . import server
+    from .async_detector import (
+        DEFAULT_MAX_BATCH_DELAY,
+        DEFAULT_MAX_PENDING,
+        AsyncPIIDetector,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="pii-detect server",
+        description="Serve PII detection over HTTP from a pool of warm detectors",
+    )
+    parser.add_argument(
+        "--host",
+        default=server.DEFAULT_HOST,
+        help=f"Address to listen on (default: {server.DEFAULT_HOST})",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=server.DEFAULT_PORT,
+        help=f"Port to listen on (default: {server.DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Detector processes, each with its own model (default: 1, "
+        "analysis on a background thread)",
+    )
+    parser.add_argument(
+        "--max-batch-delay",
+        type=float,
+        default=DEFAULT_MAX_BATCH_DELAY * 1000,
+        metavar="MS",
+        help="Milliseconds a request waits for others to share its batch "
+        f"(default: {DEFAULT_MAX_BATCH_DELAY * 1000:g})",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=DEFAULT_MAX_PENDING,
+        help="Texts queued before new requests wait for room "
+        f"(default: {DEFAULT_MAX_PENDING})",
+    )
+    parser.add_argument(
+        "--max-request-size",
+        type=int,
+        default=server.DEFAULT_MAX_REQUEST_SIZE // 1024,
+        metavar="KB",
+        help="Largest request body accepted, in KB "
+        f"(default: {server.DEFAULT_MAX_REQUEST_SIZE // 1024})",
+    )
+    parser.add_argument(
+        "--max-batch-texts",
+        type=int,
+        default=server.DEFAULT_MAX_BATCH_TEXTS,
+        help="Most texts accepted by one /analyze-batch request "
+        f"(default: {server.DEFAULT_MAX_BATCH_TEXTS})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=server.DEFAULT_REQUEST_TIMEOUT,
+        help="Seconds before a request is answered with 504, 0 for no limit "
+        f"(default: {server.DEFAULT_REQUEST_TIMEOUT:g})",
+    )
+    _add_detector_arguments(parser)
+    args = _parse_args(parser, argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_batch_delay < 0 or args.timeout < 0:
+        parser.error("--max-batch-delay and --timeout must not be negative")
+    if min(args.max_pending, args.max_request_size, args.max_batch_texts) < 1:
+        parser.error(
+            "--max-pending, --max-request-size and --max-batch-texts must be at "
+            "least 1"
+        )
+
+    # Built here so bad options are reported before serving. With more
+    # workers, each process builds its own from the same options, so this
+    # one never needs the model
+    detector = _create_detector(
+        parser, _detector_options(parser, args), load_model=args.workers == 1
+    )
+    async_detector = AsyncPIIDetector(
+        detector,
+        workers=args.workers,
+        max_batch_size=args.batch_size,
+        max_batch_delay=args.max_batch_delay / 1000,
+        max_pending=args.max_pending,
+    )
+    http_server = server.PIIServer(
+        async_detector,
+        max_request_size=args.max_request_size * 1024,
+        max_batch_texts=args.max_batch_texts,
+        request_timeout=args.timeout or None,
+    )
+    print(f"Serving PII detection on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(http_server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def bench_main(argv: List[str]):
+    """Benchmark the detector against a synthetic corpus with seeded PII"""
+    defaults = bench.CorpusSpec()
+    parser = argparse.ArgumentParser(
+        prog="pii-detect bench",
+        description="Measure PII detection speed and accuracy on a reproducible "
+        "synthetic corpus",
+    )
+    parser.add_argument(
+        "--corpus",
+        metavar="DIR",
+        help="Write the corpus to this directory and keep it (default: a "
+        "temporary directory, removed afterwards)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=defaults.seed, help="Corpus random seed"
+    )
+    for name, help_text in CORPUS_SIZE_OPTIONS:
+        default = getattr(defaults, name)
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=int,
+            default=default,
+            help=f"{help_text} in the corpus (default: {default})",
+        )
+    parser.add_argument(
+        "--pii-rate",
+        type=float,
+        default=defaults.pii_rate,
+        help="Share of lines or records holding PII " f"(default: {defaults.pii_rate})",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["text", "json"],
+        default="text",
+        help="Report format (default: text)",
+    )
+    _add_detector_arguments(parser)
+    args = _parse_args(parser, argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if any(getattr(args, name) < 0 for name, _ in CORPUS_SIZE_OPTIONS):
+        parser.error("corpus sizes must not be negative")
+    if not 0 <= args.pii_rate <= 1:
+        parser.error("--pii-rate must be between 0 and 1")
+
+    spec = bench.CorpusSpec(
+        **{name: getattr(args, name) for name in bench.CorpusSpec._fields}
+    )
+    options = _detector_options(parser, args)
+    # Cached results would measure the cache, not the detector
+    options["cache_dir"] = None
+    detector = _create_detector(parser, options)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        truth = bench.generate_corpus(Path(args.corpus or temp_dir), spec)
+        report = bench.run_benchmark(detector, truth, args.workers)
+    bench.print_report(report, args.format)
+
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["bench"]:
+        bench_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["server"]:
+        server_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Detect PII in text files using Microsoft Presidio",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -55,18 +796,32 @@ Examples:
   %(prog)s file.txt                    # Analyze single file
   %(prog)s /path/to/directory          # Analyze all text files in directory
   %(prog)s -f json file.txt            # Output results as JSON
+  %(prog)s -f ndjson directory/        # Stream one JSON result per line
   %(prog)s -e .py -e .js directory/    # Only analyze .py and .js files
+  %(prog)s -w 8 directory/             # Analyze files in 8 worker processes
+  %(prog)s --since origin/main .       # Only files changed since a git ref
+  %(prog)s --staged --changed-lines .  # Only lines staged for commit
+  %(prog)s --fail-fast .               # Exit with status 1 at the first PII
+  tail -f app.log | %(prog)s -         # Report PII in lines as they arrive
+  %(prog)s --follow app.log            # The same, reopening rotated logs
+  %(prog)s serve                       # Keep a warm detector for later runs
+  %(prog)s bench --mode fast           # Measure speed and accuracy
+  %(prog)s server --port 8080          # Serve detection over HTTP
         """,
     )
 
-    parser.add_argument("path", help="Path to file or directory to analyze")
+    parser.add_argument(
+        "path",
+        help="Path to file or directory to analyze, or - to read standard input",
+    )
 
     parser.add_argument(
         "-f",
         "--format",
-        choices=["text", "json"],
-        default="text",
-        help="Output format (default: text)",
+        choices=["text", "json", *STREAMING_FORMATS],
+        help="Output format (default: text, or ndjson for standard input and "
+        "--follow). ndjson and sarif are written incrementally as each file is "
+        "analyzed",
     )
 
     parser.add_argument(
@@ -76,33 +831,220 @@ Examples:
         help="File extensions to analyze (can be used multiple times)",
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "-x",
+        "--exclude",
+        action="append",
+        metavar="PATTERN",
+        help="Skip paths matching a .gitignore-style pattern, relative to the "
+        "scanned directory (can be used multiple times)",
+    )
+
+    parser.add_argument(
+        "--no-ignore",
+        action="store_true",
+        help="Also scan files ignored by .gitignore and .piiignore files",
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for directory scans (default: 1)",
+    )
+
+    parser.add_argument(
+        "--since",
+        metavar="REF",
+        help="Only analyze files changed between a git ref and the working tree",
+    )
+
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Only analyze files with changes staged in the git index",
+    )
+
+    parser.add_argument(
+        "--changed-lines",
+        action="store_true",
+        help="With --since or --staged, only report PII on added or modified lines",
+    )
+
+    parser.add_argument(
+        "--socket",
+        help="Unix socket of a running 'pii-detect serve' daemon to use",
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Always analyze in-process, even if a scan daemon is running",
+    )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Report time spent per scan stage and recognizer, and file and "
+        "entity counts, after the results. Scans run in-process",
+    )
+
+    parser.add_argument(
+        "--stats-file",
+        metavar="FILE",
+        help="Write scan stats to FILE in the Prometheus text format. Scans run "
+        "in-process",
+    )
+
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop the scan at the first file with PII. Implies --first-match",
+    )
+
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep reading the file as lines are appended to it, like tail -f, "
+        "reopening it when it is rotated",
+    )
+
+    parser.add_argument(
+        "--max-batch-delay",
+        type=float,
+        default=tail.DEFAULT_MAX_DELAY * 1000,
+        metavar="MS",
+        help="With standard input or --follow, milliseconds a line waits for "
+        f"others to share its batch (default: {tail.DEFAULT_MAX_DELAY * 1000:g})",
+    )
+
+    _add_detector_arguments(parser)
+
+    args = _parse_args(parser)
+    live = args.path == "-" or args.follow
+    if args.format is None:
+        args.format = "ndjson" if live else "text"
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.changed_lines and not (args.since or args.staged):
+        parser.error("--changed-lines requires --since or --staged")
+    if args.max_batch_delay < 0:
+        parser.error("--max-batch-delay must not be negative")
+    if live and (args.since or args.staged):
+        parser.error("--since and --staged cannot be used with - or --follow")
+    if args.follow and args.format != "ndjson":
+        parser.error("--follow requires -f ndjson")
+    options = _detector_options(parser, args)
+    if args.fail_fast:
+        options["first_match"] = True
+    # Findings off the changed lines are only dropped after analysis, so files
+    # are analyzed in full for a finding on a changed line to be seen
+    if args.changed_lines:
+        options["first_match"] = False
+    collect_stats = args.stats or args.stats_file is not None
+    if collect_stats:
+        options["collect_stats"] = True
+
+    # Streams are analyzed in-process, as the daemon replies once per scan
+    if live:
+        _scan_stream(parser, args, options)
+        return
 
     # Validate path
     path = Path(args.path)
     if not path.exists():
         print(f"Error: Path '{args.path}' does not exist")
         sys.exit(1)
+        return
 
-    # Initialize detector
-    detector = PIIDetector()
-
-    # Analyze based on path type
-    results = []
-    kwargs = {}
-    if args.extensions:
-        kwargs["extensions"] = args.extensions
-    if path.is_file():
-        result = detector.analyze_file(path)
-        results = [result]
-    elif path.is_dir():
-        results = detector.analyze_directory(path, **kwargs)
-    else:
+    if not path.is_file() and not path.is_dir():
         print(f"Error: '{args.path}' is not a file or directory")
         sys.exit(1)
+        return
+
+    kwargs: Dict[str, Any] = {}
+    if args.workers > 1:
+        kwargs["workers"] = args.workers
+
+    # In git mode, only the changed files (and optionally lines) are scanned
+    file_paths = None
+    line_ranges = None
+    staged_dir = None
+    staged_names: Dict[str, str] = {}
+    if args.since or args.staged:
+        export_dir = None
+        if args.staged:
+            staged_dir = tempfile.TemporaryDirectory(prefix="pii-detect-")
+            export_dir = Path(staged_dir.name)
+        file_paths, staged_names, line_ranges = _select_changed_files(
+            path, args, export_dir
+        )
+        if not args.no_archives:
+            kwargs["extensions"] = args.extensions or DEFAULT_EXTENSIONS
+    else:
+        if args.extensions:
+            kwargs["extensions"] = args.extensions
+        if args.exclude:
+            kwargs["exclude"] = args.exclude
+        if args.no_ignore:
+            kwargs["use_ignore_files"] = False
+
+    # Prefer a warm daemon, falling back to loading the model in-process.
+    # Stats are gathered where the scan runs, so they need an in-process scan.
+    detector = None
+    if not args.no_daemon and not collect_stats:
+        detector = daemon.connect(args.socket, options)
+
+    # Analyze based on path type. A scan that may stop early is always
+    # streamed, so files after the first with PII are never analyzed
+    stream = args.format in STREAMING_FORMATS or args.fail_fast
+    results: Iterable[Dict[str, Any]] = []
+    metadata: Optional[Dict[str, Any]] = None
+    if detector is not None:
+        try:
+            results = _analyze_path(detector, path, kwargs, file_paths, stream)
+            # The daemon replies in one message, so failures surface here
+            # rather than part way through the output
+            results = list(results)
+            metadata = detector.metadata
+        except (daemon.DaemonError, OSError):
+            detector = None
+    if detector is None:
+        # Files handed to worker processes are analyzed by their own
+        # detectors, so this one only needs the model for a single file
+        pooled = args.workers > 1 and (file_paths is not None or path.is_dir())
+        detector = _create_detector(parser, options, load_model=not pooled)
+        metadata = detector.metadata
+        results = _analyze_path(detector, path, kwargs, file_paths, stream)
+
+    if staged_names:
+        results = (
+            {**result, "file": original_name(result["file"], staged_names)}
+            for result in results
+        )
+    if line_ranges is not None:
+        ranges = line_ranges
+        results = (
+            changes.restrict_to_lines(result, ranges.get(Path(result["file"]), []))
+            for result in results
+        )
+    found: List[Dict[str, Any]] = []
+    if args.first_match or args.fail_fast:
+        results = _watch_for_pii(results, found, args.fail_fast)
 
     # Print results
-    print_results(results, args.format)
+    stats = getattr(detector, "stats", None)
+    print_results(
+        results, args.format, metadata=metadata, stats=stats if args.stats else None
+    )
+    if args.stats_file and stats is not None:
+        _write_stats_file(args.stats_file, stats)
+    if staged_dir is not None:
+        staged_dir.cleanup()
+    # Gating checks fail when PII is found
+    if found:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
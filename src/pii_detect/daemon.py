@@ -0,0 +1,236 @@
+"""
+Long-lived scan daemon for PII detection
+Keeps one warm PIIDetector resident behind a local Unix socket so that CLI
+invocations can skip loading the spaCy model
+"""
+
+import json
+import os
+import socket
+import socketserver
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .archive import original_name
+from .detector import RESULT_NEUTRAL_OPTIONS
+
+SOCKET_ENV_VAR = "PII_DETECT_SOCKET"
+PING_TIMEOUT = 2.0
+
+
+def default_socket_path() -> str:
+    """Return the socket path used when none is given explicitly"""
+    if os.environ.get(SOCKET_ENV_VAR):
+        return os.environ[SOCKET_ENV_VAR]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "pii-detect.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), f"pii-detect-{uid}.sock")
+
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot handle a request"""
+
+
+def _read_message(stream) -> Any:
+    line = stream.readline()
+    if not line:
+        raise DaemonError("connection closed by peer")
+    return json.loads(line)
+
+
+def _write_message(stream, message: Any):
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles a single JSON request per connection"""
+
+    def handle(self):
+        try:
+            request = _read_message(self.rfile)
+            response = {"result": self.server.dispatch(request)}
+        except Exception as e:
+            response = {"error": str(e)}
+        try:
+            _write_message(self.wfile, response)
+        except OSError:
+            pass
+
+
+def _result_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Leave out the options that only change how a scan runs, such as
+    whether stats are collected, which a client and daemon need not share"""
+    return {
+        name: value
+        for name, value in options.items()
+        if name not in RESULT_NEUTRAL_OPTIONS
+    }
+
+
+def _handle_request(detector, request: Dict[str, Any]) -> Any:
+    """Run a single client request against the resident detector"""
+    if _result_options(request.get("options", {})) != _result_options(
+        getattr(detector, "_options", {})
+    ):
+        raise DaemonError("detector options do not match the running daemon")
+
+    op = request.get("op")
+    if op == "ping":
+        return "pong"
+    if op == "metadata":
+        return detector.metadata
+    if op == "analyze_text":
+        return detector.analyze_text(request["text"])
+    if op == "analyze_file":
+        return detector.analyze_file(Path(request["path"]))
+    if op == "analyze_files":
+        file_paths = [Path(file_path) for file_path in request["paths"]]
+        return list(detector.analyze_files(file_paths, **request.get("kwargs", {})))
+    if op == "analyze_directory":
+        return detector.analyze_directory(
+            Path(request["path"]), **request.get("kwargs", {})
+        )
+    raise DaemonError(f"unknown operation: {op}")
+
+
+def _is_listening(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def make_server(detector, socket_path: Optional[str] = None):
+    """Create a Unix socket server for ``detector`` without starting it.
+
+    Requests are handled one at a time, since the Presidio analyzer is not
+    safe to share between threads.
+    """
+    if not hasattr(socketserver, "UnixStreamServer"):
+        raise DaemonError("the scan daemon requires Unix domain socket support")
+
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        if _is_listening(socket_path):
+            raise DaemonError(f"a daemon is already listening on {socket_path}")
+        # Stale socket left behind by a daemon that did not shut down cleanly
+        os.unlink(socket_path)
+
+    class Server(socketserver.UnixStreamServer):
+        def dispatch(self, request):
+            return _handle_request(detector, request)
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    # Only the current user may talk to the daemon
+    old_umask = os.umask(0o177)
+    try:
+        return Server(socket_path, _RequestHandler)
+    finally:
+        os.umask(old_umask)
+
+
+def serve(detector, socket_path: Optional[str] = None):
+    """Serve requests for ``detector`` on a Unix socket until interrupted"""
+    server = make_server(detector, socket_path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+class DaemonClient:
+    """Thin client with the same analysis methods as PIIDetector, forwarding
+    each call to a running daemon"""
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.socket_path = socket_path or default_socket_path()
+        self.options = options or {}
+        self.timeout = timeout
+
+    def _call(self, op: str, timeout: Optional[float] = None, **params) -> Any:
+        request = {"op": op, "options": self.options, **params}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout if timeout is not None else self.timeout)
+            sock.connect(self.socket_path)
+            with sock.makefile("rwb") as stream:
+                _write_message(stream, request)
+                response = _read_message(stream)
+        if "error" in response:
+            raise DaemonError(response["error"])
+        return response["result"]
+
+    def ping(self) -> bool:
+        """Return True if a compatible daemon is answering on the socket"""
+        if not hasattr(socket, "AF_UNIX"):
+            return False
+        try:
+            return self._call("ping", timeout=PING_TIMEOUT) == "pong"
+        except (OSError, ValueError, DaemonError):
+            return False
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._call("metadata")
+
+    def analyze_text(self, text: str) -> List[Dict[str, Any]]:
+        return self._call("analyze_text", text=text)
+
+    def analyze_file(self, file_path: Path) -> Dict[str, Any]:
+        # The daemon has its own working directory, so send an absolute path
+        # and report the file the way the caller named it
+        result = self._call("analyze_file", path=str(Path(file_path).resolve()))
+        result["file"] = str(file_path)
+        return result
+
+    def analyze_files(
+        self, file_paths: List[Path], **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        file_paths = list(file_paths)
+        paths = [str(Path(file_path).resolve()) for file_path in file_paths]
+        names = dict(zip(paths, map(str, file_paths)))
+        results = self._call("analyze_files", paths=paths, kwargs=kwargs)
+        for result in results:
+            result["file"] = original_name(result["file"], names)
+        return results
+
+    def analyze_directory(
+        self, directory_path: Path, **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        root = Path(directory_path).resolve()
+        results = self._call("analyze_directory", path=str(root), kwargs=kwargs)
+        for result in results:
+            relative = Path(result["file"]).relative_to(root)
+            result["file"] = str(Path(directory_path) / relative)
+        return results
+
+    def iter_directory(
+        self, directory_path: Path, **kwargs: Any
+    ) -> Iterator[Dict[str, Any]]:
+        # The daemon answers each request in one message
+        return iter(self.analyze_directory(directory_path, **kwargs))
+
+
+def connect(
+    socket_path: Optional[str] = None, options: Optional[Dict[str, Any]] = None
+) -> Optional[DaemonClient]:
+    """Return a client for a running, compatible daemon, or None if there is no
+    daemon to talk to"""
+    client = DaemonClient(socket_path, options)
+    if not os.path.exists(client.socket_path):
+        return None
+    return client if client.ping() else None
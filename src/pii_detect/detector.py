@@ -3,89 +3,1412 @@ PII Detection module using Microsoft Presidio
 Contains the PIIDetector class for analyzing text files for PII
 """
 
+import codecs
+import importlib
+import io
+import mmap
 import sys
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
 
-from presidio_analyzer import AnalyzerEngine
-from presidio_analyzer.nlp_engine import NlpEngineProvider
+from .archive import (
+    CONTAINER_SUFFIXES,
+    MEMBER_SEPARATOR,
+    archive_format,
+    compression,
+    decompress,
+    inner_suffix,
+    iter_members,
+    matches_extensions,
+    open_compressed,
+    prefixed,
+)
+from .cache import (
+    DEFAULT_CACHE_MAX_SIZE,
+    ResultCache,
+    fingerprint,
+    hash_bytes,
+    hash_file,
+)
+from .lines import LineIndex, add_positions
+from .overlaps import DEFAULT_OVERLAP_POLICY, OVERLAP_POLICIES, resolve_overlaps
+from .parallel import iter_files_parallel
+from .prefilter import candidate_regions
+from .reader import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    MAPPABLE_ENCODINGS,
+    SNIFF_SIZE,
+    TextWindow,
+    byte_offsets,
+    detect_encoding,
+    iter_mapped_windows,
+    iter_windows,
+)
+from .stats import ScanStats
+from .structured import (
+    FieldValue,
+    StructuredFormatError,
+    context_words,
+    iter_values,
+    structured_format,
+)
+from .tail import DEFAULT_MAX_DELAY, iter_line_batches
+from .walk import iter_files
+
+if TYPE_CHECKING:
+    import spacy
+    from presidio_analyzer import AnalyzerEngine, BatchAnalyzerEngine
+    from presidio_analyzer.nlp_engine import NlpEngineProvider, SpacyNlpEngine
+    from presidio_analyzer.predefined_recognizers import SpacyRecognizer
+
+# Presidio and spaCy take about a second to import, so they are imported when
+# the first detector is built, keeping `pii-detect --help`, daemon clients and
+# usage errors fast. Names are (module, attribute) and become module globals.
+_LAZY_IMPORTS = {
+    "spacy": ("spacy", None),
+    "AnalyzerEngine": ("presidio_analyzer", "AnalyzerEngine"),
+    "BatchAnalyzerEngine": ("presidio_analyzer", "BatchAnalyzerEngine"),
+    "NlpEngineProvider": ("presidio_analyzer.nlp_engine", "NlpEngineProvider"),
+    "SpacyNlpEngine": ("presidio_analyzer.nlp_engine", "SpacyNlpEngine"),
+    "SpacyRecognizer": (
+        "presidio_analyzer.predefined_recognizers",
+        "SpacyRecognizer",
+    ),
+}
+
+T = TypeVar("T")
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_EXTENSIONS = [".txt", ".md", ".py", ".js", ".json", ".csv", ".log"]
+DEFAULT_EXCLUDED_ENTITIES = ["DATE_TIME", "US_BANK_NUMBER", "US_DRIVER_LICENSE"]
+# spaCy pipelines for full mode, smallest and fastest first. The name or path
+# of any other installed pipeline with an NER component also works.
+MODELS = ["en_core_web_sm", "en_core_web_md", "en_core_web_lg"]
+DEFAULT_MODEL = "en_core_web_lg"
+# Pipeline components left out when loading a model. Presidio reads tokens,
+# entities and lemmas, so the dependency parser is never needed; dropping the
+# lemmatizer too ("tagger", "attribute_ruler", "lemmatizer") is faster still
+# but weakens context words such as "phone" raising a match's score.
+DEFAULT_DISABLED_COMPONENTS = ["parser"]
+
+# "full" runs spaCy NER alongside the pattern recognizers. "fast" only runs
+# recognizers that need no NER model, so entity types such as PERSON and
+# LOCATION are not detected.
+MODES = ["full", "fast"]
+DEFAULT_MODE = "full"
+
+DEFAULT_MAX_FILE_SIZE = 100 * 1024 * 1024
+# What to do with files over the size limit: leave them out of the scan, or
+# analyze them anyway, streamed in chunks
+OVERSIZE_POLICIES = ["skip", "stream"]
+BINARY_FILE_REASON = "binary content"
+
+# Bumped whenever the shape of cached entities changes
+_RESULT_FORMAT = 4
+# How content not parsed as structured data was analyzed, for the cache key:
+# plain text reports byte offsets, except within archive members and
+# compressed files where they cannot be used to seek
+_PLAIN_TEXT = "text"
+_PLAIN_TEXT_NO_BYTE_OFFSETS = "text-without-byte-offsets"
+
+# Options that change how a scan runs but never which entities are found, so
+# they are left out of the result cache key and need not match a daemon's
+RESULT_NEUTRAL_OPTIONS = {
+    "cache_dir",
+    "cache_max_size",
+    "oversize",
+    "collect_stats",
+}
+
+
+def package_version(name: str = "pii-detect") -> str:
+    """Return the installed version of a distribution, or 'unknown'"""
+    # Imported here as it adds noticeably to CLI startup
+    from importlib import metadata
+
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class _PendingFile(NamedTuple):
+    """A small file waiting to be analyzed in a batch. ``entities`` is set on a
+    cache hit, ``error`` if the file could not be read and ``skipped`` if it
+    is not to be analyzed. ``path`` is an archive member's name as reported,
+    and ``encoding`` is only set for files whose byte offsets are reported."""
+
+    path: Union[Path, str]
+    text: str
+    key: Optional[str]
+    entities: Optional[List[Dict[str, Any]]]
+    error: Optional[Exception]
+    skipped: Optional[str] = None
+    encoding: Optional[str] = None
+
+
+class _Pass(NamedTuple):
+    """An analyzer and the entity types it is asked to find"""
+
+    analyzer: "AnalyzerEngine"
+    batch_analyzer: "BatchAnalyzerEngine"
+    entities: List[str]
 
 
 class PIIDetector:
-    def __init__(self):
-        """Initialize the PII detector with Presidio analyzer"""
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache_dir: Optional[str] = None,
+        cache_max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        entities: Optional[List[str]] = None,
+        exclude_entities: Optional[List[str]] = None,
+        mode: str = DEFAULT_MODE,
+        model: Optional[str] = None,
+        disabled_components: Optional[List[str]] = None,
+        prefilter: bool = True,
+        max_file_size: Optional[int] = DEFAULT_MAX_FILE_SIZE,
+        oversize: str = "skip",
+        context_width: int = 0,
+        collect_stats: bool = False,
+        structured: bool = True,
+        field_sample: Optional[int] = None,
+        classify_after: Optional[int] = None,
+        archives: bool = True,
+        first_match: bool = False,
+        min_score: float = 0.0,
+        overlaps: str = DEFAULT_OVERLAP_POLICY,
+        load_model: bool = True,
+    ):
+        """Initialize the PII detector with Presidio analyzer.
+
+        Files are read in windows of ``chunk_size`` characters that overlap by
+        ``chunk_overlap`` characters, so memory use does not grow with file
+        size. Up to ``batch_size`` windows or small files are passed through
+        the spaCy pipeline together.
+
+        With ``cache_dir`` set, results are cached on disk by file content and
+        detector configuration, and unchanged files are not analyzed again.
+        The cache is kept below ``cache_max_size`` bytes.
+
+        Only ``entities`` are detected (all supported entities by default),
+        minus ``exclude_entities`` (``DEFAULT_EXCLUDED_ENTITIES`` by default).
+        Recognizers that cannot produce an enabled entity are removed, so they
+        cost nothing per document.
+
+        In ``"fast"`` ``mode`` no spaCy model is loaded and only recognizers
+        that do not rely on named entity recognition run. Startup and scanning
+        are much quicker, but names, locations and other NER-only entity types
+        are not detected; see ``metadata``.
+
+        In ``"full"`` mode, ``model`` is the spaCy pipeline to load, one of
+        ``MODELS`` or any other installed pipeline (``DEFAULT_MODEL`` by
+        default), without the ``disabled_components``
+        (``DEFAULT_DISABLED_COMPONENTS`` by default). Smaller models load and
+        run faster but find fewer names and locations.
+
+        With ``prefilter`` on, only lines that could hold PII (and a few lines
+        around them) are passed to the NLP pipeline. Lines of lower case words
+        without digits, "@" or dotted names are skipped.
+
+        Files that look binary are skipped, as are files over
+        ``max_file_size`` bytes unless ``oversize`` is ``"stream"``. Results
+        for skipped files carry the reason in ``skipped``.
+
+        Every entity has the ``line`` and ``column`` (1-based) it starts at and
+        the ``end_line`` and ``end_column`` it ends before. With
+        ``context_width`` above 0, entities also carry a ``context`` snippet of
+        up to that many characters either side, within the entity's lines.
+
+        With ``structured`` on, CSV, JSON and JSON Lines files are parsed and
+        each value analyzed on its own, with its column or key name as context
+        words for Presidio; entities name the ``field`` they were found in
+        (and the JSON ``path``). At most ``field_sample`` values of each field
+        are analyzed, and with ``classify_after`` set, a field is no longer
+        analyzed once that many of its values held the same entity type.
+        Files that fail to parse are analyzed as plain text.
+
+        With ``archives`` on, gzip, bzip2, xz and Zstandard files are
+        decompressed as they are read, and ``analyze_files`` reports each
+        member of zip and tar archives as ``archive!member``; see
+        ``iter_archive``. Nothing is extracted to disk.
+
+        With ``first_match``, pattern recognizers run before NER, and NER only
+        on texts they found nothing in. A file's analysis stops at the first
+        chunk or structured value with a finding, so its result says whether
+        it holds PII but may not list every entity; see ``contains_pii``.
+
+        Entities scoring below ``min_score`` are dropped. Overlapping entities
+        found in the same text are resolved by the ``overlaps`` policy, one of
+        ``OVERLAP_POLICIES``: ``"keep"`` (the default) reports them all,
+        ``"score"`` and ``"longest"`` keep the highest scoring or longest
+        entity of overlapping ones, and ``"merge"`` joins entities of a type
+        that overlap or are only separated by spaces.
+
+        With ``collect_stats``, time spent in each scan stage and Presidio
+        recognizer, and counts of files, bytes and entities, are gathered in
+        ``stats``; see ``ScanStats``.
+
+        With ``load_model`` off, the spaCy model is only loaded once the
+        detector analyzes text itself, so one that hands all its files to
+        worker processes never loads it. Workers always load it up front.
+        """
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError(
+                "chunk_overlap must be at least 0 and less than chunk_size"
+            )
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if oversize not in OVERSIZE_POLICIES:
+            raise ValueError(f"oversize must be one of: {', '.join(OVERSIZE_POLICIES)}")
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+        if context_width < 0:
+            raise ValueError("context_width must be at least 0")
+        if field_sample is not None and field_sample < 1:
+            raise ValueError("field_sample must be at least 1")
+        if classify_after is not None and classify_after < 1:
+            raise ValueError("classify_after must be at least 1")
+        if not 0 <= min_score <= 1:
+            raise ValueError("min_score must be between 0 and 1")
+        if overlaps not in OVERLAP_POLICIES:
+            raise ValueError(f"overlaps must be one of: {', '.join(OVERLAP_POLICIES)}")
+        if model is not None and mode != "full":
+            raise ValueError("model is only used in full mode")
+        if disabled_components is None:
+            disabled_components = DEFAULT_DISABLED_COMPONENTS
+        if "ner" in disabled_components:
+            raise ValueError("the ner component cannot be disabled")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        self.mode = mode
+        self.prefilter = prefilter
+        self.max_file_size = max_file_size
+        self.oversize = oversize
+        self.context_width = context_width
+        self.structured = structured
+        self.field_sample = field_sample
+        self.classify_after = classify_after
+        self.archives = archives
+        self.first_match = first_match
+        self.min_score = min_score
+        self.overlaps = overlaps
+        self.model = (model or DEFAULT_MODEL) if mode == "full" else None
+        self.disabled_components = (
+            sorted(set(disabled_components)) if self.model is not None else []
+        )
+
+        # Constructor arguments, kept so worker processes and the scan daemon
+        # can build or check for an equivalent detector
+        self._options: Dict[str, Any] = {
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "batch_size": batch_size,
+            "cache_dir": cache_dir,
+            "cache_max_size": cache_max_size,
+            "entities": entities,
+            "exclude_entities": exclude_entities,
+            "mode": mode,
+            "model": model,
+            "disabled_components": disabled_components,
+            "prefilter": prefilter,
+            "max_file_size": max_file_size,
+            "oversize": oversize,
+            "context_width": context_width,
+            "collect_stats": collect_stats,
+            "structured": structured,
+            "field_sample": field_sample,
+            "classify_after": classify_after,
+            "archives": archives,
+            "first_match": first_match,
+            "min_score": min_score,
+            "overlaps": overlaps,
+        }
+        self.cache = ResultCache(cache_dir, cache_max_size) if cache_dir else None
+        self.stats = ScanStats() if collect_stats else None
+        self._cache_fingerprint: Optional[str] = None
+        self._passes: Optional[List[_Pass]] = None
+
+        # The analyzer starts out on a tokenizer alone, and the model is only
+        # loaded once the enabled entity types turn out to need its NER
         try:
-            # Create NLP engine configuration
-            configuration = {
-                "nlp_engine_name": "spacy",
-                "models": [{"lang_code": "en", "model_name": "en_core_web_lg"}],
-            }
+            _import_presidio()
+            self.analyzer = AnalyzerEngine(nlp_engine=_blank_nlp_engine())
+        except Exception as e:
+            self._exit_with_setup_help(e)
 
-            # Create NLP engine based on configuration
-            provider = NlpEngineProvider(nlp_configuration=configuration)
-            nlp_engine = provider.create_engine()
+        supported = list(self.analyzer.get_supported_entities(language="en"))
+        available = supported
+        if mode == "fast":
+            self._remove_ner_recognizers()
+            available = list(self.analyzer.get_supported_entities(language="en"))
+        self.entities = self._resolve_entities(
+            entities, exclude_entities, supported, available
+        )
+        self.disabled_entities = sorted(set(supported) - set(self.entities))
+        self._prune_recognizers()
+        self.batch_analyzer = BatchAnalyzerEngine(analyzer_engine=self.analyzer)
+        if self.stats is not None:
+            self._instrument_analyzer(self.stats)
+        self._model_loaded = self.model is None or not self._needs_ner()
+        if load_model:
+            self._load_model()
+        elif not self._model_loaded and not _model_installed(self.model):
+            # Downloaded, or reported missing, here rather than by each
+            # worker process at once
+            self._load_model()
 
-            # Initialize analyzer
-            self.analyzer = AnalyzerEngine(nlp_engine=nlp_engine)
+    def _load_model(self):
+        """Rebuild the analyzer on the spaCy model, if its NER is needed and
+        the model is not loaded yet"""
+        if self._model_loaded:
+            return
+        self._model_loaded = True
+        try:
+            self.analyzer = AnalyzerEngine(
+                nlp_engine=self._model_nlp_engine(), registry=self.analyzer.registry
+            )
         except Exception as e:
-            print(f"Error initializing Presidio: {e}")
-            print("Make sure you have installed the required packages and spaCy model:")
-            print("pip install -r requirements.txt")
-            print("python -m spacy download en_core_web_lg")
-            sys.exit(1)
+            self._exit_with_setup_help(e)
+        self.batch_analyzer = BatchAnalyzerEngine(analyzer_engine=self.analyzer)
+        self._passes = None
+        if self.stats is not None:
+            self._instrument_nlp_engine(self.stats)
 
-    def analyze_text(self, text: str) -> List[Dict[str, Any]]:
-        excluded_entities = ["DATE_TIME", "US_BANK_NUMBER", "US_DRIVER_LICENSE"]
-        entities = self.analyzer.get_supported_entities(language="en")
-        entities = [e for e in entities if e not in excluded_entities]
+    def _model_nlp_engine(self) -> "SpacyNlpEngine":
+        """Load the spaCy model, without its disabled components"""
+        configuration = {
+            "nlp_engine_name": "spacy",
+            "models": [{"lang_code": "en", "model_name": self.model}],
+        }
+        provider = NlpEngineProvider(
+            nlp_engines=(_pruned_spacy_nlp_engine(self.disabled_components),),
+            nlp_configuration=configuration,
+        )
+        return provider.create_engine()
 
+    def _exit_with_setup_help(self, error: Exception):
+        print(f"Error initializing Presidio: {error}")
+        print("Make sure you have installed the required packages and spaCy model:")
+        print("pip install -r requirements.txt")
+        print(f"python -m spacy download {self.model or DEFAULT_MODEL}")
+        sys.exit(1)
+
+    def _resolve_entities(
+        self,
+        entities: Optional[List[str]],
+        exclude_entities: Optional[List[str]],
+        supported: List[str],
+        available: List[str],
+    ) -> List[str]:
+        """Work out the entity types to detect, once, from the supported set"""
+        unknown = sorted(set(entities or []) - set(supported))
+        if unknown:
+            raise ValueError(f"Unsupported entity types: {', '.join(unknown)}")
+        unavailable = sorted(set(entities or []) - set(available))
+        if unavailable:
+            raise ValueError(
+                f"Entity types not detected in {self.mode} mode: "
+                f"{', '.join(unavailable)}"
+            )
+
+        selected = entities if entities is not None else available
+        excluded = (
+            exclude_entities
+            if exclude_entities is not None
+            else DEFAULT_EXCLUDED_ENTITIES
+        )
+        resolved = sorted(set(selected) - set(excluded))
+        if not resolved and (entities is not None or exclude_entities is not None):
+            raise ValueError("No entity types left to detect")
+        return resolved
+
+    def _remove_ner_recognizers(self):
+        """Remove recognizers that depend on the NLP engine's NER results"""
+        registry = self.analyzer.registry
+        registry.recognizers = [
+            recognizer
+            for recognizer in registry.recognizers
+            if not isinstance(recognizer, SpacyRecognizer)
+        ]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Describe what this detector looks for, so reports can state the
+        trade-offs of the chosen mode"""
+        return {
+            "mode": self.mode,
+            "model": self.model,
+            "disabled_components": self.disabled_components,
+            "entities": self.entities,
+            "disabled_entities": self.disabled_entities,
+        }
+
+    def _prune_recognizers(self):
+        """Remove recognizers that cannot produce any enabled entity"""
+        enabled = set(self.entities)
+        registry = self.analyzer.registry
+        registry.recognizers = [
+            recognizer
+            for recognizer in registry.recognizers
+            if enabled.intersection(recognizer.supported_entities)
+        ]
+
+    def _needs_ner(self) -> bool:
+        """Return whether any recognizer left depends on the model's NER"""
+        return any(
+            isinstance(recognizer, SpacyRecognizer)
+            for recognizer in self.analyzer.registry.recognizers
+        )
+
+    def _first_match_passes(self) -> List[_Pass]:
+        """Return the passes that find PII soonest: pattern recognizers alone,
+        on a tokenizer without a model, then NER for the entity types only
+        it detects. In fast mode the analyzer is already pattern-only."""
+        self._load_model()
+        if self._passes is None:
+            pattern_entities: Set[str] = set()
+            ner_entities: Set[str] = set()
+            for recognizer in self.analyzer.registry.recognizers:
+                if isinstance(recognizer, SpacyRecognizer):
+                    ner_entities.update(recognizer.supported_entities)
+                else:
+                    pattern_entities.update(recognizer.supported_entities)
+            ner_entities = ner_entities.intersection(self.entities) - pattern_entities
+            if not ner_entities:
+                self._passes = [
+                    _Pass(self.analyzer, self.batch_analyzer, self.entities)
+                ]
+            else:
+                analyzer = AnalyzerEngine(
+                    nlp_engine=_blank_nlp_engine(), registry=self.analyzer.registry
+                )
+                self._passes = [
+                    _Pass(
+                        analyzer,
+                        BatchAnalyzerEngine(analyzer_engine=analyzer),
+                        sorted(pattern_entities.intersection(self.entities)),
+                    ),
+                    _Pass(self.analyzer, self.batch_analyzer, sorted(ner_entities)),
+                ]
+            self._passes = [analysis for analysis in self._passes if analysis.entities]
+        return self._passes
+
+    def _instrument_analyzer(self, stats: ScanStats):
+        """Time the NLP engine and every recognizer the analyzer calls"""
+        self._instrument_nlp_engine(stats)
+        for recognizer in self.analyzer.registry.recognizers:
+            recognizer.analyze = stats.timed_recognizer(
+                recognizer.name, recognizer.analyze
+            )
+
+    def _instrument_nlp_engine(self, stats: ScanStats):
+        nlp_engine = self.analyzer.nlp_engine
+        process_batch = nlp_engine.process_batch
+        nlp_engine.process_text = stats.timed("nlp", nlp_engine.process_text)
+        nlp_engine.process_batch = lambda *args, **kwargs: stats.timed_iter(
+            "nlp", process_batch(*args, **kwargs)
+        )
+
+    def _time(self, stage: str) -> ContextManager[Any]:
+        """Time a ``with`` block as ``stage`` when collecting stats"""
+        return nullcontext() if self.stats is None else self.stats.time(stage)
+
+    def _timed_iter(self, stage: str, items: Iterable[T]) -> Iterable[T]:
+        return items if self.stats is None else self.stats.timed_iter(stage, items)
+
+    def _count(self, name: str, amount: int = 1):
+        if self.stats is not None:
+            self.stats.count(name, amount)
+
+    def _to_dicts(self, text: str, results) -> List[Dict[str, Any]]:
+        """Convert Presidio results for ``text`` to entities, dropping those
+        below ``min_score`` and resolving overlaps"""
+        results = list(results)
+        entities = resolve_overlaps(
+            [
+                {
+                    "entity_type": result.entity_type,
+                    "start": result.start,
+                    "end": result.end,
+                    "score": result.score,
+                    "text": text[result.start : result.end],
+                }
+                for result in results
+                if result.score >= self.min_score
+            ],
+            self.overlaps,
+            text,
+        )
+        if len(entities) < len(results):
+            self._count("entities_dropped", len(results) - len(entities))
+        return entities
+
+    def analyze_text(self, text: str) -> List[Dict[str, Any]]:
         """Analyze text for PII entities"""
-        results = self.analyzer.analyze(text=text, entities=entities, language="en")
-        return [
-            {
-                "entity_type": result.entity_type,
-                "start": result.start,
-                "end": result.end,
-                "score": result.score,
-                "text": text[result.start : result.end],
+        return next(self._iter_analyze_texts([text], 1))
+
+    def analyze_texts(
+        self, texts: Iterable[str], batch_size: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Analyze many texts for PII entities.
+
+        Texts are run through the spaCy pipeline in batches of ``batch_size``
+        (the detector's batch size by default), which amortizes the per-call
+        overhead across many short documents. Results are returned in the same
+        order as ``texts``.
+        """
+        return list(self._iter_analyze_texts(texts, batch_size or self.batch_size))
+
+    def contains_pii(self, text: str, min_score: Optional[float] = None) -> bool:
+        """Return whether text holds any PII entity scoring at least
+        ``min_score`` (the detector's ``min_score`` by default). Entities
+        below the detector's own ``min_score`` never count.
+
+        Stops at the first finding. Pattern recognizers, which are cheap, run
+        first, and the NLP pipeline only runs if they found nothing and an
+        entity type left to find needs NER. To check files, build the
+        detector with ``first_match``.
+        """
+        threshold = self.min_score if min_score is None else min_score
+        if self.prefilter:
+            with self._time("prefilter"):
+                texts = [text[start:end] for start, end in candidate_regions(text)]
+        else:
+            texts = [text]
+        for analysis in self._first_match_passes():
+            for batch in _batched(texts, self.batch_size):
+                for results in self._analyze_batch(batch, analysis=analysis):
+                    if any(result["score"] >= threshold for result in results):
+                        return True
+        return False
+
+    def _iter_analyze_texts(
+        self,
+        texts: Iterable[str],
+        batch_size: int,
+        positions: bool = True,
+        context: Optional[List[str]] = None,
+        one_document: bool = False,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Analyze texts in batches. With ``positions``, entities are given
+        their line and column in the text they were found in. ``context``
+        words, if any, are passed to Presidio to raise the scores of
+        entities they suggest. With ``first_match``, texts that are all
+        parts of ``one_document`` are done once any of them has a finding."""
+        for batch in _batched(texts, batch_size):
+            if self.first_match:
+                batch_results = self._analyze_in_passes(batch, context, one_document)
+            else:
+                batch_results = self._analyze_regions(batch, context)
+            for text, results in zip(batch, batch_results):
+                # Texts without findings never need their lines indexed
+                if positions and results:
+                    add_positions(results, LineIndex(text), self.context_width)
+                yield results
+
+    def _analyze_regions(
+        self,
+        texts: List[str],
+        context: Optional[List[str]] = None,
+        analysis: Optional[_Pass] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Analyze texts together, or with ``prefilter`` only their candidate
+        regions"""
+        if not self.prefilter:
+            return list(self._analyze_batch(texts, context, analysis))
+        # Analyze only the candidate regions of each text, all together, and
+        # rebase their entities onto the text they came from
+        with self._time("prefilter"):
+            regions = [
+                (index, start, text[start:end])
+                for index, text in enumerate(texts)
+                for start, end in candidate_regions(text)
+            ]
+        texts_results: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        region_results = self._analyze_batch(
+            [region[2] for region in regions], context, analysis
+        )
+        for (index, start, _), results in zip(regions, region_results):
+            for result in results:
+                result["start"] += start
+                result["end"] += start
+            texts_results[index].extend(results)
+        return texts_results
+
+    def _analyze_in_passes(
+        self, texts: List[str], context: Optional[List[str]], one_document: bool
+    ) -> List[List[Dict[str, Any]]]:
+        """Analyze texts pass by pass (see ``_first_match_passes``), passing
+        on only the texts nothing was found in yet"""
+        texts_results: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        remaining = list(range(len(texts)))
+        for analysis in self._first_match_passes():
+            pass_results = self._analyze_regions(
+                [texts[index] for index in remaining], context, analysis
+            )
+            for index, results in zip(remaining, pass_results):
+                texts_results[index] = results
+            remaining = [index for index in remaining if not texts_results[index]]
+            if not remaining or (one_document and len(remaining) < len(texts)):
+                break
+        return texts_results
+
+    def _analyze_batch(
+        self,
+        texts: List[str],
+        context: Optional[List[str]] = None,
+        analysis: Optional[_Pass] = None,
+    ) -> Iterable[List[Dict[str, Any]]]:
+        """Run texts through the analyzer, together when there are several"""
+        self._count("characters_analyzed", sum(len(text) for text in texts))
+        return self._timed_iter(
+            "analyze", self._iter_analyzer_results(texts, context, analysis)
+        )
+
+    def _iter_analyzer_results(
+        self,
+        texts: List[str],
+        context: Optional[List[str]] = None,
+        analysis: Optional[_Pass] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Run texts through ``analysis``, or else the detector's analyzer
+        for every enabled entity type"""
+        self._load_model()
+        analyzer, batch_analyzer, entities = analysis or (
+            self.analyzer,
+            self.batch_analyzer,
+            self.entities,
+        )
+        kwargs: Dict[str, Any] = {"context": context} if context else {}
+        if len(texts) == 1:
+            results = analyzer.analyze(
+                text=texts[0], entities=entities, language="en", **kwargs
+            )
+            yield self._to_dicts(texts[0], results)
+            return
+        if not texts:
+            return
+        batch_results = batch_analyzer.analyze_iterator(
+            texts,
+            language="en",
+            batch_size=len(texts),
+            entities=entities,
+            **kwargs,
+        )
+        for text, results in zip(texts, batch_results):
+            yield self._to_dicts(text, results)
+
+    def _analyze_windows(
+        self, windows: Iterable[TextWindow], encoding: str = "utf-8"
+    ) -> List[Dict[str, Any]]:
+        """Analyze windows of a larger text, keeping only the entities each
+        window owns and rebasing their offsets onto the whole text. Windows
+        that know their byte offset in the ``encoding`` input also give their
+        entities ``byte_start`` and ``byte_end``."""
+        results = []
+        # Line and column at which the next window's owned text starts
+        line, column = 1, 1
+        windows = self._timed_iter("decode", windows)
+        # Looking for a first match, start small in case it is near the top
+        first_size = 1 if self.first_match else None
+        for batch in _batched(windows, self.batch_size, first_size):
+            self._count("windows", len(batch))
+            batch_results = self._iter_analyze_texts(
+                [window.text for window in batch],
+                self.batch_size,
+                positions=False,
+                one_document=True,
+            )
+            for window, window_results in zip(batch, batch_results):
+                owned = [
+                    result
+                    for result in window_results
+                    if window.own_start <= result["start"] < window.own_end
+                ]
+                index = LineIndex(window.text, window.own_start, line, column)
+                line, column = index.position(window.own_end)
+                add_positions(owned, index, self.context_width)
+                if window.byte_offset is not None:
+                    _add_byte_offsets(owned, window.text, encoding, window.byte_offset)
+                for result in owned:
+                    result["start"] += window.offset
+                    result["end"] += window.offset
+                results.extend(owned)
+            if self.first_match and results:
+                break
+        return results
+
+    def _structured_format(self, suffix: str, size: int) -> Optional[str]:
+        """Return how to parse a file with ``suffix`` as structured data, if it
+        should be"""
+        if not self.structured:
+            return None
+        data_format = structured_format(suffix)
+        # JSON documents are parsed whole, so oversized ones are streamed as
+        # plain text instead
+        if (
+            data_format == "json"
+            and self.max_file_size is not None
+            and size > self.max_file_size
+        ):
+            return None
+        return data_format
+
+    def _analyze_fields(self, values: Iterable[FieldValue]) -> List[Dict[str, Any]]:
+        """Analyze structured values, batched by field with the field's name
+        as context, sampling and skipping fields as configured"""
+        results: List[Dict[str, Any]] = []
+        pending: Dict[str, List[FieldValue]] = {}
+        sampled: Dict[str, int] = {}
+        # Values of each field holding each entity type
+        found: Dict[str, Dict[str, int]] = {}
+        classified: Set[str] = set()
+        indexes: Dict[int, LineIndex] = {}
+
+        def flush(field: str):
+            batch = pending.pop(field)
+            self._count("fields", len(batch))
+            batch_results = self._iter_analyze_texts(
+                [value.text for value in batch],
+                len(batch),
+                positions=False,
+                context=context_words(field),
+                one_document=True,
+            )
+            for value, entities in zip(batch, batch_results):
+                if not entities:
+                    continue
+                counts = found.setdefault(field, {})
+                for entity_type in {entity["entity_type"] for entity in entities}:
+                    counts[entity_type] = counts.get(entity_type, 0) + 1
+                    if (
+                        self.classify_after is not None
+                        and counts[entity_type] >= self.classify_after
+                    ):
+                        classified.add(field)
+                # Records are indexed once however many of their values hold PII
+                index = indexes.get(id(value.record))
+                if index is None:
+                    indexes.clear()
+                    index = LineIndex(value.record, 0, value.record_line)
+                    indexes[id(value.record)] = index
+                for entity in entities:
+                    entity["start"] = value.record_offset(entity["start"])
+                    entity["end"] = value.record_offset(entity["end"])
+                add_positions(entities, index, self.context_width)
+                for entity in entities:
+                    entity["start"] += value.record_start
+                    entity["end"] += value.record_start
+                    entity["field"] = field
+                    if value.path != field:
+                        entity["path"] = value.path
+                results.extend(entities)
+
+        for value in values:
+            field = value.field
+            count = sampled.get(field, 0)
+            if field in classified or (
+                self.field_sample is not None and count >= self.field_sample
+            ):
+                self._count("fields_skipped")
+                continue
+            sampled[field] = count + 1
+            pending.setdefault(field, []).append(value)
+            if len(pending[field]) >= self.batch_size:
+                flush(field)
+                if self.first_match and results:
+                    break
+        else:
+            for field in list(pending):
+                flush(field)
+                if self.first_match and results:
+                    break
+        results.sort(key=lambda entity: entity["start"])
+        return results
+
+    def _analyze_structured(
+        self, file_path: Path, encoding: str, data_format: str
+    ) -> List[Dict[str, Any]]:
+        with open(file_path, "r", encoding=encoding, errors="ignore", newline="") as f:
+            values = iter_values(f, data_format)
+            return self._analyze_fields(self._timed_iter("decode", values))
+
+    def _analyze_content(
+        self, text: str, data_format: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Analyze the whole decoded content of a file, parsing it as
+        ``data_format`` structured data if given"""
+        if data_format is not None:
+            try:
+                values = iter_values(io.StringIO(text, newline=""), data_format)
+                return self._analyze_fields(values)
+            except StructuredFormatError:
+                self._count("structured_fallbacks")
+        return next(self._iter_analyze_texts([text], 1))
+
+    def _analyze_stream(
+        self, name: str, stream: BinaryIO, suffix: str
+    ) -> Dict[str, Any]:
+        """Analyze decompressed content read from ``stream``, holding at most
+        about a chunk of it in memory. Content that fits in a chunk is cached
+        and, with a structured ``suffix``, parsed; longer content is analyzed
+        as plain text."""
+        try:
+            with self._time("read"):
+                head = stream.read(self.chunk_size + 1)
+            if len(head) <= self.chunk_size:
+                data_format = self._structured_format(suffix, len(head))
+                item = self._pending_content(
+                    name, head, data_format or _PLAIN_TEXT_NO_BYTE_OFFSETS
+                )
+                if item.skipped is not None:
+                    return self._skipped_result(name, item.skipped)
+                if item.entities is not None:
+                    return self._file_result(name, item.entities)
+                results = self._analyze_content(item.text, data_format)
+                if item.key is not None and self.cache is not None:
+                    with self._time("cache"):
+                        self.cache.put(item.key, results)
+                return self._file_result(name, results)
+
+            encoding = detect_encoding(head[:SNIFF_SIZE])
+            if encoding is None:
+                return self._skipped_result(name, BINARY_FILE_REASON)
+            text = io.TextIOWrapper(prefixed(head, stream), encoding, errors="ignore")
+            windows = iter_windows(text, self.chunk_size, self.chunk_overlap)
+            results = self._analyze_windows(windows)
+            self._count("bytes", stream.tell())
+            return self._file_result(name, results)
+        except Exception as e:
+            return self._error_result(name, e)
+
+    def _file_result(
+        self, file_path: Union[Path, str], results: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        self._count("files")
+        self._count("entities", len(results))
+        return {
+            "file": str(file_path),
+            "pii_found": len(results) > 0,
+            "pii_count": len(results),
+            "entities": results,
+        }
+
+    def _error_result(
+        self, file_path: Union[Path, str], error: Exception
+    ) -> Dict[str, Any]:
+        self._count("errors")
+        return {
+            "file": str(file_path),
+            "error": str(error),
+            "pii_found": False,
+            "pii_count": 0,
+            "entities": [],
+        }
+
+    def _skipped_result(
+        self, file_path: Union[Path, str], reason: str
+    ) -> Dict[str, Any]:
+        self._count("skipped_files")
+        return {
+            "file": str(file_path),
+            "skipped": reason,
+            "pii_found": False,
+            "pii_count": 0,
+            "entities": [],
+        }
+
+    def _oversize_reason(self, size: int) -> Optional[str]:
+        """Return why a file of ``size`` bytes is skipped, if it is"""
+        if (
+            self.oversize == "skip"
+            and self.max_file_size is not None
+            and size > self.max_file_size
+        ):
+            return f"file size {size} bytes exceeds limit of {self.max_file_size}"
+        return None
+
+    def _cache_key(self, content_hash: str, analysis: str = _PLAIN_TEXT) -> str:
+        """Combine a content hash with everything that affects the results,
+        including how the content is ``analysis``-ed: its structured format or
+        whether it is plain text with byte offsets"""
+        if self._cache_fingerprint is None:
+            config = {
+                "pii_detect": package_version("pii-detect"),
+                "result_format": _RESULT_FORMAT,
+                "presidio_analyzer": package_version("presidio-analyzer"),
+                "model": self.model,
+                "disabled_components": self.disabled_components,
+                "entities": self.entities,
+                "options": {
+                    name: value
+                    for name, value in self._options.items()
+                    if name not in RESULT_NEUTRAL_OPTIONS
+                },
             }
-            for result in results
-        ]
+            self._cache_fingerprint = fingerprint(config)
+        return f"{self._cache_fingerprint}:{analysis}:{content_hash}"
 
     def analyze_file(self, file_path: Path) -> Dict[str, Any]:
         """Analyze a single file for PII"""
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
+            with self._time("read"):
+                size = file_path.stat().st_size
+                reason = self._oversize_reason(size)
+                if reason is not None:
+                    return self._skipped_result(file_path, reason)
+            if self._compression(file_path) is not None:
+                with open_compressed(file_path) as stream:
+                    return self._analyze_stream(
+                        str(file_path), stream, inner_suffix(file_path.name)
+                    )
+            with self._time("read"):
+                with open(file_path, "rb") as f:
+                    encoding = detect_encoding(f.read(SNIFF_SIZE))
+            if encoding is None:
+                return self._skipped_result(file_path, BINARY_FILE_REASON)
 
-            results = self.analyze_text(content)
+            data_format = self._structured_format(file_path.suffix, size)
+            key = None
+            if self.cache is not None:
+                with self._time("cache"):
+                    key = self._cache_key(
+                        hash_file(file_path), data_format or _PLAIN_TEXT
+                    )
+                    cached = self.cache.get(key)
+                if cached is not None:
+                    self._count("cache_hits")
+                    return self._file_result(file_path, cached)
+            self._count("bytes", size)
 
-            return {
-                "file": str(file_path),
-                "pii_found": len(results) > 0,
-                "pii_count": len(results),
-                "entities": results,
-            }
+            results = None
+            if data_format is not None:
+                try:
+                    results = self._analyze_structured(file_path, encoding, data_format)
+                except StructuredFormatError:
+                    # Not what its name suggests, so analyzed as plain text
+                    self._count("structured_fallbacks")
+            if results is None:
+                results = self._analyze_text_file(file_path, encoding, size)
+
+            if key is not None and self.cache is not None:
+                with self._time("cache"):
+                    self.cache.put(key, results)
+            return self._file_result(file_path, results)
         except Exception as e:
-            return {
-                "file": str(file_path),
-                "error": str(e),
-                "pii_found": False,
-                "pii_count": 0,
-                "entities": [],
-            }
+            return self._error_result(file_path, e)
+
+    def _analyze_text_file(
+        self, file_path: Path, encoding: str, size: int
+    ) -> List[Dict[str, Any]]:
+        if encoding in MAPPABLE_ENCODINGS and size > 0:
+            # Decode one window at a time straight from the page cache
+            with open(file_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    windows = iter_mapped_windows(
+                        data,
+                        encoding,
+                        self.chunk_size,
+                        self.chunk_overlap,
+                        fileno=f.fileno(),
+                    )
+                    return self._analyze_windows(windows, encoding)
+        with open(file_path, "r", encoding=encoding, errors="ignore") as f:
+            windows = iter_windows(f, self.chunk_size, self.chunk_overlap)
+            return self._analyze_windows(windows)
+
+    def _read_small_file(self, file_path: Path) -> _PendingFile:
+        """Read a file for batched analysis, answering from the cache if
+        possible"""
+        try:
+            with self._time("read"):
+                with open(file_path, "rb") as f:
+                    content = f.read()
+            return self._pending_content(file_path, content, _PLAIN_TEXT)
+        except Exception as e:
+            return _PendingFile(file_path, "", None, None, e)
+
+    def _pending_content(
+        self, file_path: Union[Path, str], content: bytes, analysis: str
+    ) -> _PendingFile:
+        """Decode a file's content for analysis, answering from the cache of
+        results for content analyzed as ``analysis`` if possible"""
+        encoding = detect_encoding(content[:SNIFF_SIZE])
+        if encoding is None:
+            return _PendingFile(file_path, "", None, None, None, BINARY_FILE_REASON)
+        key = None
+        if self.cache is not None:
+            with self._time("cache"):
+                key = self._cache_key(hash_bytes(content), analysis)
+                cached = self.cache.get(key)
+            if cached is not None:
+                self._count("cache_hits")
+                return _PendingFile(file_path, "", key, cached, None)
+        self._count("bytes", len(content))
+        with self._time("decode"):
+            text = content.decode(encoding, errors="ignore")
+        return _PendingFile(file_path, text, key, None, None, None, encoding)
+
+    def _compression(self, file_path: Path) -> Optional[str]:
+        return compression(file_path.name) if self.archives else None
+
+    def _archive_format(self, file_path: Path) -> Optional[str]:
+        return archive_format(file_path.name) if self.archives else None
+
+    def _flush_pending(self, pending: List[_PendingFile]) -> Iterator[Dict[str, Any]]:
+        """Analyze the pending files in one batch, yielding their results in
+        order, and empty the list"""
+        to_analyze = [
+            p
+            for p in pending
+            if p.entities is None and p.error is None and p.skipped is None
+        ]
+        batch_results = self._iter_analyze_texts(
+            [p.text for p in to_analyze], self.batch_size
+        )
+        analyzed = {}
+        for item, results in zip(to_analyze, batch_results):
+            if item.encoding in MAPPABLE_ENCODINGS:
+                bom = len(codecs.BOM_UTF8) if item.encoding == "utf-8-sig" else 0
+                _add_byte_offsets(results, item.text, item.encoding, bom)
+            analyzed[id(item)] = results
+            if item.key is not None and self.cache is not None:
+                with self._time("cache"):
+                    self.cache.put(item.key, results)
+        for item in pending:
+            if item.error is not None:
+                yield self._error_result(item.path, item.error)
+            elif item.skipped is not None:
+                yield self._skipped_result(item.path, item.skipped)
+            elif item.entities is not None:
+                yield self._file_result(item.path, item.entities)
+            else:
+                yield self._file_result(item.path, analyzed[id(item)])
+        pending.clear()
+
+    def iter_archive(
+        self, archive_path: Path, extensions: Optional[Iterable[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Analyze the members of a zip or tar archive, yielding a result for
+        each, named ``archive!member``.
+
+        Members are decompressed as they are read and never written to disk;
+        tar archives are read in one pass. Only members with a suffix in
+        ``extensions``, with or without a compression suffix, are analyzed
+        (all members by default). Small members are analyzed together in
+        batches, and the size limit applies to each member's uncompressed
+        size. An archive that cannot be read ends with an error result for
+        the archive itself.
+        """
+        pending: List[_PendingFile] = []
+        self._count("archives")
+        try:
+            for member in iter_members(archive_path):
+                if extensions is not None and not matches_extensions(
+                    member.name, extensions
+                ):
+                    continue
+                name = f"{archive_path}{MEMBER_SEPARATOR}{member.name}"
+                reason = member.skipped
+                if reason is None and member.size is not None:
+                    reason = self._oversize_reason(member.size)
+                if reason is not None:
+                    pending.append(_PendingFile(name, "", None, None, None, reason))
+                elif (
+                    member.size is not None
+                    and member.size <= self.chunk_size
+                    and compression(member.name) is None
+                    and self._structured_format(inner_suffix(member.name), member.size)
+                    is None
+                ):
+                    try:
+                        with self._time("read"):
+                            content = member.stream.read()
+                        # Offsets within a member cannot be used to seek in the
+                        # archive, so no byte offsets are reported
+                        item = self._pending_content(
+                            name, content, _PLAIN_TEXT_NO_BYTE_OFFSETS
+                        )
+                        pending.append(item._replace(encoding=None))
+                    except Exception as e:
+                        pending.append(_PendingFile(name, "", None, None, e))
+                else:
+                    yield from self._flush_pending(pending)
+                    with decompress(member.stream, member.name) as stream:
+                        yield self._analyze_stream(
+                            name, stream, inner_suffix(member.name)
+                        )
+                if len(pending) >= self.batch_size:
+                    yield from self._flush_pending(pending)
+        except Exception as e:
+            yield from self._flush_pending(pending)
+            yield self._error_result(archive_path, e)
+        yield from self._flush_pending(pending)
+
+    def analyze_files(
+        self,
+        file_paths: Iterable[Path],
+        workers: int = 1,
+        extensions: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Analyze files for PII, yielding one result per file in order.
+
+        Files small enough to fit in a single chunk are read whole and analyzed
+        together in batches; larger files are streamed through
+        ``analyze_file``. Archives yield a result per member with a suffix in
+        ``extensions`` (every member by default); see ``iter_archive``. With
+        ``workers`` greater than one, files are analyzed in a pool of worker
+        processes that each load their own Presidio analyzer.
+        """
+        if workers > 1:
+            factory = partial(PIIDetector, **self._options)
+            on_stats = None if self.stats is None else self.stats.merge
+            analyze = partial(
+                _analyze_in_worker,
+                extensions=None if extensions is None else list(extensions),
+            )
+            yield from iter_files_parallel(
+                file_paths, workers, factory, on_stats=on_stats, analyze=analyze
+            )
+            return
+
+        pending: List[_PendingFile] = []
+        for file_path in file_paths:
+            if self._archive_format(file_path) is not None:
+                yield from self._flush_pending(pending)
+                yield from self.iter_archive(file_path, extensions)
+                continue
+
+            try:
+                with self._time("read"):
+                    size = file_path.stat().st_size
+            except OSError as e:
+                pending.append(_PendingFile(file_path, "", None, None, e))
+                continue
+
+            reason = self._oversize_reason(size)
+            if reason is not None:
+                pending.append(_PendingFile(file_path, "", None, None, None, reason))
+                continue
+            # Structured and compressed files are analyzed by analyze_file
+            # whatever their size
+            small = (
+                size <= self.chunk_size
+                and self._structured_format(file_path.suffix, size) is None
+                and self._compression(file_path) is None
+            )
+
+            if not small:
+                yield from self._flush_pending(pending)
+                yield self.analyze_file(file_path)
+                continue
+
+            pending.append(self._read_small_file(file_path))
+            if len(pending) >= self.batch_size:
+                yield from self._flush_pending(pending)
+
+        yield from self._flush_pending(pending)
+
+    def iter_directory(
+        self,
+        directory_path: Path,
+        extensions: List[str] = DEFAULT_EXTENSIONS,
+        workers: int = 1,
+        exclude: Iterable[str] = (),
+        use_ignore_files: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """Analyze all text files in a directory for PII, yielding each file's
+        result as soon as it is ready.
+
+        Files are analyzed while the directory is still being walked. Paths
+        matching ``exclude`` patterns, or ignored by ``.gitignore`` and
+        ``.piiignore`` files when ``use_ignore_files`` is set, are skipped.
+        With ``archives`` on, compressed files such as ``app.log.gz`` are
+        matched by the suffix under their compression suffix, and the members
+        of every archive by their own suffixes.
+        """
+        if not self.archives:
+            file_paths = iter_files(
+                directory_path, extensions, exclude, use_ignore_files
+            )
+            return self.analyze_files(self._timed_iter("walk", file_paths), workers)
+
+        file_paths = (
+            file_path
+            for file_path in iter_files(
+                directory_path,
+                [*extensions, *CONTAINER_SUFFIXES],
+                exclude,
+                use_ignore_files,
+            )
+            if archive_format(file_path.name) is not None
+            or matches_extensions(file_path.name, extensions)
+        )
+        return self.analyze_files(
+            self._timed_iter("walk", file_paths), workers, extensions
+        )
 
     def analyze_directory(
         self,
         directory_path: Path,
-        extensions: List[str] = [".txt", ".md", ".py", ".js", ".json", ".csv", ".log"],
+        extensions: List[str] = DEFAULT_EXTENSIONS,
+        workers: int = 1,
+        exclude: Iterable[str] = (),
+        use_ignore_files: bool = True,
     ) -> List[Dict[str, Any]]:
-        """Analyze all text files in a directory for PII"""
-        results = []
+        """Analyze all text files in a directory for PII.
 
-        for file_path in directory_path.rglob("*"):
-            if file_path.is_file() and file_path.suffix.lower() in extensions:
-                result = self.analyze_file(file_path)
-                results.append(result)
+        With ``workers`` greater than one, files are analyzed in a pool of
+        worker processes that each load their own Presidio analyzer.
+        """
+        return list(
+            self.iter_directory(
+                directory_path, extensions, workers, exclude, use_ignore_files
+            )
+        )
 
-        return results
+    def iter_stream(
+        self,
+        lines: Iterable[str],
+        name: str = "-",
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ) -> Iterator[Dict[str, Any]]:
+        """Analyze lines as they arrive from a pipe or a followed file,
+        yielding a result named ``name`` for each batch of lines with PII.
+
+        Lines are analyzed in batches of up to ``chunk_size`` characters, and
+        no line waits more than ``max_delay`` seconds for its batch to fill.
+        Entity offsets, lines and columns are relative to the whole stream.
+        """
+        for batch in iter_line_batches(lines, self.chunk_size, max_delay):
+            self._count("stream_batches")
+            results = next(self._iter_analyze_texts([batch.text], 1, positions=False))
+            if not results:
+                continue
+            add_positions(
+                results, LineIndex(batch.text, 0, batch.line), self.context_width
+            )
+            for result in results:
+                result["start"] += batch.offset
+                result["end"] += batch.offset
+            self._count("entities", len(results))
+            yield {
+                "file": name,
+                "pii_found": True,
+                "pii_count": len(results),
+                "entities": results,
+            }
+
+
+def _add_byte_offsets(
+    entities: List[Dict[str, Any]], text: str, encoding: str, base: int = 0
+):
+    """Give entities found in ``text``, which starts at byte ``base`` of the
+    ``encoding`` input, their byte positions as well.
+
+    Positions are exact for validly encoded input; undecodable bytes dropped
+    while reading are not counted.
+    """
+    positions = [entity[key] for entity in entities for key in ("start", "end")]
+    offsets = byte_offsets(text, positions, encoding)
+    for entity in entities:
+        entity["byte_start"] = base + offsets[entity["start"]]
+        entity["byte_end"] = base + offsets[entity["end"]]
+
+
+def _analyze_in_worker(
+    detector: PIIDetector, file_path: Path, extensions: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """Analyze one file, or each member of an archive, in a worker process"""
+    if detector._archive_format(file_path) is not None:
+        return list(detector.iter_archive(file_path, extensions))
+    return [detector.analyze_file(file_path)]
+
+
+def _import_presidio():
+    """Import Presidio and spaCy into this module, leaving alone any names
+    already set, such as test doubles"""
+    module_globals = globals()
+    for name, (module_name, attribute) in _LAZY_IMPORTS.items():
+        if name not in module_globals:
+            module = importlib.import_module(module_name)
+            module_globals[name] = getattr(module, attribute) if attribute else module
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_IMPORTS:
+        _import_presidio()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _blank_nlp_engine() -> "SpacyNlpEngine":
+    """Return an NLP engine that only tokenizes, without loading a model"""
+    nlp_engine = SpacyNlpEngine(models=[{"lang_code": "en", "model_name": "blank"}])
+    nlp_engine.nlp = {"en": spacy.blank("en")}
+    return nlp_engine
+
+
+def _model_installed(name: str) -> bool:
+    """Return whether a spaCy model is installed as a package or directory,
+    without loading it"""
+    return spacy.util.is_package(name) or Path(name).is_dir()
+
+
+def _pruned_spacy_nlp_engine(exclude: List[str]) -> type:
+    """Return a spaCy NLP engine class that loads its models without the
+    ``exclude`` components, saving their load time and per-document cost"""
+
+    class PrunedSpacyNlpEngine(SpacyNlpEngine):
+        def load(self):
+            # The same steps as Presidio's own load, which also checks the
+            # model settings and downloads a model that is not installed
+            self._enable_gpu()
+            self.nlp = {}
+            for model in self.models:
+                self._validate_model_params(model)
+                self._download_spacy_model_if_needed(model["model_name"])
+                self.nlp[model["lang_code"]] = spacy.load(
+                    model["model_name"], exclude=exclude
+                )
+
+    return PrunedSpacyNlpEngine
+
+
+def _batched(
+    items: Iterable[Any], size: int, first_size: Optional[int] = None
+) -> Iterator[List[Any]]:
+    """Group items into lists of at most ``size``. With ``first_size``, the
+    first list holds at most that many and each list after it twice as many,
+    up to ``size``."""
+    batch: List[Any] = []
+    limit = min(first_size or size, size)
+    for item in items:
+        batch.append(item)
+        if len(batch) >= limit:
+            yield batch
+            batch = []
+            limit = min(limit * 2, size)
+    if batch:
+        yield batch
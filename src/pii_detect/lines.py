@@ -0,0 +1,55 @@
+"""
+Line positions for PII detection results
+Indexes the line starts of a text once, so every entity found in it can be
+given a line, column and context snippet with a binary search
+"""
+
+import bisect
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class LineIndex:
+    """Maps character offsets in ``text`` to 1-based lines and columns.
+
+    Only the part of ``text`` from ``start`` on is indexed, and the character
+    at ``start`` is at ``line`` and ``column`` of the whole document, so a
+    window of a larger text can be indexed without the text before it.
+    """
+
+    def __init__(self, text: str, start: int = 0, line: int = 1, column: int = 1):
+        self.text = text
+        self.line = line
+        self._starts: List[int] = [start - column + 1]
+        newline = text.find("\n", start)
+        while newline != -1:
+            self._starts.append(newline + 1)
+            newline = text.find("\n", newline + 1)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Return the line and column of the character at ``offset``"""
+        index = bisect.bisect_right(self._starts, offset) - 1
+        return self.line + index, offset - self._starts[index] + 1
+
+    def context(self, start: int, end: int, width: int) -> str:
+        """Return ``text[start:end]`` with up to ``width`` characters either
+        side, without crossing the start or end of its lines"""
+        line_start = self._starts[bisect.bisect_right(self._starts, start) - 1]
+        line_end = self.text.find("\n", end)
+        if line_end == -1:
+            line_end = len(self.text)
+        return self.text[max(start - width, line_start, 0) : min(end + width, line_end)]
+
+
+def add_positions(
+    entities: Iterable[Dict[str, Any]], index: LineIndex, context_width: int = 0
+):
+    """Give entities, whose offsets are in ``index.text``, a ``line`` and
+    ``column`` (and ``end_line``/``end_column``), plus a ``context`` snippet
+    when ``context_width`` is positive"""
+    for entity in entities:
+        entity["line"], entity["column"] = index.position(entity["start"])
+        entity["end_line"], entity["end_column"] = index.position(entity["end"])
+        if context_width > 0:
+            entity["context"] = index.context(
+                entity["start"], entity["end"], context_width
+            )
@@ -0,0 +1,153 @@
+"""
+Streaming output formats for PII detection results
+Writes each file's result as soon as it is available, so output starts before
+a scan finishes and memory does not grow with the number of findings
+"""
+
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+from .stats import ScanStats
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_URI = "https://github.com/adaptivekind/pii-detect"
+
+
+def write_ndjson(
+    results: Iterable[Dict[str, Any]],
+    stream: IO[str],
+    stats: Optional[ScanStats] = None,
+):
+    """Write one JSON object per file result, one per line, then a final
+    ``{"stats": ...}`` line if ``stats`` are given"""
+    for result in results:
+        stream.write(json.dumps(result) + "\n")
+        stream.flush()
+    if stats is not None:
+        stream.write(json.dumps({"stats": stats.to_dict()}) + "\n")
+        stream.flush()
+
+
+def _sarif_result(result: Dict[str, Any], entity: Dict[str, Any]) -> Dict[str, Any]:
+    # The matched text itself is left out so SARIF reports uploaded to code
+    # scanning services do not copy the PII they flag
+    region: Dict[str, Any] = {
+        "startLine": entity["line"],
+        "startColumn": entity["column"],
+        "endLine": entity["end_line"],
+        "endColumn": entity["end_column"],
+        "charOffset": entity["start"],
+        "charLength": entity["end"] - entity["start"],
+    }
+    return {
+        "ruleId": entity["entity_type"],
+        "level": "warning",
+        "message": {
+            "text": f"Possible {entity['entity_type']} "
+            f"(confidence: {entity['score']:.2f})"
+        },
+        "locations": [
+            {
+                "physicalLocation": {
+                    "artifactLocation": {"uri": Path(result["file"]).as_posix()},
+                    "region": region,
+                }
+            }
+        ],
+        "properties": {
+            "score": entity["score"],
+            **{key: entity[key] for key in ("field", "path") if key in entity},
+        },
+    }
+
+
+def _notification(result: Dict[str, Any], level: str, text: str) -> Dict[str, Any]:
+    return {
+        "level": level,
+        "message": {"text": text},
+        "locations": [
+            {
+                "physicalLocation": {
+                    "artifactLocation": {"uri": Path(result["file"]).as_posix()}
+                }
+            }
+        ],
+    }
+
+
+def write_sarif(
+    results: Iterable[Dict[str, Any]],
+    stream: IO[str],
+    tool_version: str = "",
+    metadata: Optional[Dict[str, Any]] = None,
+    stats: Optional[ScanStats] = None,
+):
+    """Write results as a SARIF 2.1.0 log.
+
+    Findings are written as they arrive. The rule list and any file errors are
+    only known at the end, so they follow the results in the document. Files
+    that were skipped are reported as notes.
+    ``metadata`` about the detector, and ``stats`` gathered during the scan,
+    are recorded in the run's properties.
+    """
+    stream.write(
+        f'{{"version": "{SARIF_VERSION}", "$schema": "{SARIF_SCHEMA}", '
+        '"runs": [{"results": ['
+    )
+    rules: Dict[str, Dict[str, Any]] = {}
+    notifications: List[Dict[str, Any]] = []
+    first = True
+    for result in results:
+        if result.get("error"):
+            notifications.append(_notification(result, "error", result["error"]))
+            continue
+        if result.get("skipped"):
+            notifications.append(
+                _notification(result, "note", f"Skipped: {result['skipped']}")
+            )
+            continue
+        for entity in result.get("entities", []):
+            rules.setdefault(
+                entity["entity_type"],
+                {
+                    "id": entity["entity_type"],
+                    "shortDescription": {
+                        "text": f"Personally identifiable information: "
+                        f"{entity['entity_type']}"
+                    },
+                },
+            )
+            stream.write(
+                ("" if first else ", ") + json.dumps(_sarif_result(result, entity))
+            )
+            first = False
+        stream.flush()
+
+    driver: Dict[str, Any] = {
+        "name": "pii-detect",
+        "informationUri": TOOL_URI,
+        "rules": list(rules.values()),
+    }
+    if tool_version:
+        driver["version"] = tool_version
+    invocation = {
+        "executionSuccessful": True,
+        "toolExecutionNotifications": notifications,
+    }
+    run_properties = dict(metadata or {})
+    if stats is not None:
+        run_properties["stats"] = stats.to_dict()
+    properties = (
+        ', "properties": ' + json.dumps(run_properties) if run_properties else ""
+    )
+    stream.write(
+        '], "tool": '
+        + json.dumps({"driver": driver})
+        + ', "invocations": '
+        + json.dumps([invocation])
+        + properties
+        + "}]}\n"
+    )
+    stream.flush()
@@ -0,0 +1,100 @@
+"""
+Overlap resolution for PII detection results
+Resolves entities whose spans overlap, such as a URL inside an email address,
+in one sweep over the entities sorted by where they start
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# "keep" reports every entity. "score" keeps the highest scoring entity of
+# overlapping ones, and "longest" the longest. "merge" joins entities of the
+# same type that overlap or are separated only by spaces, such as a name found
+# in two parts.
+OVERLAP_POLICIES = ["keep", "score", "longest", "merge"]
+DEFAULT_OVERLAP_POLICY = "keep"
+
+Entity = Dict[str, Any]
+
+
+def _length(entity: Entity) -> int:
+    return entity["end"] - entity["start"]
+
+
+def _by_score(entity: Entity) -> Tuple[float, int, int]:
+    return -entity["score"], -_length(entity), entity["start"]
+
+
+def _by_length(entity: Entity) -> Tuple[int, float, int]:
+    return -_length(entity), -entity["score"], entity["start"]
+
+
+_PRIORITIES: Dict[str, Callable[[Entity], Tuple[Any, ...]]] = {
+    "score": _by_score,
+    "longest": _by_length,
+}
+
+
+def resolve_overlaps(entities: List[Entity], policy: str, text: str) -> List[Entity]:
+    """Resolve overlapping ``entities`` found in ``text`` by ``policy``, one of
+    ``OVERLAP_POLICIES``. Entities are returned in order of their start."""
+    if policy == "keep" or len(entities) < 2:
+        return entities
+    ordered = sorted(entities, key=lambda entity: (entity["start"], -entity["end"]))
+    if policy == "merge":
+        return _merge(ordered, text)
+    priority = _PRIORITIES[policy]
+    resolved: List[Entity] = []
+    for group in _overlapping_groups(ordered):
+        resolved.extend(_select(group, priority) if len(group) > 1 else group)
+    return resolved
+
+
+def _overlapping_groups(ordered: List[Entity]) -> Iterator[List[Entity]]:
+    """Split entities sorted by start into runs in which each entity overlaps
+    an earlier one of the run"""
+    group: List[Entity] = []
+    end = 0
+    for entity in ordered:
+        if group and entity["start"] >= end:
+            yield group
+            group = []
+        group.append(entity)
+        end = max(end, entity["end"])
+    if group:
+        yield group
+
+
+def _select(
+    group: List[Entity], priority: Callable[[Entity], Tuple[Any, ...]]
+) -> List[Entity]:
+    """Keep entities of a group best first, leaving out any that overlap an
+    entity already kept"""
+    kept: List[Entity] = []
+    for entity in sorted(group, key=priority):
+        if all(
+            entity["end"] <= other["start"] or other["end"] <= entity["start"]
+            for other in kept
+        ):
+            kept.append(entity)
+    kept.sort(key=lambda entity: entity["start"])
+    return kept
+
+
+def _merge(ordered: List[Entity], text: str) -> List[Entity]:
+    merged: List[Entity] = []
+    # The last merged entity of each type
+    last: Dict[str, Entity] = {}
+    for entity in ordered:
+        previous = last.get(entity["entity_type"])
+        if previous is not None and (
+            entity["start"] <= previous["end"]
+            or not text[previous["end"] : entity["start"]].strip(" \t")
+        ):
+            previous["end"] = max(previous["end"], entity["end"])
+            previous["score"] = max(previous["score"], entity["score"])
+            previous["text"] = text[previous["start"] : previous["end"]]
+            continue
+        entity = dict(entity)
+        last[entity["entity_type"]] = entity
+        merged.append(entity)
+    return merged
@@ -0,0 +1,173 @@
+"""
+Process-pool scanning for PIIDetector
+Fans files out to worker processes that each build their own detector once
+"""
+
+import multiprocessing
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+Analyze = Callable[[Any, Path], List[Dict[str, Any]]]
+
+
+def _analyze_file(detector, file_path: Path) -> List[Dict[str, Any]]:
+    return [detector.analyze_file(file_path)]
+
+
+def _worker_main(conn, factory: Callable[[], Any], analyze: Analyze):
+    """Build a detector once, then analyze files sent over the pipe until told
+    to stop"""
+    detector = factory()
+    stats = getattr(detector, "stats", None)
+    conn.send(("ready", None))
+    while True:
+        file_path = conn.recv()
+        if file_path is None:
+            break
+        results = analyze(detector, file_path)
+        if stats is not None:
+            conn.send(("stats", stats.pop()))
+        conn.send(("result", results))
+    conn.close()
+
+
+def _crash_result(file_path: Path, exitcode: Optional[int]) -> Dict[str, Any]:
+    return {
+        "file": str(file_path),
+        "error": f"worker process crashed (exit code {exitcode})",
+        "pii_found": False,
+        "pii_count": 0,
+        "entities": [],
+    }
+
+
+class _Worker:
+    """A single worker process and the pipe used to talk to it"""
+
+    def __init__(self, context, factory: Callable[[], Any], analyze: Analyze):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, factory, analyze), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.index: Optional[int] = None
+        self.file_path: Optional[Path] = None
+
+    def assign(self, index: int, file_path: Path):
+        self.index = index
+        self.file_path = file_path
+        try:
+            self.conn.send(file_path)
+        except (BrokenPipeError, OSError):
+            # Reported as a crash once the process sentinel fires
+            pass
+
+    def release(self):
+        self.index = None
+        self.file_path = None
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def iter_files_parallel(
+    file_paths: Iterable[Path],
+    workers: int,
+    factory: Callable[[], Any],
+    on_stats: Optional[Callable[[Dict[str, Any]], None]] = None,
+    analyze: Analyze = _analyze_file,
+) -> Iterator[Dict[str, Any]]:
+    """Analyze files across a pool of worker processes.
+
+    Results are yielded in the same order as ``file_paths``. A worker that dies
+    while analyzing a file produces an error result for that file and is
+    replaced, so one bad file cannot abort the whole scan. Workers whose
+    detector collects stats send them after each file, to ``on_stats``.
+
+    Workers call ``analyze`` with their detector and a path, which by default
+    returns the detector's ``analyze_file`` result; it may return several
+    results for one path, such as one per archive member. It must be
+    picklable, e.g. a module-level function or a ``partial`` of one.
+    """
+    context = multiprocessing.get_context()
+    pending = iter(enumerate(file_paths))
+    pool = [_Worker(context, factory, analyze) for _ in range(max(1, workers))]
+    finished: Dict[int, List[Dict[str, Any]]] = {}
+    next_index = 0
+    exhausted = False
+
+    def dispatch(worker: _Worker):
+        nonlocal exhausted
+        if exhausted or not worker.process.is_alive():
+            return
+        try:
+            index, file_path = next(pending)
+        except StopIteration:
+            exhausted = True
+            return
+        worker.assign(index, file_path)
+
+    try:
+        while True:
+            busy = [w for w in pool if w.index is not None]
+            if exhausted and not busy:
+                break
+
+            owners = {}
+            for w in pool:
+                owners[w.conn] = w
+                owners[w.process.sentinel] = w
+            for ready in wait(list(owners)):
+                worker = owners[ready]
+                if worker not in pool:
+                    # Already replaced after seeing its other handle become ready
+                    continue
+                try:
+                    if not worker.conn.poll():
+                        raise EOFError
+                    kind, payload = worker.conn.recv()
+                except (EOFError, OSError):
+                    # The process has exited without replying
+                    worker.process.join()
+                    if not worker.ready:
+                        raise RuntimeError(
+                            "PII detector worker failed to start "
+                            f"(exit code {worker.process.exitcode})"
+                        )
+                    if worker.index is not None and worker.file_path is not None:
+                        finished[worker.index] = [
+                            _crash_result(worker.file_path, worker.process.exitcode)
+                        ]
+                    worker.conn.close()
+                    pool[pool.index(worker)] = _Worker(context, factory, analyze)
+                    continue
+
+                if kind == "ready":
+                    worker.ready = True
+                elif kind == "stats":
+                    if on_stats is not None:
+                        on_stats(payload)
+                    continue
+                elif worker.index is not None:
+                    finished[worker.index] = payload
+                    worker.release()
+                if worker.index is None:
+                    dispatch(worker)
+
+            while next_index in finished:
+                yield from finished.pop(next_index)
+                next_index += 1
+    finally:
+        for worker in pool:
+            worker.stop()
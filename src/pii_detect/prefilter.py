@@ -0,0 +1,64 @@
+"""
+Cheap pre-screening for PII detection
+Finds the lines of a text that could hold PII, so the NLP pipeline only runs
+over those regions instead of every byte
+"""
+
+import re
+from typing import List, Tuple
+
+DEFAULT_CONTEXT_LINES = 2
+
+# Every entity Presidio reports has at least one of: an upper case letter
+# (names, places, IBANs), a digit (numbers, dates, addresses), an "@" (email
+# addresses) or a dotted name (URLs, domains). Lines of only lower case words
+# and punctuation cannot hold one.
+_CANDIDATE = re.compile(r"[A-ZÀ-ÖØ-Þ]|\d|@|[^\W_]\.[^\W\d_]{2}")
+
+Region = Tuple[int, int]
+
+
+def candidate_regions(
+    text: str, context_lines: int = DEFAULT_CONTEXT_LINES
+) -> List[Region]:
+    """Return the ``(start, end)`` character ranges of ``text`` worth analyzing.
+
+    Each range covers whole lines: every line that could hold PII plus up to
+    ``context_lines`` lines either side, so recognizers still see the words
+    around an entity. Overlapping or touching ranges are merged, and text
+    without any candidate lines gives no ranges at all.
+    """
+    regions: List[Region] = []
+    match = _CANDIDATE.search(text)
+    while match:
+        start = _line_start(text, match.start(), context_lines)
+        end = _line_end(text, match.start(), context_lines)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+        # Continue from the next line, whose context may reach further
+        match = _CANDIDATE.search(text, _line_end(text, match.start(), 0))
+    return regions
+
+
+def _line_start(text: str, position: int, context_lines: int) -> int:
+    """Start of the line ``context_lines`` above the one holding ``position``"""
+    start = text.rfind("\n", 0, position) + 1
+    for _ in range(context_lines):
+        if start == 0:
+            break
+        start = text.rfind("\n", 0, start - 1) + 1
+    return start
+
+
+def _line_end(text: str, position: int, context_lines: int) -> int:
+    """End, including the newline, of the line ``context_lines`` below the one
+    holding ``position``"""
+    end = position
+    for _ in range(context_lines + 1):
+        newline = text.find("\n", end)
+        if newline == -1:
+            return len(text)
+        end = newline + 1
+    return end
@@ -0,0 +1,220 @@
+"""
+Streaming text readers for PII detection
+Splits large inputs into overlapping, line-aligned windows so files can be
+analyzed with bounded memory
+"""
+
+import codecs
+import mmap
+import os
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, TextIO, Union
+
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_CHUNK_OVERLAP = 1_000
+
+# Bytes read from the start of a file to decide whether it is text
+SNIFF_SIZE = 8192
+
+# Encodings whose byte stream can be cut at a newline, or any byte that is not
+# a UTF-8 continuation byte, without splitting a character. Files in these are
+# windowed straight from a memory map.
+MAPPABLE_ENCODINGS = {"utf-8", "utf-8-sig", "latin-1"}
+
+# Control characters that turn up in ordinary text files
+_TEXT_CONTROL_BYTES = set(b"\t\n\r\f\b\x1b")
+
+
+def detect_encoding(head: bytes) -> Optional[str]:
+    """Guess the encoding of a file from its first bytes, returning None if it
+    looks binary.
+
+    A byte order mark is trusted. Otherwise NUL bytes mean binary content,
+    valid UTF-8 means UTF-8, and anything else is read as Latin-1 unless it is
+    full of control characters.
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if b"\0" in head:
+        return None
+    try:
+        # Not final, as the sample may end part way through a character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    control = sum(1 for byte in head if byte < 32 and byte not in _TEXT_CONTROL_BYTES)
+    return None if control > len(head) // 10 else "latin-1"
+
+
+class TextWindow(NamedTuple):
+    """A slice of a larger text.
+
+    ``offset`` is the absolute position of ``text`` in the whole input.
+    Entities are reported by the window that owns their start position,
+    ``own_start <= start < own_end`` (relative to ``text``), so an entity
+    inside an overlap is reported exactly once. ``byte_offset`` is where
+    ``text`` starts in the encoded input, when that is known.
+    """
+
+    offset: int
+    text: str
+    own_start: int
+    own_end: int
+    byte_offset: Optional[int] = None
+
+
+def iter_windows(
+    stream: TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> Iterator[TextWindow]:
+    """Yield overlapping windows of roughly ``chunk_size`` characters.
+
+    Windows end on line boundaries where possible, and each window repeats
+    about ``overlap`` characters from the end of the previous one. Ownership of
+    the overlap is split down the middle, so an entity shorter than half the
+    overlap that straddles a boundary is seen whole by the window reporting it.
+    Lines longer than ``chunk_size`` are split, keeping memory bounded.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be at least 0 and less than chunk_size")
+
+    offset = 0
+    own_start = 0
+    parts = []
+    size = 0
+    line = stream.readline(chunk_size)
+    while line:
+        parts.append(line)
+        size += len(line)
+        line = stream.readline(chunk_size)
+        if size < chunk_size or not line:
+            continue
+
+        text = "".join(parts)
+        cut = _find_cut(text, overlap)
+        tail = text[cut:]
+        own_end = cut + len(tail) // 2
+        yield TextWindow(offset, text, own_start, own_end)
+
+        offset += cut
+        own_start = own_end - cut
+        parts = [tail]
+        size = len(tail)
+
+    if parts:
+        text = "".join(parts)
+        yield TextWindow(offset, text, own_start, len(text))
+
+
+def _find_cut(text: str, overlap: int) -> int:
+    """Return where the next window should start so that it repeats at least
+    ``overlap`` characters, preferring the start of a line"""
+    desired = len(text) - overlap
+    newline = text.rfind("\n", max(0, desired - overlap), desired)
+    return newline + 1 if newline > 0 else desired
+
+
+def iter_mapped_windows(
+    data: Union[bytes, mmap.mmap],
+    encoding: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+    fileno: Optional[int] = None,
+) -> Iterator[TextWindow]:
+    """Yield overlapping windows decoded on demand from encoded ``data``.
+
+    ``data`` is typically a memory-mapped file, so only the bytes of the
+    current window are ever copied and decoded. Windows follow the same
+    ownership rules as ``iter_windows``, with sizes counted in bytes, and
+    carry their ``byte_offset`` in ``data``. ``encoding`` must be one of
+    ``MAPPABLE_ENCODINGS``.
+
+    With the ``fileno`` of the mapped file, its size is checked before each
+    window, so a file truncated while it is read ends at its new size rather
+    than faulting on pages no longer backed by the file.
+    """
+    if encoding not in MAPPABLE_ENCODINGS:
+        raise ValueError(f"cannot window {encoding} text by bytes")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be at least 0 and less than chunk_size")
+
+    codec = "latin-1" if encoding == "latin-1" else "utf-8"
+    size = len(data)
+    if fileno is not None:
+        size = min(size, os.fstat(fileno).st_size)
+    start = len(codecs.BOM_UTF8) if data[: min(size, 3)] == codecs.BOM_UTF8 else 0
+    offset = 0
+    own_start = 0
+    while start < size:
+        if fileno is not None:
+            size = min(size, os.fstat(fileno).st_size)
+            if start >= size:
+                return
+        end = _char_boundary(data, start + chunk_size, codec, size)
+        if end <= start:
+            # A chunk smaller than one character still has to make progress
+            end = _next_char(data, start, size)
+        if end >= size:
+            text = data[start:size].decode(codec, errors="ignore")
+            yield TextWindow(offset, text, own_start, len(text), start)
+            return
+
+        desired = _char_boundary(data, end - overlap, codec, size)
+        newline = data.rfind(b"\n", max(start, desired - overlap), desired)
+        cut = newline + 1 if newline > start else desired
+        if cut <= start:
+            cut = _next_char(data, start, size)
+        middle = _char_boundary(data, cut + (end - cut) // 2, codec, size)
+        head = data[start:cut].decode(codec, errors="ignore")
+        owned_tail = data[cut:middle].decode(codec, errors="ignore")
+        text = head + owned_tail + data[middle:end].decode(codec, errors="ignore")
+        yield TextWindow(offset, text, own_start, len(head) + len(owned_tail), start)
+
+        offset += len(head)
+        own_start = len(owned_tail)
+        start = cut
+
+
+def _char_boundary(
+    data: Union[bytes, mmap.mmap], position: int, codec: str, size: int
+) -> int:
+    """Move ``position`` back to the start of a character, within the first
+    ``size`` bytes of ``data``"""
+    if position >= size:
+        return size
+    if codec == "utf-8":
+        # UTF-8 continuation bytes look like 0b10xxxxxx
+        while position > 0 and data[position] & 0xC0 == 0x80:
+            position -= 1
+    return position
+
+
+def _next_char(data: Union[bytes, mmap.mmap], position: int, size: int) -> int:
+    """Return the start of the character after the one at ``position``, within
+    the first ``size`` bytes of ``data``"""
+    position += 1
+    while position < size and data[position] & 0xC0 == 0x80:
+        position += 1
+    return position
+
+
+def byte_offsets(text: str, positions: Iterable[int], encoding: str) -> Dict[int, int]:
+    """Map character positions in ``text`` to byte positions in its encoded
+    form, encoding each stretch of text only once"""
+    if encoding not in MAPPABLE_ENCODINGS:
+        raise ValueError(f"cannot map {encoding} text to bytes")
+    codec = "latin-1" if encoding == "latin-1" else "utf-8"
+    offsets = {}
+    char_position = byte_position = 0
+    for position in sorted(set(positions)):
+        byte_position += len(text[char_position:position].encode(codec))
+        char_position = position
+        offsets[position] = byte_position
+    return offsets
@@ -0,0 +1,328 @@
+"""
+HTTP scanning service for PII detection
+Serves text analysis over HTTP from a pool of warm detectors, coalescing
+concurrent requests into micro-batches, using only the standard library
+"""
+
+import asyncio
+import json
+import logging
+import time
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+
+from .async_detector import AsyncPIIDetector
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_REQUEST_SIZE = 1024 * 1024
+DEFAULT_MAX_BATCH_TEXTS = 1000
+DEFAULT_REQUEST_TIMEOUT = 30.0
+# How long an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 15.0
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+_MAX_HEADERS = 100
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    """Raised while handling a request to reply with an error status"""
+
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class LatencyHistogram:
+    """Request latencies per endpoint, in Prometheus histogram buckets"""
+
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts: Dict[str, List[int]] = {}
+        self.sums: Dict[str, float] = {}
+
+    def observe(self, endpoint: str, seconds: float):
+        counts = self.counts.setdefault(endpoint, [0] * (len(self.buckets) + 1))
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+        counts[-1] += 1
+        self.sums[endpoint] = self.sums.get(endpoint, 0.0) + seconds
+
+    def to_prometheus(self, name: str) -> List[str]:
+        lines = [f"# TYPE {name} histogram"]
+        for endpoint, counts in sorted(self.counts.items()):
+            label = f'endpoint="{endpoint}"'
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {counts[-1]}')
+            lines.append(f"{name}_sum{{{label}}} {self.sums[endpoint]:.6f}")
+            lines.append(f"{name}_count{{{label}}} {counts[-1]}")
+        return lines
+
+
+class PIIServer:
+    """Answers HTTP requests with results from an ``AsyncPIIDetector``.
+
+    ``POST /analyze`` takes ``{"text": ...}`` and returns ``{"entities":
+    [...]}``. ``POST /analyze-batch`` takes ``{"texts": [...]}`` (at most
+    ``max_batch_texts``) and returns ``{"results": [[...], ...]}``. Request
+    bodies over ``max_request_size`` bytes are refused, and analysis taking
+    longer than ``request_timeout`` seconds is answered with 504.
+
+    ``GET /healthz`` answers while the process is up, ``GET /readyz`` once
+    the detectors are loaded, and ``GET /metrics`` gives request counts and
+    latency histograms in the Prometheus text format.
+    """
+
+    def __init__(
+        self,
+        detector: AsyncPIIDetector,
+        max_request_size: int = DEFAULT_MAX_REQUEST_SIZE,
+        max_batch_texts: int = DEFAULT_MAX_BATCH_TEXTS,
+        request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+    ):
+        self.detector = detector
+        self.max_request_size = max_request_size
+        self.max_batch_texts = max_batch_texts
+        self.request_timeout = request_timeout
+        self.ready = False
+        self.latency = LatencyHistogram()
+        self.requests: Dict[Tuple[str, int], int] = {}
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> asyncio.AbstractServer:
+        """Start listening, then load the detectors. Health checks are
+        answered straight away; readiness once loading is done."""
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        try:
+            await self.detector.start()
+        except BaseException:
+            server.close()
+            raise
+        self.ready = True
+        return server
+
+    async def close(self):
+        self.ready = False
+        await self.detector.close()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request_line = await asyncio.wait_for(
+                        reader.readline(), KEEP_ALIVE_TIMEOUT
+                    )
+                except (asyncio.TimeoutError, ValueError):
+                    break
+                if not request_line.strip():
+                    break
+                keep_alive = await self._handle_request(request_line, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_request(
+        self,
+        request_line: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> bool:
+        """Read one request, write its response and return whether the
+        connection stays open"""
+        started = time.perf_counter()
+        path = "-"
+        keep_alive = False
+        try:
+            method, path, version = _parse_request_line(request_line)
+            headers = await _read_headers(reader)
+            connection = headers.get("connection", "").lower()
+            keep_alive = (
+                connection == "keep-alive"
+                if version == "HTTP/1.0"
+                else connection != "close"
+            )
+            body = await self._read_body(method, headers, reader)
+            status, payload, content_type = await self._route(method, path, body)
+        except HTTPError as e:
+            status, payload, content_type = e.status, {"error": str(e)}, None
+            # The rest of a refused request may still be unread
+            keep_alive = False
+        except Exception:
+            logger.exception("error handling %s", path)
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            payload, content_type = {"error": status.phrase}, None
+            keep_alive = False
+
+        if content_type is None:
+            data = json.dumps(payload).encode("utf-8")
+            content_type = "application/json"
+        else:
+            data = payload.encode("utf-8")
+        writer.write(
+            (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            ).encode("latin-1")
+            + data
+        )
+        await writer.drain()
+
+        endpoint = path if path in _ROUTES else "other"
+        self.latency.observe(endpoint, time.perf_counter() - started)
+        key = (endpoint, status.value)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        return keep_alive
+
+    async def _read_body(
+        self, method: str, headers: Dict[str, str], reader: asyncio.StreamReader
+    ) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(
+                HTTPStatus.NOT_IMPLEMENTED, "chunked bodies are not supported"
+            )
+        length = headers.get("content-length")
+        if length is None:
+            if method == "POST":
+                raise HTTPError(HTTPStatus.LENGTH_REQUIRED)
+            return b""
+        if not length.isdigit():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+        if int(length) > self.max_request_size:
+            raise HTTPError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"request body exceeds {self.max_request_size} bytes",
+            )
+        return await reader.readexactly(int(length))
+
+    async def _route(
+        self, method: str, path: str, body: bytes
+    ) -> Tuple[HTTPStatus, Any, Optional[str]]:
+        """Return the status, payload and, for non-JSON payloads, the content
+        type of the response"""
+        allowed = _ROUTES.get(path)
+        if allowed is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != allowed:
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        if path == "/healthz":
+            return HTTPStatus.OK, {"status": "ok"}, None
+        if path == "/readyz":
+            if not self.ready:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {"status": "loading"}, None
+            return HTTPStatus.OK, {"status": "ready"}, None
+        if path == "/metrics":
+            return HTTPStatus.OK, self.metrics(), "text/plain; version=0.0.4"
+
+        request = _parse_json(body)
+        try:
+            if path == "/analyze":
+                text = request.get("text")
+                if not isinstance(text, str):
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, '"text" must be a string')
+                entities = await self.detector.analyze_text(text, self.request_timeout)
+                return HTTPStatus.OK, {"entities": entities}, None
+
+            texts = request.get("texts")
+            if not isinstance(texts, list) or not all(
+                isinstance(text, str) for text in texts
+            ):
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST, '"texts" must be a list of strings'
+                )
+            if len(texts) > self.max_batch_texts:
+                raise HTTPError(
+                    HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                    f"at most {self.max_batch_texts} texts per batch",
+                )
+            results = await self.detector.analyze_texts(texts, self.request_timeout)
+            return HTTPStatus.OK, {"results": results}, None
+        except asyncio.TimeoutError:
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "analysis timed out")
+
+    def metrics(self) -> str:
+        """Request counts and latencies in the Prometheus text format"""
+        lines = [
+            "# TYPE pii_detect_ready gauge",
+            f"pii_detect_ready {int(self.ready)}",
+            "# TYPE pii_detect_http_requests_total counter",
+        ]
+        for (endpoint, status), count in sorted(self.requests.items()):
+            lines.append(
+                "pii_detect_http_requests_total"
+                f'{{endpoint="{endpoint}",status="{status}"}} {count}'
+            )
+        lines.extend(
+            self.latency.to_prometheus("pii_detect_http_request_duration_seconds")
+        )
+        return "\n".join(lines) + "\n"
+
+
+# Paths served, with the method each accepts
+_ROUTES = {
+    "/analyze": "POST",
+    "/analyze-batch": "POST",
+    "/healthz": "GET",
+    "/readyz": "GET",
+    "/metrics": "GET",
+}
+
+
+def _parse_request_line(line: bytes) -> Tuple[str, str, str]:
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line")
+    if version not in ("HTTP/1.0", "HTTP/1.1"):
+        raise HTTPError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED)
+    return method, target.split("?", 1)[0], version
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for _ in range(_MAX_HEADERS):
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+
+def _parse_json(body: bytes) -> Dict[str, Any]:
+    try:
+        request = json.loads(body)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "request body is not valid JSON")
+    if not isinstance(request, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+    return request
+
+
+async def serve(server: PIIServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Run ``server`` until cancelled"""
+    listener = await server.start(host, port)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,171 @@
+"""
+Scan statistics for PII detection
+Collects per-stage and per-recognizer timings and counters, so slow scans can
+be traced to traversal, I/O, decoding, the NLP pipeline or a single recognizer
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Called with a stage name and the seconds just spent in it
+StatsHook = Callable[[str, float], None]
+
+# Stages timed by the detector. "nlp" and "recognizers" are the parts of
+# "analyze" spent in the spaCy pipeline and the Presidio recognizers.
+STAGES = [
+    "walk",
+    "read",
+    "cache",
+    "decode",
+    "prefilter",
+    "analyze",
+    "nlp",
+    "recognizers",
+]
+
+RECOGNIZER_PREFIX = "recognizer:"
+
+
+class ScanStats:
+    """Timings (in seconds) and counters for a scan.
+
+    Stage timings are keyed by name, such as ``"read"`` or ``"nlp"``;
+    recognizer timings by ``"recognizer:<name>"``. Every timing recorded,
+    including those merged from worker processes, is also passed to each of
+    ``hooks``.
+    """
+
+    def __init__(self, hooks: Optional[Iterable[StatsHook]] = None):
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.hooks: List[StatsHook] = list(hooks or [])
+
+    def record(self, stage: str, seconds: float):
+        """Add ``seconds`` to the time spent in ``stage``"""
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        for hook in self.hooks:
+            hook(stage, seconds)
+
+    def count(self, name: str, amount: int = 1):
+        """Add ``amount`` to the counter ``name``"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Time the body of a ``with`` block as ``stage``"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str, function: Callable[..., T]) -> Callable[..., T]:
+        """Wrap ``function`` so each call is timed as ``stage``"""
+
+        def wrapper(*args, **kwargs):
+            with self.time(stage):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def timed_recognizer(
+        self, name: str, function: Callable[..., T]
+    ) -> Callable[..., T]:
+        """Wrap a recognizer's ``analyze`` so each call counts towards both
+        its own timing and the ``"recognizers"`` stage"""
+        stage = RECOGNIZER_PREFIX + name
+
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - started
+                self.record(stage, seconds)
+                self.record("recognizers", seconds)
+
+        return wrapper
+
+    def timed_iter(self, stage: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from ``items``, timing only the work of producing each one"""
+        iterator = iter(items)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.record(stage, time.perf_counter() - started)
+                return
+            self.record(stage, time.perf_counter() - started)
+            yield item
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the stats as plain data, for JSON output or another process"""
+        return {"timings": dict(self.timings), "counters": dict(self.counters)}
+
+    def pop(self) -> Dict[str, Any]:
+        """Return the stats as plain data and start again from zero"""
+        data = self.to_dict()
+        self.timings.clear()
+        self.counters.clear()
+        return data
+
+    def merge(self, data: Dict[str, Any]):
+        """Add stats returned by ``to_dict`` elsewhere, such as a worker"""
+        for stage, seconds in data.get("timings", {}).items():
+            self.record(stage, seconds)
+        for name, amount in data.get("counters", {}).items():
+            self.count(name, amount)
+
+    def summary(self) -> List[str]:
+        """Human-readable lines, slowest stages and recognizers first"""
+        lines = []
+        stages = {k: v for k, v in self.timings.items() if k in STAGES}
+        recognizers = {
+            k[len(RECOGNIZER_PREFIX) :]: v
+            for k, v in self.timings.items()
+            if k.startswith(RECOGNIZER_PREFIX)
+        }
+        for title, timings in [("Stage", stages), ("Recognizer", recognizers)]:
+            for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+                lines.append(f"{title} {name}: {seconds:.3f} s")
+        for name, amount in sorted(self.counters.items()):
+            lines.append(f"{name.replace('_', ' ').capitalize()}: {amount}")
+        return lines
+
+    def to_prometheus(self) -> str:
+        """Return the stats in the Prometheus text exposition format"""
+        lines = [
+            "# HELP pii_detect_stage_seconds_total Time spent in each scan stage.",
+            "# TYPE pii_detect_stage_seconds_total counter",
+        ]
+        recognizer_lines = [
+            "# HELP pii_detect_recognizer_seconds_total Time spent in each "
+            "Presidio recognizer.",
+            "# TYPE pii_detect_recognizer_seconds_total counter",
+        ]
+        for name, seconds in sorted(self.timings.items()):
+            if name.startswith(RECOGNIZER_PREFIX):
+                label = _escape(name[len(RECOGNIZER_PREFIX) :])
+                recognizer_lines.append(
+                    f'pii_detect_recognizer_seconds_total{{recognizer="{label}"}} '
+                    f"{seconds:.6f}"
+                )
+            else:
+                lines.append(
+                    f'pii_detect_stage_seconds_total{{stage="{_escape(name)}"}} '
+                    f"{seconds:.6f}"
+                )
+        lines.extend(recognizer_lines)
+        for name, amount in sorted(self.counters.items()):
+            metric = f"pii_detect_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {amount}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,298 @@
+"""
+Structured data readers for PII detection
+Streams the values of CSV rows and JSON documents with the column or key path
+they belong to, so findings can be reported, and sampled, field by field
+"""
+
+import csv
+import json
+import re
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+# File suffixes read as structured data, and the reader each uses. JSON Lines
+# files hold one JSON document per line.
+STRUCTURED_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+# Characters of a CSV file used to guess its delimiter
+CSV_SNIFF_SIZE = 64 * 1024
+
+
+class StructuredFormatError(ValueError):
+    """Raised when a file does not parse as the format its name suggests"""
+
+
+class FieldValue(NamedTuple):
+    """A value from a structured file.
+
+    ``path`` locates the value, such as a CSV column name or a JSON path like
+    ``$.users[3].email``; ``field`` is the same with array indices replaced
+    by ``*``, naming the column the value belongs to. ``record`` is the raw
+    text the value was read from (a CSV row, a JSON line or document), which
+    starts at character ``record_start`` and line ``record_line`` of the file.
+    The value's raw form starts at ``offset`` of the record, or is ``None`` if
+    it could not be found there. ``raw_offsets`` maps each offset in ``text``
+    to one in the record, relative to ``offset``, when escaping makes them
+    differ.
+    """
+
+    path: str
+    field: str
+    text: str
+    record: str
+    record_start: int
+    record_line: int
+    offset: Optional[int]
+    raw_offsets: Optional[List[int]] = None
+
+    def record_offset(self, index: int) -> int:
+        """Return where offset ``index`` of ``text`` is in ``record``"""
+        if self.offset is None:
+            return 0
+        if self.raw_offsets is None:
+            return self.offset + index
+        return self.offset + self.raw_offsets[index]
+
+
+def structured_format(suffix: str) -> Optional[str]:
+    """Return the reader for files with ``suffix``, if they are structured"""
+    return STRUCTURED_FORMATS.get(suffix.lower())
+
+
+def iter_values(stream: TextIO, data_format: str) -> Iterator[FieldValue]:
+    """Read the values of a ``"csv"``, ``"json"`` or ``"jsonl"`` stream"""
+    if data_format == "csv":
+        return iter_csv_values(stream)
+    if data_format == "jsonl":
+        return iter_jsonl_values(stream)
+    return iter_json_values(stream.read())
+
+
+def context_words(field: str) -> List[str]:
+    """Split the last name in a column or JSON path into lower case words,
+    e.g. ``$.users[*].homePhone`` into ``["home", "phone"]``"""
+    names = [name for name in re.split(r"[.\[\]\"*$]+", field) if name]
+    if not names:
+        return []
+    name = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", names[-1])
+    return [word.lower() for word in re.split(r"[^A-Za-z0-9]+", name) if word]
+
+
+class _RecordingLines:
+    """Iterates over the lines of a stream, keeping those read since the last
+    ``take`` so a CSV row's raw text can be recovered"""
+
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+        self._read: List[str] = []
+
+    def __iter__(self) -> "_RecordingLines":
+        return self
+
+    def __next__(self) -> str:
+        line = next(self._lines)
+        self._read.append(line)
+        return line
+
+    def take(self) -> str:
+        record = "".join(self._read)
+        self._read.clear()
+        return record
+
+
+def iter_csv_values(stream: TextIO) -> Iterator[FieldValue]:
+    """Read the values of a CSV stream, opened with ``newline=""``, by column.
+
+    The delimiter is guessed from the start of the stream and the first row
+    names the columns. Empty values are left out.
+    """
+    sample = stream.read(CSV_SNIFF_SIZE)
+    stream.seek(0)
+    try:
+        dialect: Any = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    quote = dialect.quotechar or '"'
+
+    lines = _RecordingLines(stream)
+    reader = csv.reader(lines, dialect)
+    header: Optional[List[str]] = None
+    record_start, record_line = 0, 1
+    try:
+        for row in reader:
+            record = lines.take()
+            if header is None:
+                header = _column_names(row)
+            else:
+                yield from _row_values(
+                    row, header, record, record_start, record_line, quote
+                )
+            record_start += len(record)
+            record_line += record.count("\n")
+    except csv.Error as e:
+        raise StructuredFormatError(f"invalid CSV on line {record_line}: {e}")
+
+
+def _column_names(header: List[str]) -> List[str]:
+    """Name columns by their header, numbering blank or repeated names"""
+    names: List[str] = []
+    for number, name in enumerate(header, 1):
+        name = name.strip()
+        if not name or name in names:
+            name = f"{name or 'column'} {number}"
+        names.append(name)
+    return names
+
+
+def _row_values(
+    row: List[str],
+    header: List[str],
+    record: str,
+    record_start: int,
+    record_line: int,
+    quote: str,
+) -> Iterator[FieldValue]:
+    cursor = 0
+    for number, value in enumerate(row, 1):
+        if not value.strip():
+            continue
+        name = header[number - 1] if number <= len(header) else f"column {number}"
+        # A quote inside a quoted value is written twice
+        raw = value.replace(quote, quote * 2)
+        offset: Optional[int] = record.find(raw, cursor)
+        raw_offsets = None
+        if offset == -1:
+            offset = None
+        else:
+            cursor = offset + len(raw)
+            if raw != value:
+                raw_offsets = _raw_offsets(value, lambda c: 2 if c == quote else 1)
+        yield FieldValue(
+            name, name, value, record, record_start, record_line, offset, raw_offsets
+        )
+
+
+def iter_jsonl_values(stream: TextIO) -> Iterator[FieldValue]:
+    """Read the values of a JSON Lines stream, one document per line, with
+    paths such as ``$[2].email`` for the third line's ``email`` key"""
+    record_start, record_line = 0, 1
+    number = 0
+    for line in stream:
+        if line.strip():
+            try:
+                document = json.loads(line)
+            except ValueError as e:
+                raise StructuredFormatError(f"invalid JSON on line {record_line}: {e}")
+            yield from _locate(
+                line,
+                _walk(document, f"$[{number}]", "$[*]"),
+                record_start,
+                record_line,
+            )
+            number += 1
+        record_start += len(line)
+        record_line += 1
+
+
+def iter_json_values(text: str) -> Iterator[FieldValue]:
+    """Read the string and integer values of a JSON document with their
+    paths, such as ``$.users[3].email``"""
+    try:
+        document = json.loads(text)
+    except ValueError as e:
+        raise StructuredFormatError(f"invalid JSON: {e}")
+    return _locate(text, _walk(document, "$", "$"), 0, 1)
+
+
+def _walk(value: Any, path: str, field: str) -> Iterator[Any]:
+    """Yield ``(path, field, text, is_string)`` for the string and integer
+    values, in document order"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            name = f".{key}" if key.isidentifier() else f"[{json.dumps(key)}]"
+            yield from _walk(item, path + name, field + name)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _walk(item, f"{path}[{index}]", f"{field}[*]")
+    elif isinstance(value, str):
+        if value.strip():
+            yield path, field, value, True
+    elif isinstance(value, int) and not isinstance(value, bool):
+        yield path, field, str(value), False
+
+
+def _locate(
+    record: str, values: Iterable[Any], record_start: int, record_line: int
+) -> Iterator[FieldValue]:
+    """Find each value's raw form in the JSON text, in document order"""
+    cursor = 0
+    for path, field, value, is_string in values:
+        offset, raw_offsets = None, None
+        found = _find_json_value(record, value, is_string, cursor)
+        if found is not None:
+            offset, ensure_ascii, length = found
+            cursor = offset + length
+            if length != len(value):
+                raw_offsets = _raw_offsets(
+                    value, lambda c: len(json.dumps(c, ensure_ascii=ensure_ascii)) - 2
+                )
+        yield FieldValue(
+            path, field, value, record, record_start, record_line, offset, raw_offsets
+        )
+
+
+def _find_json_value(
+    text: str, value: str, is_string: bool, cursor: int
+) -> Optional[Tuple[int, bool, int]]:
+    """Return the offset, escaping (``ensure_ascii``) and length of the raw
+    form of ``value`` after ``cursor``, skipping object keys and parts of
+    other values that happen to match"""
+    if not is_string:
+        offset = text.find(value, cursor)
+        while offset != -1:
+            end = offset + len(value)
+            if (offset == 0 or text[offset - 1] in _BEFORE_NUMBER) and (
+                end == len(text) or text[end] in _AFTER_NUMBER
+            ):
+                return offset, False, len(value)
+            offset = text.find(value, offset + 1)
+        return None
+
+    for ensure_ascii in (False, True):
+        raw = json.dumps(value, ensure_ascii=ensure_ascii)
+        offset = text.find(raw, cursor)
+        while offset != -1:
+            end = offset + len(raw)
+            # A string followed by a colon is an object key
+            if not text[end : end + 64].lstrip().startswith(":"):
+                return offset + 1, ensure_ascii, len(raw) - 2
+            offset = text.find(raw, offset + 1)
+    return None
+
+
+_BEFORE_NUMBER = set(" \t\r\n:[,")
+_AFTER_NUMBER = set(" \t\r\n,]}")
+
+
+def _raw_offsets(value: str, width: Callable[[str], int]) -> List[int]:
+    """Map each offset in ``value`` to one in its escaped form, where each
+    character takes ``width`` characters"""
+    offsets = [0]
+    for character in value:
+        offsets.append(offsets[-1] + width(character))
+    return offsets
@@ -0,0 +1,144 @@
+"""
+Live input reading for PII detection
+Groups lines arriving on a pipe, or appended to a growing file, into small
+batches so each line is analyzed soon after it arrives
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from queue import Empty, Queue
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Seconds a line may wait for more lines to share its batch
+DEFAULT_MAX_DELAY = 0.5
+# Seconds between checks of a followed file for new lines
+DEFAULT_POLL_INTERVAL = 0.25
+# Lines read ahead of analysis before reading pauses, so a fast producer is
+# slowed down rather than filling memory
+READ_AHEAD_LINES = 10_000
+
+# Yielded by follow_lines when a file is replaced, so positions restart
+RESTART = ""
+
+_END = object()
+
+
+class LineBatch(NamedTuple):
+    """Consecutive lines of a stream: ``text`` starts at character ``offset``
+    and on line ``line`` (1-based) of the stream"""
+
+    offset: int
+    line: int
+    text: str
+
+
+def iter_line_batches(
+    lines: Iterable[str],
+    max_chars: int,
+    max_delay: float = DEFAULT_MAX_DELAY,
+) -> Iterator[LineBatch]:
+    """Group lines from a source that may be slow or never end, such as a
+    pipe, into batches.
+
+    A batch is yielded once it holds ``max_chars`` characters, or
+    ``max_delay`` seconds after its first line arrived, whichever is sooner,
+    so a quiet stream is still analyzed promptly and a busy one in large
+    batches. Lines are read on a background thread. A ``RESTART`` line ends
+    the batch and restarts positions at the start of the stream.
+    """
+    queue: "Queue[Any]" = Queue(READ_AHEAD_LINES)
+    failure: List[BaseException] = []
+
+    def read():
+        try:
+            for line in lines:
+                queue.put(line)
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            queue.put(_END)
+
+    threading.Thread(target=read, name="pii-detect-reader", daemon=True).start()
+
+    batch: List[str] = []
+    size = 0
+    deadline = 0.0
+    offset, line_number = 0, 1
+    while True:
+        timeout = max(0.0, deadline - time.monotonic()) if batch else None
+        try:
+            line = queue.get(timeout=timeout)
+        except Empty:
+            line = None
+        if isinstance(line, str) and line:
+            if not batch:
+                deadline = time.monotonic() + max_delay
+            batch.append(line)
+            size += len(line)
+            if size < max_chars:
+                continue
+        if batch:
+            text = "".join(batch)
+            yield LineBatch(offset, line_number, text)
+            offset += len(text)
+            line_number += text.count("\n")
+            batch, size = [], 0
+        if line == RESTART:
+            offset, line_number = 0, 1
+        elif line is _END:
+            break
+    if failure:
+        raise failure[0]
+
+
+def _identity(stat: os.stat_result) -> Tuple[int, int]:
+    return stat.st_dev, stat.st_ino
+
+
+def follow_lines(
+    file_path: Path,
+    encoding: str = "utf-8",
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[str]:
+    """Yield the lines of a file, then lines as they are appended to it, like
+    ``tail -f``, until ``stop`` is set.
+
+    Only complete lines are yielded; a partly written last line waits for its
+    newline. When the file is truncated, or replaced as when a log is
+    rotated, ``RESTART`` is yielded and the new file is read from its start.
+    """
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            f = open(file_path, "rb")
+        except FileNotFoundError:
+            # Between a rotated log being moved away and its replacement
+            # being created
+            stop.wait(poll_interval)
+            continue
+        with f:
+            identity = _identity(os.fstat(f.fileno()))
+            partial = b""
+            while not stop.is_set():
+                data = f.readline()
+                if data:
+                    partial += data
+                    if partial.endswith(b"\n"):
+                        yield partial.decode(encoding, errors="ignore")
+                        partial = b""
+                    continue
+                try:
+                    current = os.stat(file_path)
+                except FileNotFoundError:
+                    current = None
+                if current is not None and (
+                    _identity(current) != identity or current.st_size < f.tell()
+                ):
+                    break
+                stop.wait(poll_interval)
+            else:
+                return
+        yield RESTART
@@ -0,0 +1,237 @@
+"""
+Directory traversal for PII detection
+Walks a tree with os.scandir, pruning directories that never hold scannable
+text and honouring .gitignore, .piiignore and exclude patterns, and yields
+files as soon as they are found
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+IGNORE_FILES = [".gitignore", ".piiignore"]
+
+# Directories skipped wherever they appear, without reading their contents
+DEFAULT_EXCLUDED_DIRS = {
+    ".git",
+    ".hg",
+    ".svn",
+    ".tox",
+    ".nox",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    "node_modules",
+}
+
+# A directory holding this file is a Python virtual environment
+_VENV_MARKER = "pyvenv.cfg"
+
+
+class IgnoreRule(NamedTuple):
+    """A single gitignore-style pattern.
+
+    ``base`` is the directory the pattern is relative to, as a path relative
+    to the walk root ("" for the root itself). ``outer`` is the walk root
+    relative to the pattern's directory, for patterns read from an ignore file
+    above the walk root.
+    """
+
+    regex: "re.Pattern[str]"
+    negate: bool
+    dir_only: bool
+    base: str = ""
+    outer: str = ""
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression"""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and pattern.find("]", i + 2) != -1:
+            end = pattern.find("]", i + 2)
+            chars = pattern[i + 1 : end].replace("\\", "\\\\")
+            if chars.startswith("!"):
+                chars = "^/" + chars[1:]
+            parts.append(f"[{chars}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+def parse_pattern(line: str, base: str = "", outer: str = "") -> Optional[IgnoreRule]:
+    """Parse one line of an ignore file, returning None for blank lines and
+    comments"""
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A pattern with a slash before its end is anchored to its directory,
+    # otherwise it matches a name at any depth
+    anchored = "/" in line
+    line = line.lstrip("/")
+    regex = _translate(line) if anchored else "(?:.*/)?" + _translate(line)
+    return IgnoreRule(re.compile(regex), negate, dir_only, base, outer)
+
+
+def _parse_patterns(patterns: Iterable[str]) -> List[IgnoreRule]:
+    rules = (parse_pattern(pattern) for pattern in patterns)
+    return [rule for rule in rules if rule is not None]
+
+
+def _read_ignore_file(
+    file_path: str, base: str = "", outer: str = ""
+) -> List[IgnoreRule]:
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    rules = [parse_pattern(line, base, outer) for line in lines]
+    return [rule for rule in rules if rule is not None]
+
+
+def is_ignored(rules: Iterable[IgnoreRule], relative: str, is_dir: bool) -> bool:
+    """Return whether the last rule matching ``relative`` (a path relative to
+    the walk root) excludes it"""
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.base:
+            path = relative[len(rule.base) + 1 :]
+        elif rule.outer:
+            path = f"{rule.outer}/{relative}"
+        else:
+            path = relative
+        if rule.regex.fullmatch(path):
+            ignored = not rule.negate
+    return ignored
+
+
+def is_excluded(patterns: Iterable[str], relative: Path) -> bool:
+    """Return whether gitignore-style ``patterns`` exclude the file at
+    ``relative``, or any directory it is in"""
+    rules = _parse_patterns(patterns)
+    parts = relative.parts
+    return any(
+        is_ignored(rules, "/".join(parts[:depth]), depth < len(parts))
+        for depth in range(1, len(parts) + 1)
+    )
+
+
+def _outer_rules(root: Path) -> List[IgnoreRule]:
+    """Rules from ignore files between the enclosing git repository's top
+    level and the walk root"""
+    resolved = root.resolve()
+    for top in [resolved, *resolved.parents]:
+        if (top / ".git").exists():
+            break
+    else:
+        return []
+    rules: List[IgnoreRule] = []
+    directory = top
+    for part in ("", *resolved.relative_to(top).parts):
+        directory = directory / part
+        if directory == resolved:
+            break
+        outer = resolved.relative_to(directory).as_posix()
+        for name in IGNORE_FILES:
+            rules.extend(_read_ignore_file(str(directory / name), outer=outer))
+    return rules
+
+
+def iter_files(
+    root: Path,
+    extensions: Optional[Iterable[str]] = None,
+    exclude: Iterable[str] = (),
+    use_ignore_files: bool = True,
+) -> Iterator[Path]:
+    """Yield the files under ``root`` whose suffix is in ``extensions``.
+
+    Well-known tool, dependency and virtual environment directories are never
+    entered. With ``use_ignore_files``, paths matched by ``.gitignore`` or
+    ``.piiignore`` files (inside ``root`` or between it and the top of its git
+    repository) are skipped. ``exclude`` holds further patterns in the same
+    syntax, relative to ``root``, that take precedence over ignore files.
+    Symbolic links to directories are not followed, so the walk never leaves
+    ``root`` and every file is matched against the rules by its real path.
+    """
+    suffixes = None if extensions is None else {e.lower() for e in extensions}
+    excluded = _parse_patterns(exclude)
+    base_rules = _outer_rules(root) if use_ignore_files else []
+
+    stack: List[Tuple[str, str, List[IgnoreRule]]] = [(str(root), "", base_rules)]
+    while stack:
+        directory, relative, rules = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        names = {entry.name for entry in entries}
+        if relative and _VENV_MARKER in names:
+            continue
+        if use_ignore_files:
+            rules = rules + [
+                rule
+                for name in IGNORE_FILES
+                if name in names
+                for rule in _read_ignore_file(os.path.join(directory, name), relative)
+            ]
+
+        subdirectories = []
+        for entry in entries:
+            entry_relative = f"{relative}/{entry.name}" if relative else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name in DEFAULT_EXCLUDED_DIRS:
+                    continue
+            elif suffixes is not None and (
+                os.path.splitext(entry.name)[1].lower() not in suffixes
+            ):
+                continue
+            if is_ignored(excluded, entry_relative, is_dir) or is_ignored(
+                rules, entry_relative, is_dir
+            ):
+                continue
+            if is_dir:
+                subdirectories.append((entry.path, entry_relative, rules))
+            elif entry.is_file():
+                yield Path(entry.path)
+
+        stack.extend(reversed(subdirectories))
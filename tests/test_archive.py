@@ -0,0 +1,146 @@
+"""
+Unit tests for the compressed file and archive readers
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.archive import (  # noqa: E402
+    ArchiveError,
+    archive_format,
+    compression,
+    decompress,
+    inner_suffix,
+    iter_members,
+    matches_extensions,
+    open_compressed,
+    prefixed,
+)
+
+
+class TestNames(unittest.TestCase):
+    """Test cases for recognizing compressed files and archives by name"""
+
+    def test_compression(self):
+        """Test compression suffixes, including one-word tar suffixes"""
+        self.assertEqual(compression("app.log.GZ"), ".gz")
+        self.assertEqual(compression("logs.tgz"), ".gz")
+        self.assertEqual(compression("logs.tar.zst"), ".zst")
+        self.assertIsNone(compression("logs.tar"))
+
+    def test_inner_suffix(self):
+        """Test the suffix under a compression suffix is found"""
+        self.assertEqual(inner_suffix("app.log.gz"), ".log")
+        self.assertEqual(inner_suffix("logs.txz"), ".tar")
+        self.assertEqual(inner_suffix("notes.txt"), ".txt")
+        self.assertEqual(inner_suffix("blob.gz"), "")
+
+    def test_archive_format(self):
+        """Test zip and tar archives are recognized, compressed or not"""
+        self.assertEqual(archive_format("a.zip"), "zip")
+        self.assertEqual(archive_format("a.tar"), "tar")
+        self.assertEqual(archive_format("a.tar.bz2"), "tar")
+        self.assertEqual(archive_format("a.tgz"), "tar")
+        self.assertIsNone(archive_format("a.log.gz"))
+
+    def test_matches_extensions(self):
+        """Test files match by their suffix with or without compression"""
+        self.assertTrue(matches_extensions("app.log.gz", [".log"]))
+        self.assertTrue(matches_extensions("app.log.gz", [".GZ"]))
+        self.assertFalse(matches_extensions("blob.gz", [".log"]))
+
+
+class TestReaders(unittest.TestCase):
+    """Test cases for reading compressed files and archive members"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_decompress(self):
+        """Test each codec in the standard library is read by suffix"""
+        for name, compress in [
+            ("a.gz", gzip.compress),
+            ("a.bz2", bz2.compress),
+            ("a.xz", lzma.compress),
+        ]:
+            with self.subTest(name=name):
+                stream = decompress(io.BytesIO(compress(b"hello")), name)
+                self.assertEqual(stream.read(), b"hello")
+        plain = io.BytesIO(b"hello")
+        self.assertIs(decompress(plain, "a.txt"), plain)
+
+    def test_open_compressed(self):
+        """Test compressed files are read decompressed"""
+        path = self.temp_dir / "app.log.gz"
+        path.write_bytes(gzip.compress(b"line one\n"))
+
+        with open_compressed(path) as stream:
+            self.assertEqual(stream.read(), b"line one\n")
+
+    def test_tar_members(self):
+        """Test regular tar members are read in order with normalized names"""
+        path = self.temp_dir / "logs.tar.gz"
+        with tarfile.open(path, "w:gz") as archive:
+            directory = tarfile.TarInfo("./logs")
+            directory.type = tarfile.DIRTYPE
+            archive.addfile(directory)
+            for name, data in [("./logs/a.log", b"first"), ("b.txt", b"second")]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+        members = [
+            (member.name, member.size, member.stream.read())
+            for member in iter_members(path)
+        ]
+
+        self.assertEqual(
+            members, [("logs/a.log", 5, b"first"), ("b.txt", 6, b"second")]
+        )
+
+    def test_zip_members(self):
+        """Test zip members are read and directories left out"""
+        path = self.temp_dir / "bundle.zip"
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("conf/", "")
+            archive.writestr("conf/app.json", '{"a": 1}')
+
+        members = [(member.name, member.stream.read()) for member in iter_members(path)]
+
+        self.assertEqual(members, [("conf/app.json", b'{"a": 1}')])
+
+    def test_invalid_archives(self):
+        """Test archives that do not parse are reported"""
+        for name in ["bad.zip", "bad.tar"]:
+            with self.subTest(name=name):
+                path = self.temp_dir / name
+                path.write_bytes(b"not an archive" * 100)
+                with self.assertRaises(ArchiveError):
+                    list(iter_members(path))
+
+    def test_prefixed(self):
+        """Test bytes read ahead are put back in front of the stream"""
+        stream = io.BytesIO(b"hello world")
+        head = stream.read(5)
+
+        self.assertEqual(prefixed(head, stream).read(), b"hello world")
+
+
+if __name__ == "__main__":
+    unittest.main()
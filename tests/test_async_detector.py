@@ -0,0 +1,170 @@
+"""
+Unit tests for the asyncio detector interface. A small fake detector stands in
+for PIIDetector so no Presidio model is loaded.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.async_detector import AsyncPIIDetector  # noqa: E402
+
+
+class FakeDetector:
+    """Reports each text's length, and records the batches it was given. While
+    ``gate`` is clear, analysis blocks."""
+
+    _options = {"mode": "fast"}
+
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def analyze_texts(self, texts, batch_size=None):
+        self.gate.wait(5)
+        if "boom" in texts:
+            raise RuntimeError("analysis failed")
+        self.batches.append(list(texts))
+        return [[{"entity_type": "LENGTH", "start": 0, "end": len(t)}] for t in texts]
+
+
+def _init_fake_worker(options):
+    pass
+
+
+def _analyze_or_crash(texts):
+    """Stands in for a worker's analysis, with the worker dying on "crash" """
+    if "crash" in texts:
+        os._exit(1)
+    return [[{"entity_type": "LENGTH", "start": 0, "end": len(t)}] for t in texts]
+
+
+class TestAsyncPIIDetector(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncPIIDetector"""
+
+    async def asyncSetUp(self):
+        self.fake = FakeDetector()
+        self.detector = AsyncPIIDetector(
+            self.fake, max_batch_size=4, max_batch_delay=0.01, max_pending=8
+        )
+        await self.detector.start()
+
+    async def asyncTearDown(self):
+        self.fake.gate.set()
+        await self.detector.close()
+
+    async def test_requests_coalesced_into_batches(self):
+        """Test concurrent requests share batches and keep their own results"""
+        texts = ["a" * i for i in range(1, 11)]
+
+        results = await asyncio.gather(*map(self.detector.analyze_text, texts))
+
+        self.assertEqual([r[0]["end"] for r in results], list(range(1, 11)))
+        self.assertLess(len(self.fake.batches), len(texts))
+        self.assertTrue(all(len(batch) <= 4 for batch in self.fake.batches))
+        self.assertEqual(sum(self.fake.batches, []), texts)
+
+    async def test_analyze_texts(self):
+        """Test many texts are analyzed in order"""
+        results = await self.detector.analyze_texts(["ab", "c"])
+        self.assertEqual([r[0]["end"] for r in results], [2, 1])
+
+    async def test_backpressure(self):
+        """Test callers wait once max_pending requests are queued"""
+        self.fake.gate.clear()
+        running = asyncio.ensure_future(self.detector.analyze_text("first"))
+        await asyncio.sleep(0.05)
+        queued = [
+            asyncio.ensure_future(self.detector.analyze_text(str(i))) for i in range(9)
+        ]
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.detector._queue.qsize(), 8)
+        self.fake.gate.set()
+        await asyncio.gather(running, *queued)
+        self.assertEqual(len(sum(self.fake.batches, [])), 10)
+
+    async def test_timeout_withdraws_request(self):
+        """Test a timed out request is not analyzed once its batch starts"""
+        self.fake.gate.clear()
+        running = asyncio.ensure_future(self.detector.analyze_text("first"))
+        await asyncio.sleep(0.05)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.detector.analyze_text("late", timeout=0.05)
+        cancelled = asyncio.ensure_future(self.detector.analyze_text("cancelled"))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        self.fake.gate.set()
+        await running
+
+        self.assertEqual(
+            await self.detector.analyze_text("after"),
+            [{"entity_type": "LENGTH", "start": 0, "end": 5}],
+        )
+        self.assertEqual(self.fake.batches, [["first"], ["after"]])
+
+    async def test_errors_reach_every_caller_in_the_batch(self):
+        """Test an analysis failure is raised to each request in its batch"""
+        results = await asyncio.gather(
+            self.detector.analyze_text("boom"),
+            self.detector.analyze_text("fine"),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(
+            await self.detector.analyze_text("ok"),
+            [{"entity_type": "LENGTH", "start": 0, "end": 2}],
+        )
+
+    async def test_close_cancels_queued_requests(self):
+        """Test closing lets the running batch finish and cancels the rest"""
+        self.fake.gate.clear()
+        running = asyncio.ensure_future(self.detector.analyze_text("first"))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(self.detector.analyze_text("queued"))
+        await asyncio.sleep(0.01)
+
+        closing = asyncio.ensure_future(self.detector.close())
+        await asyncio.sleep(0.01)
+        self.fake.gate.set()
+        await closing
+
+        self.assertEqual((await running)[0]["end"], 5)
+        with self.assertRaises(asyncio.CancelledError):
+            await queued
+
+    @patch("pii_detect.async_detector._analyze_in_worker", _analyze_or_crash)
+    @patch("pii_detect.async_detector._init_worker", _init_fake_worker)
+    async def test_worker_process_crash(self):
+        """Test a worker dying fails its batch and the pool is replaced"""
+        detector = AsyncPIIDetector(workers=2, max_batch_delay=0, mode="fast")
+        async with detector:
+            with self.assertRaises(BrokenProcessPool):
+                await detector.analyze_text("crash")
+
+            self.assertEqual(
+                await detector.analyze_text("ok"),
+                [{"entity_type": "LENGTH", "start": 0, "end": 2}],
+            )
+
+    def test_invalid_options(self):
+        """Test bad limits and mixing a detector with options are refused"""
+        with self.assertRaises(ValueError):
+            AsyncPIIDetector(max_pending=0)
+        with self.assertRaises(ValueError):
+            AsyncPIIDetector(FakeDetector(), mode="fast")
+
+
+if __name__ == "__main__":
+    unittest.main()
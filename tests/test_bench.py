@@ -0,0 +1,195 @@
+"""
+Unit tests for the benchmark suite
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pii_detect.cli as pii_detect  # noqa: E402
+from pii_detect import bench  # noqa: E402
+
+SMALL_SPEC = bench.CorpusSpec(
+    small_files=5,
+    log_files=1,
+    log_lines=50,
+    csv_files=1,
+    csv_rows=20,
+    json_files=1,
+    json_records=20,
+    pii_rate=0.5,
+    seed=7,
+)
+
+# What each seeded entity type looks like, to check the recorded offsets
+SEEDED_PATTERNS = {
+    "PERSON": r"[A-Z][a-z]+ [A-Z][a-z]+",
+    "EMAIL_ADDRESS": r"[a-z]+\.[a-z]+\d+@example\.com",
+    "PHONE_NUMBER": r"\(\d{3}\) 555-\d{4}",
+    "CREDIT_CARD": r"4\d{3}( \d{4}){3}",
+    "IP_ADDRESS": r"\d+\.\d+\.\d+\.\d+",
+}
+
+
+class FakeDetector:
+    """Reports exactly the seeded PII of each file, plus one extra URL"""
+
+    entities = ["EMAIL_ADDRESS", "PERSON", "URL"]
+    metadata = {"mode": "fast", "model": None, "entities": entities}
+
+    def __init__(self, truth):
+        self.truth = truth
+
+    def analyze_file(self, file_path):
+        entities = [
+            {"entity_type": e.entity_type, "start": e.start, "end": e.end}
+            for e in self.truth[file_path]
+            if e.entity_type in self.entities
+        ]
+        entities.append({"entity_type": "URL", "start": 0, "end": 1})
+        return {"file": str(file_path), "entities": entities}
+
+    def analyze_files(self, file_paths):
+        return map(self.analyze_file, file_paths)
+
+
+class TestBench(unittest.TestCase):
+    """Test cases for corpus generation and benchmark reports"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_corpus_reproducible(self):
+        """Test the same spec always writes the same files and PII"""
+        first = bench.generate_corpus(self.temp_dir / "a", SMALL_SPEC)
+        second = bench.generate_corpus(self.temp_dir / "b", SMALL_SPEC)
+        other = bench.generate_corpus(self.temp_dir / "c", SMALL_SPEC._replace(seed=8))
+
+        self.assertEqual(len(first), 8)
+        self.assertEqual(list(first.values()), list(second.values()))
+        for a, b in zip(first, second):
+            self.assertEqual(a.read_bytes(), b.read_bytes())
+        self.assertNotEqual(list(first.values()), list(other.values()))
+        self.assertEqual({p.suffix for p in first}, {".txt", ".log", ".csv", ".json"})
+
+    def test_seeded_offsets(self):
+        """Test every seeded entity is found at its recorded offsets"""
+        truth = bench.generate_corpus(self.temp_dir, SMALL_SPEC)
+
+        seeded_types = set()
+        for file_path, entities in truth.items():
+            text = file_path.read_text(encoding="utf-8")
+            if file_path.suffix == ".json":
+                json.loads(text)
+            for entity in entities:
+                seeded_types.add(entity.entity_type)
+                value = text[entity.start : entity.end]
+                self.assertRegex(value, f"^{SEEDED_PATTERNS[entity.entity_type]}$")
+        self.assertEqual(seeded_types, set(bench.SEEDED_ENTITIES))
+
+    def test_score(self):
+        """Test detections are matched to seeded entities by type and overlap"""
+        truth = {
+            Path("a.txt"): [
+                bench.SeededEntity("PERSON", 0, 8),
+                bench.SeededEntity("EMAIL_ADDRESS", 10, 30),
+                bench.SeededEntity("PHONE_NUMBER", 40, 52),
+            ]
+        }
+        results = [
+            {
+                "file": "a.txt",
+                "entities": [
+                    {"entity_type": "PERSON", "start": 0, "end": 4},
+                    {"entity_type": "PERSON", "start": 5, "end": 8},
+                    {"entity_type": "EMAIL_ADDRESS", "start": 31, "end": 35},
+                    {"entity_type": "URL", "start": 20, "end": 30},
+                ],
+            }
+        ]
+
+        accuracy = bench.score(truth, results, ["PERSON", "EMAIL_ADDRESS", "URL"])
+
+        self.assertEqual(accuracy["true_positives"], 1)
+        self.assertEqual(accuracy["false_positives"], 2)
+        self.assertEqual(accuracy["false_negatives"], 1)
+        self.assertEqual(accuracy["unscored"], 1)
+        self.assertAlmostEqual(accuracy["precision"], 1 / 3)
+        self.assertAlmostEqual(accuracy["recall"], 1 / 2)
+        self.assertNotIn("PHONE_NUMBER", accuracy["by_type"])
+
+    def test_run_benchmark(self):
+        """Test the report covers throughput, latency, memory and accuracy"""
+        truth = bench.generate_corpus(self.temp_dir, SMALL_SPEC)
+
+        report = bench.run_benchmark(FakeDetector(truth), truth)
+
+        self.assertEqual(report["files"], 8)
+        self.assertEqual(
+            report["bytes"], sum(p.stat().st_size for p in self.temp_dir.iterdir())
+        )
+        self.assertEqual(report["mode"], "fast")
+        self.assertGreater(report["files_per_second"], 0)
+        self.assertLessEqual(report["latency_ms"]["p50"], report["latency_ms"]["p99"])
+        self.assertEqual(report["accuracy"]["precision"], 1.0)
+        self.assertEqual(report["accuracy"]["recall"], 1.0)
+        self.assertEqual(report["accuracy"]["unscored"], 8)
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(bench._percentile(values, 50), 50)
+        self.assertEqual(bench._percentile(values, 99), 99)
+        self.assertEqual(bench._percentile([3.0], 99), 3.0)
+        self.assertEqual(bench._percentile([], 50), 0.0)
+
+    def test_bench_command(self):
+        """Test the bench command scans a kept corpus and prints a report"""
+        corpus = self.temp_dir / "corpus"
+        report = {"files": 8}
+        argv = ["pii-detect", "bench", "--corpus", str(corpus), "--small-files", "5"]
+
+        with patch("sys.argv", argv + ["--log-lines", "10", "-f", "json"]):
+            with patch.object(pii_detect, "PIIDetector") as mock_detector_class:
+                with patch.object(
+                    bench, "run_benchmark", return_value=report
+                ) as mock_run:
+                    with patch("sys.stdout", StringIO()) as stdout:
+                        pii_detect.main()
+
+        self.assertIsNone(mock_detector_class.call_args.kwargs["cache_dir"])
+        truth = mock_run.call_args.args[1]
+        self.assertEqual(len([p for p in truth if p.suffix == ".txt"]), 5)
+        self.assertTrue(all(p.exists() for p in truth))
+        self.assertEqual(json.loads(stdout.getvalue()), report)
+
+    def test_print_report(self):
+        """Test the text report"""
+        truth = bench.generate_corpus(self.temp_dir, SMALL_SPEC)
+        report = bench.run_benchmark(FakeDetector(truth), truth)
+
+        with patch("sys.stdout", StringIO()) as stdout:
+            bench.print_report(report)
+
+        output = stdout.getvalue()
+        self.assertIn("PII Detection Benchmark", output)
+        self.assertRegex(output, r"Recall: +1\.000")
+        self.assertIn("8 detections of types that were not seeded", output)
+        self.assertTrue(re.search(r"Latency: +p50 [\d.]+ ms", output))
+
+
+if __name__ == "__main__":
+    unittest.main()
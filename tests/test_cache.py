@@ -0,0 +1,122 @@
+"""
+Unit tests for the persistent result cache
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.cache import (  # noqa: E402
+    ResultCache,
+    fingerprint,
+    hash_bytes,
+    hash_file,
+)
+
+ENTITIES = [{"entity_type": "PERSON", "start": 0, "end": 8, "score": 0.85}]
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for ResultCache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ResultCache(self.temp_dir)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_miss_then_hit(self):
+        """Test stored entities are returned for the same key"""
+        self.assertIsNone(self.cache.get("key"))
+
+        self.cache.put("key", ENTITIES)
+
+        self.assertEqual(self.cache.get("key"), ENTITIES)
+
+    def test_empty_results_are_cached(self):
+        """Test files without PII are cached too"""
+        self.cache.put("key", [])
+        self.assertEqual(self.cache.get("key"), [])
+
+    def test_persists_across_instances(self):
+        """Test the cache survives reopening the directory"""
+        self.cache.put("key", ENTITIES)
+        self.cache.close()
+
+        self.cache = ResultCache(self.temp_dir)
+
+        self.assertEqual(self.cache.get("key"), ENTITIES)
+
+    @unittest.skipUnless(os.name == "posix", "POSIX permissions")
+    def test_private_to_owner(self):
+        """Test the cache directory and database are only readable by their
+        owner, including a database left readable by an older version"""
+        old_dir = Path(self.temp_dir) / "old"
+        old_dir.mkdir()
+        (old_dir / "results.sqlite3").touch()
+        os.chmod(old_dir / "results.sqlite3", 0o644)
+        new_dir = Path(self.temp_dir) / "new"
+
+        for directory in [old_dir, new_dir]:
+            cache = ResultCache(directory)
+            cache.put("key", ENTITIES)
+            cache.close()
+            database = directory / "results.sqlite3"
+            self.assertEqual(database.stat().st_mode & 0o777, 0o600)
+        self.assertEqual(new_dir.stat().st_mode & 0o777, 0o700)
+
+    def test_least_recently_used_evicted(self):
+        """Test eviction removes the entries used longest ago"""
+        self.cache.close()
+        entry_size = len('[{"entity_type": "PERSON", "start": 0, "end": 8, ')
+        self.cache = ResultCache(self.temp_dir, max_size=entry_size * 3)
+
+        self.cache.put("a", ENTITIES)
+        time.sleep(0.01)
+        self.cache.put("b", ENTITIES)
+        time.sleep(0.01)
+        self.cache.get("a")
+        time.sleep(0.01)
+        self.cache.put("c", ENTITIES)
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), ENTITIES)
+        self.assertEqual(self.cache.get("c"), ENTITIES)
+
+
+class TestHashing(unittest.TestCase):
+    """Test cases for content hashing and fingerprints"""
+
+    def test_hash_file_matches_bytes(self):
+        """Test streamed file hashes match in-memory hashes"""
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b"John Doe\n" * 1000)
+        self.addCleanup(os.unlink, f.name)
+
+        self.assertEqual(
+            hash_file(Path(f.name), block_size=100), hash_bytes(b"John Doe\n" * 1000)
+        )
+
+    def test_fingerprint_is_order_independent(self):
+        """Test configuration fingerprints ignore key order"""
+        self.assertEqual(
+            fingerprint({"a": 1, "b": [1, 2]}), fingerprint({"b": [1, 2], "a": 1})
+        )
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": 2}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Tests for git-aware change detection, run against a temporary repository
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect import changes  # noqa: E402
+
+
+@unittest.skipUnless(shutil.which("git"), "requires git")
+class TestChanges(unittest.TestCase):
+    """Test cases for changed file and line detection"""
+
+    def setUp(self):
+        """Create a repository with one commit"""
+        self.repo = Path(tempfile.mkdtemp()).resolve()
+        self.cwd = os.getcwd()
+        os.chdir(self.repo)
+        self.git("init", "-q")
+        self.git("config", "user.email", "test@example.com")
+        self.git("config", "user.name", "Test")
+        (self.repo / "docs").mkdir()
+        (self.repo / "docs" / "a.txt").write_text("one\ntwo\nthree\n")
+        (self.repo / "b.txt").write_text("unchanged\n")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "initial")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.repo)
+
+    def git(self, *args):
+        subprocess.run(["git", *args], cwd=self.repo, check=True)
+
+    def test_changed_files_since_ref(self):
+        """Test files modified since a ref are listed relative to the cwd"""
+        (self.repo / "docs" / "a.txt").write_text("one\nJohn Doe\nthree\n")
+
+        files = changes.changed_files(self.repo, since="HEAD")
+
+        self.assertEqual(files, [Path("docs/a.txt")])
+
+    def test_changed_files_scoped_to_path(self):
+        """Test only changes under the given path are returned"""
+        (self.repo / "docs" / "a.txt").write_text("changed\n")
+        (self.repo / "b.txt").write_text("changed\n")
+
+        files = changes.changed_files(self.repo / "docs", since="HEAD")
+
+        self.assertEqual(files, [Path("docs/a.txt")])
+
+    def test_staged_files(self):
+        """Test --staged reports only files in the index"""
+        (self.repo / "docs" / "a.txt").write_text("changed\n")
+        (self.repo / "new.txt").write_text("new\n")
+        self.git("add", "new.txt")
+
+        self.assertEqual(
+            changes.changed_files(self.repo, staged=True), [Path("new.txt")]
+        )
+
+    def test_deleted_files_skipped(self):
+        """Test deleted files are not returned"""
+        (self.repo / "b.txt").unlink()
+        self.assertEqual(changes.changed_files(self.repo, since="HEAD"), [])
+
+    def test_changed_lines(self):
+        """Test added and modified lines are reported as ranges"""
+        (self.repo / "docs" / "a.txt").write_text("one\nJohn\nDoe\nthree\nfour\n")
+
+        ranges = changes.changed_lines(self.repo, since="HEAD")
+
+        self.assertEqual(ranges, {Path("docs/a.txt"): [(2, 3), (5, 5)]})
+
+    def test_changed_lines_starting_with_plus_signs(self):
+        """Test an added line starting with "++ " is not taken for the header
+        of another file, so later hunks are kept"""
+        (self.repo / "docs" / "a.txt").write_text(
+            "++ one\ntwo\nthree\nx\ny\njane@example.com\n"
+        )
+
+        ranges = changes.changed_lines(self.repo, since="HEAD")
+
+        self.assertEqual(ranges, {Path("docs/a.txt"): [(1, 1), (4, 6)]})
+
+    def test_export_staged(self):
+        """Test the staged content is exported, not the working tree's"""
+        (self.repo / "docs" / "a.txt").write_text("one\njane@example.com\n")
+        (self.repo / "b.txt").write_text("changed\n")
+        self.git("add", ".")
+        (self.repo / "docs" / "a.txt").write_text("one\n")
+        (self.repo / "b.txt").unlink()
+        export_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, export_dir)
+
+        copies = changes.export_staged(self.repo / "docs", export_dir)
+
+        self.assertEqual(copies, [(export_dir / "docs" / "a.txt", Path("docs/a.txt"))])
+        self.assertEqual(copies[0][0].read_text(), "one\njane@example.com\n")
+        self.assertEqual(
+            changes.changed_lines(self.repo, staged=True),
+            {Path("docs/a.txt"): [(2, 2)], Path("b.txt"): [(1, 1)]},
+        )
+
+    def test_bad_ref(self):
+        """Test git failures are raised as GitError"""
+        with self.assertRaises(changes.GitError):
+            changes.changed_files(self.repo, since="no-such-ref")
+
+
+class TestRestrictToLines(unittest.TestCase):
+    """Test cases for restrict_to_lines"""
+
+    def test_entities_outside_ranges_dropped(self):
+        """Test only entities starting on changed lines are kept"""
+        result = {
+            "file": "names.txt",
+            "pii_found": True,
+            "pii_count": 3,
+            "entities": [
+                {"entity_type": "PERSON", "start": 0, "end": 8, "line": 1},
+                {"entity_type": "PERSON", "start": 9, "end": 17, "line": 2},
+                {"entity_type": "PERSON", "start": 18, "end": 27, "line": 3},
+            ],
+        }
+
+        restricted = changes.restrict_to_lines(result, [(2, 2)])
+
+        self.assertEqual(restricted["pii_count"], 1)
+        self.assertEqual(restricted["entities"][0]["start"], 9)
+
+    def test_no_ranges_drops_everything(self):
+        """Test a file with no changed lines reports no PII"""
+        result = {
+            "file": "unused.txt",
+            "pii_found": True,
+            "pii_count": 1,
+            "entities": [{"entity_type": "PERSON", "start": 0, "end": 8, "line": 1}],
+        }
+        restricted = changes.restrict_to_lines(result, [])
+        self.assertFalse(restricted["pii_found"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,7 +7,8 @@ import os
 import sys
 import tempfile
 import unittest
-from io import StringIO
+from io import BytesIO, StringIO
+from pathlib import Path
 from unittest.mock import Mock, patch
 
 # Add src to path for imports
@@ -50,11 +51,20 @@ class TestCLI(unittest.TestCase):
                 "pii_found": True,
                 "pii_count": 2,
                 "entities": [
-                    {"entity_type": "PERSON", "text": "John Doe", "score": 0.85},
+                    {
+                        "entity_type": "PERSON",
+                        "text": "John Doe",
+                        "score": 0.85,
+                        "line": 1,
+                        "column": 1,
+                    },
                     {
                         "entity_type": "EMAIL_ADDRESS",
                         "text": "john@example.com",
                         "score": 1.0,
+                        "line": 3,
+                        "column": 7,
+                        "context": "mail: john@example.com",
                     },
                 ],
             }
@@ -76,6 +86,8 @@ class TestCLI(unittest.TestCase):
         self.assertIn("John Doe", output)
         self.assertIn("EMAIL_ADDRESS", output)
         self.assertIn("john@example.com", output)
+        self.assertIn("at line 3, column 7", output)
+        self.assertIn("'mail: john@example.com'", output)
 
     @patch("pii_detect.PIIDetector")
     def test_print_results_json_format(self, _):
@@ -156,6 +168,28 @@ class TestCLI(unittest.TestCase):
         self.assertIn("error_file.txt", output)
         self.assertIn("Permission denied", output)
 
+    def test_print_results_with_skipped_files(self):
+        """Test skipped files are counted apart and show their reason"""
+        results = [
+            {"file": "a.txt", "pii_found": False, "pii_count": 0, "entities": []},
+            {
+                "file": "dump.json",
+                "skipped": "file size 2000 bytes exceeds limit of 1000",
+                "pii_found": False,
+                "pii_count": 0,
+                "entities": [],
+            },
+        ]
+
+        captured_output = StringIO()
+        with patch("sys.stdout", captured_output):
+            pii_detect.print_results(results, "text")
+
+        output = captured_output.getvalue()
+        self.assertIn("Files analyzed: 1", output)
+        self.assertIn("Files skipped: 1", output)
+        self.assertIn("dump.json - Skipped: file size 2000 bytes", output)
+
     @patch("sys.argv", ["pii_detect.py", "nonexistent_file.txt"])
     def test_main_nonexistent_file(self):
         """Test main function with nonexistent file"""
@@ -172,6 +206,41 @@ class TestCLI(unittest.TestCase):
                 output = captured_output.getvalue()
                 self.assertIn("does not exist", output)
 
+    def test_print_results_ndjson_format(self):
+        """Test NDJSON output writes one result per line"""
+        results = [
+            {"file": "a.txt", "pii_found": False, "pii_count": 0, "entities": []},
+            {"file": "b.txt", "pii_found": False, "pii_count": 0, "entities": []},
+        ]
+
+        captured_output = StringIO()
+        with patch("sys.stdout", captured_output):
+            pii_detect.print_results(iter(results), "ndjson")
+
+        lines = captured_output.getvalue().splitlines()
+        self.assertEqual(
+            [json.loads(line)["file"] for line in lines], ["a.txt", "b.txt"]
+        )
+
+    @patch("sys.argv", ["pii_detect.py", "--no-daemon", "-f", "ndjson", "/fake/dir"])
+    def test_main_streaming_format_iterates_directory(self):
+        """Test streaming formats consume directory results as a generator"""
+        mock_detector = Mock()
+        mock_detector.iter_directory.return_value = iter([])
+
+        with patch("pathlib.Path.exists", return_value=True):
+            with patch("pathlib.Path.is_file", return_value=False):
+                with patch("pathlib.Path.is_dir", return_value=True):
+                    with patch.object(
+                        pii_detect, "PIIDetector", return_value=mock_detector
+                    ):
+                        with patch.object(pii_detect, "print_results") as mock_print:
+                            pii_detect.main()
+
+                            mock_detector.iter_directory.assert_called_once()
+                            mock_detector.analyze_directory.assert_not_called()
+                            self.assertEqual(mock_print.call_args[0][1], "ndjson")
+
     @patch("sys.argv", ["pii_detect.py", "/fake/path"])
     def test_main_invalid_path_type(self):
         """Test main function with invalid path type"""
@@ -218,6 +287,254 @@ class TestCLI(unittest.TestCase):
                             mock_detector.analyze_file.assert_called_once()
                             mock_print.assert_called_once()
 
+    @patch(
+        "sys.argv",
+        [
+            "pii_detect.py",
+            "test.txt",
+            "--no-daemon",
+            "--entities",
+            "EMAIL_ADDRESS, PERSON",
+            "--entities",
+            "PHONE_NUMBER",
+            "--exclude-entities",
+            "",
+            "--mode",
+            "fast",
+            "--no-prefilter",
+            "--max-file-size",
+            "0",
+            "--context",
+            "20",
+            "--no-structured",
+            "--field-sample",
+            "5",
+            "--classify-after",
+            "2",
+            "--no-archives",
+            "--first-match",
+            "--min-score",
+            "0.5",
+            "--overlaps",
+            "longest",
+        ],
+    )
+    def test_main_entity_options(self):
+        """Test entity options are split on commas and passed to the detector"""
+        mock_detector = Mock()
+        mock_detector.analyze_file.return_value = {
+            "file": "test.txt",
+            "pii_found": False,
+            "pii_count": 0,
+            "entities": [],
+        }
+
+        with patch("pathlib.Path.exists", return_value=True):
+            with patch("pathlib.Path.is_file", return_value=True):
+                with patch.object(
+                    pii_detect, "PIIDetector", return_value=mock_detector
+                ) as mock_detector_class:
+                    with patch.object(pii_detect, "print_results"):
+                        pii_detect.main()
+
+        options = mock_detector_class.call_args.kwargs
+        self.assertEqual(
+            options["entities"], ["EMAIL_ADDRESS", "PERSON", "PHONE_NUMBER"]
+        )
+        self.assertEqual(options["exclude_entities"], [])
+        self.assertEqual(options["mode"], "fast")
+        self.assertFalse(options["prefilter"])
+        self.assertIsNone(options["max_file_size"])
+        self.assertEqual(options["context_width"], 20)
+        self.assertFalse(options["structured"])
+        self.assertEqual(options["field_sample"], 5)
+        self.assertEqual(options["classify_after"], 2)
+        self.assertFalse(options["archives"])
+        self.assertTrue(options["first_match"])
+        self.assertEqual(options["min_score"], 0.5)
+        self.assertEqual(options["overlaps"], "longest")
+
+    @patch(
+        "sys.argv",
+        ["pii_detect.py", "logs.tar.gz", "--no-daemon", "-e", ".log"],
+    )
+    def test_main_archive_file(self):
+        """Test an archive given as the path is reported member by member"""
+        mock_detector = Mock()
+        mock_detector.analyze_files.return_value = [
+            {"file": "logs.tar.gz!a.log", "pii_found": False, "entities": []}
+        ]
+
+        with patch("pathlib.Path.exists", return_value=True):
+            with patch("pathlib.Path.is_file", return_value=True):
+                with patch.object(
+                    pii_detect, "PIIDetector", return_value=mock_detector
+                ):
+                    with patch.object(pii_detect, "print_results") as mock_print:
+                        pii_detect.main()
+
+        mock_detector.analyze_files.assert_called_once_with(
+            [Path("logs.tar.gz")], extensions=[".log"]
+        )
+        mock_detector.analyze_file.assert_not_called()
+        results = mock_print.call_args[0][0]
+        self.assertEqual([r["file"] for r in results], ["logs.tar.gz!a.log"])
+
+    def test_main_stdin(self):
+        """Test - streams standard input to the detector, as NDJSON by default,
+        without a daemon"""
+        mock_detector = Mock(stats=None, metadata={})
+        mock_detector.iter_stream.side_effect = lambda lines, *_: iter(
+            [{"file": "-", "pii_found": True, "pii_count": 0, "lines": list(lines)}]
+        )
+        stdin = Mock(buffer=BytesIO(b"one\r\ntwo\n"))
+
+        with patch("sys.argv", ["pii_detect.py", "-", "--max-batch-delay", "50"]):
+            with patch("sys.stdin", stdin):
+                with patch.object(pii_detect.daemon, "connect") as mock_connect:
+                    with patch.object(
+                        pii_detect, "PIIDetector", return_value=mock_detector
+                    ):
+                        with patch.object(pii_detect, "print_results") as mock_print:
+                            pii_detect.main()
+
+        mock_connect.assert_not_called()
+        self.assertEqual(mock_detector.iter_stream.call_args[0][1:], ("-", 0.05))
+        results, output_format = mock_print.call_args[0]
+        self.assertEqual(output_format, "ndjson")
+        self.assertEqual(list(results)[0]["lines"], ["one\r\n", "two\n"])
+
+    def test_main_follow_requires_ndjson(self):
+        """Test --follow rejects output written only at the end"""
+        argv = ["pii_detect.py", "--follow", "-f", "json", self.sample_file]
+        with patch("sys.argv", argv):
+            with patch("sys.stderr", StringIO()):
+                with self.assertRaises(SystemExit):
+                    pii_detect.main()
+
+    def test_main_fail_fast(self):
+        """Test --fail-fast stops the scan at the first file with PII, turns
+        on first-match analysis and exits with status 1"""
+        analyzed = []
+
+        def iter_directory(*_, **__):
+            for name, found in [("a.txt", False), ("b.txt", True), ("c.txt", True)]:
+                analyzed.append(name)
+                yield {"file": name, "pii_found": found, "entities": []}
+
+        mock_detector = Mock(stats=None, metadata={})
+        mock_detector.iter_directory.side_effect = iter_directory
+        printed = []
+
+        with patch("sys.argv", ["pii_detect.py", "--no-daemon", "--fail-fast", "."]):
+            with patch.object(
+                pii_detect, "PIIDetector", return_value=mock_detector
+            ) as mock_detector_class:
+                with patch.object(
+                    pii_detect,
+                    "print_results",
+                    side_effect=lambda results, *_, **__: printed.extend(results),
+                ):
+                    with self.assertRaises(SystemExit) as exit_context:
+                        pii_detect.main()
+
+        self.assertEqual(exit_context.exception.code, 1)
+        self.assertTrue(mock_detector_class.call_args.kwargs["first_match"])
+        self.assertEqual([result["file"] for result in printed], ["a.txt", "b.txt"])
+        self.assertEqual(analyzed, ["a.txt", "b.txt"])
+
+    def test_main_config_file(self):
+        """Test --config supplies defaults that the command line overrides"""
+        config_file = os.path.join(self.temp_dir, "pii-detect.json")
+        with open(config_file, "w") as f:
+            json.dump(
+                {
+                    "mode": "fast",
+                    "model": "en_core_web_sm",
+                    "disable-components": "parser,lemmatizer",
+                    "no_prefilter": True,
+                },
+                f,
+            )
+        argv = ["pii_detect.py", self.sample_file, "--no-daemon", "--config"]
+        mock_detector = Mock()
+        mock_detector.analyze_file.return_value = {"file": "test.txt", "entities": []}
+
+        with patch("sys.argv", argv + [config_file, "--mode", "full"]):
+            with patch.object(
+                pii_detect, "PIIDetector", return_value=mock_detector
+            ) as mock_detector_class:
+                with patch.object(pii_detect, "print_results"):
+                    pii_detect.main()
+
+        options = mock_detector_class.call_args.kwargs
+        self.assertEqual(options["mode"], "full")
+        self.assertEqual(options["model"], "en_core_web_sm")
+        self.assertEqual(options["disabled_components"], ["parser", "lemmatizer"])
+        self.assertFalse(options["prefilter"])
+
+        with open(config_file, "w") as f:
+            json.dump({"modle": "en_core_web_sm"}, f)
+        with patch("sys.argv", argv + [config_file]):
+            with patch("sys.stderr", StringIO()) as captured_error:
+                with self.assertRaises(SystemExit):
+                    pii_detect.main()
+        self.assertIn("unknown options in --config", captured_error.getvalue())
+
+    def test_main_config_value_types(self):
+        """Test --config values are checked like their command line options,
+        with repeatable options taking a list or a comma-separated string"""
+        config_file = os.path.join(self.temp_dir, "pii-detect.json")
+        argv = ["pii_detect.py", self.sample_file, "--no-daemon", "--config"]
+        argv.append(config_file)
+        mock_detector = Mock()
+        mock_detector.analyze_file.return_value = {"file": "test.txt", "entities": []}
+
+        with open(config_file, "w") as f:
+            json.dump({"entities": "EMAIL_ADDRESS, PERSON", "chunk-size": "2048"}, f)
+        with patch("sys.argv", argv):
+            with patch.object(
+                pii_detect, "PIIDetector", return_value=mock_detector
+            ) as mock_detector_class:
+                with patch.object(pii_detect, "print_results"):
+                    pii_detect.main()
+
+        options = mock_detector_class.call_args.kwargs
+        self.assertEqual(options["entities"], ["EMAIL_ADDRESS", "PERSON"])
+        self.assertEqual(options["chunk_size"], 2048)
+
+        for config, message in [
+            ({"entities": 5}, "invalid 'entities'"),
+            ({"exclude-entities": ["URL", 1]}, "invalid 'exclude-entities'"),
+            ({"chunk-size": 1.5}, "invalid 'chunk-size'"),
+            ({"no-cache": "yes"}, "invalid 'no-cache'"),
+            ({"mode": "slow"}, "'slow' is not one of"),
+        ]:
+            with self.subTest(config=config):
+                with open(config_file, "w") as f:
+                    json.dump(config, f)
+                with patch("sys.argv", argv):
+                    with patch("sys.stderr", StringIO()) as captured_error:
+                        with self.assertRaises(SystemExit):
+                            pii_detect.main()
+                self.assertIn(message, captured_error.getvalue())
+
+    @patch("sys.argv", ["pii_detect.py", "test.txt", "--no-daemon"])
+    def test_main_unsupported_entity(self):
+        """Test an invalid entity selection is reported as a usage error"""
+        with patch("pathlib.Path.exists", return_value=True):
+            with patch("pathlib.Path.is_file", return_value=True):
+                with patch.object(
+                    pii_detect,
+                    "PIIDetector",
+                    side_effect=ValueError("Unsupported entity types: FOO"),
+                ):
+                    with patch("sys.stderr", StringIO()) as captured_error:
+                        with self.assertRaises(SystemExit):
+                            pii_detect.main()
+
+        self.assertIn("Unsupported entity types: FOO", captured_error.getvalue())
+
     @patch("sys.argv", ["pii_detect.py", "/fake/dir"])
     def test_main_directory(self):
         """Test main function with directory"""
@@ -242,6 +559,47 @@ class TestCLI(unittest.TestCase):
                             mock_detector.analyze_directory.assert_called_once()
                             mock_print.assert_called_once()
 
+    @patch(
+        "sys.argv",
+        ["pii_detect.py", "--no-daemon", "-x", "fixtures/", "--no-ignore", "/fake/dir"],
+    )
+    def test_main_directory_exclude_options(self):
+        """Test exclude patterns and --no-ignore reach the directory walk"""
+        mock_detector = Mock()
+        mock_detector.analyze_directory.return_value = []
+
+        with patch("pathlib.Path.exists", return_value=True):
+            with patch("pathlib.Path.is_file", return_value=False):
+                with patch("pathlib.Path.is_dir", return_value=True):
+                    with patch.object(
+                        pii_detect, "PIIDetector", return_value=mock_detector
+                    ):
+                        with patch.object(pii_detect, "print_results"):
+                            pii_detect.main()
+
+        kwargs = mock_detector.analyze_directory.call_args.kwargs
+        self.assertEqual(kwargs["exclude"], ["fixtures/"])
+        self.assertFalse(kwargs["use_ignore_files"])
+
+    def test_main_workers_skip_model_in_parent(self):
+        """Test the model is left to the workers when they analyze every file,
+        and loaded when a single file is analyzed in-process"""
+        for is_dir, load_model in [(True, False), (False, True)]:
+            with self.subTest(is_dir=is_dir):
+                argv = ["pii_detect.py", "--no-daemon", "-w", "2", "/fake/path"]
+                with patch("sys.argv", argv):
+                    with patch("pathlib.Path.exists", return_value=True):
+                        with patch("pathlib.Path.is_file", return_value=not is_dir):
+                            with patch("pathlib.Path.is_dir", return_value=is_dir):
+                                with patch.object(
+                                    pii_detect, "PIIDetector"
+                                ) as mock_detector_class:
+                                    with patch.object(pii_detect, "print_results"):
+                                        pii_detect.main()
+
+                options = mock_detector_class.call_args.kwargs
+                self.assertEqual(options["load_model"], load_model)
+
     @patch("sys.argv", ["pii_detect.py", "-f", "json", "test.txt"])
     def test_main_json_format(self):
         """Test main function with JSON format"""
@@ -297,6 +655,339 @@ class TestCLI(unittest.TestCase):
                                 _, kwargs = mock_detector.analyze_directory.call_args
                                 self.assertEqual(kwargs["extensions"], [".py", ".js"])
 
+    @patch("sys.argv", ["pii_detect.py", "test.txt"])
+    def test_main_uses_running_daemon(self):
+        """Test main forwards analysis to a running daemon"""
+        mock_client = Mock()
+        mock_client.analyze_file.return_value = {
+            "file": "test.txt",
+            "pii_found": False,
+            "pii_count": 0,
+            "entities": [],
+        }
+
+        with patch("pathlib.Path.exists", return_value=True):
+            with patch("pathlib.Path.is_file", return_value=True):
+                with patch.object(
+                    pii_detect.daemon, "connect", return_value=mock_client
+                ):
+                    with patch.object(pii_detect, "PIIDetector") as mock_detector_class:
+                        with patch.object(pii_detect, "print_results"):
+                            pii_detect.main()
+
+                            mock_client.analyze_file.assert_called_once()
+                            mock_detector_class.assert_not_called()
+
+    @patch("sys.argv", ["pii_detect.py", "test.txt"])
+    def test_main_daemon_failure_falls_back(self):
+        """Test main analyzes in-process when the daemon request fails"""
+        mock_client = Mock()
+        mock_client.analyze_file.side_effect = pii_detect.daemon.DaemonError("gone")
+        mock_detector = Mock()
+        mock_detector.analyze_file.return_value = {
+            "file": "test.txt",
+            "pii_found": False,
+            "pii_count": 0,
+            "entities": [],
+        }
+
+        with patch("pathlib.Path.exists", return_value=True):
+            with patch("pathlib.Path.is_file", return_value=True):
+                with patch.object(
+                    pii_detect.daemon, "connect", return_value=mock_client
+                ):
+                    with patch.object(
+                        pii_detect, "PIIDetector", return_value=mock_detector
+                    ):
+                        with patch.object(pii_detect, "print_results"):
+                            pii_detect.main()
+
+                            mock_detector.analyze_file.assert_called_once()
+
+    @patch("sys.argv", ["pii_detect.py", "--no-daemon", "test.txt"])
+    def test_main_no_daemon(self):
+        """Test --no-daemon skips looking for a daemon"""
+        mock_detector = Mock()
+        mock_detector.analyze_file.return_value = {
+            "file": "test.txt",
+            "pii_found": False,
+            "pii_count": 0,
+            "entities": [],
+        }
+
+        with patch("pathlib.Path.exists", return_value=True):
+            with patch("pathlib.Path.is_file", return_value=True):
+                with patch.object(pii_detect.daemon, "connect") as mock_connect:
+                    with patch.object(
+                        pii_detect, "PIIDetector", return_value=mock_detector
+                    ):
+                        with patch.object(pii_detect, "print_results"):
+                            pii_detect.main()
+
+                            mock_connect.assert_not_called()
+
+    def test_main_stats(self):
+        """Test --stats reports stats in JSON and --stats-file writes them in
+        the Prometheus format, scanning in-process"""
+        stats = pii_detect.ScanStats()
+        stats.record("nlp", 0.5)
+        mock_detector = Mock(stats=stats, metadata={})
+        mock_detector.analyze_file.return_value = {
+            "file": self.sample_file,
+            "pii_found": False,
+            "pii_count": 0,
+            "entities": [],
+        }
+        stats_file = os.path.join(self.temp_dir, "stats.prom")
+        argv = ["pii_detect.py", self.sample_file, "-f", "json", "--stats"]
+
+        with patch("sys.argv", argv + ["--stats-file", stats_file]):
+            with patch.object(pii_detect.daemon, "connect") as mock_connect:
+                with patch.object(
+                    pii_detect, "PIIDetector", return_value=mock_detector
+                ) as mock_detector_class:
+                    with patch("sys.stdout", StringIO()) as stdout:
+                        pii_detect.main()
+
+        mock_connect.assert_not_called()
+        self.assertTrue(mock_detector_class.call_args.kwargs["collect_stats"])
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report["results"][0]["file"], self.sample_file)
+        self.assertEqual(report["stats"]["timings"], {"nlp": 0.5})
+        with open(stats_file) as f:
+            self.assertIn('pii_detect_stage_seconds_total{stage="nlp"}', f.read())
+
+    @patch("pii_detect.PIIDetector")
+    def test_print_results_text_stats(self, _):
+        """Test the stats summary follows text results"""
+        stats = pii_detect.ScanStats()
+        stats.record("read", 0.25)
+        stats.count("files", 1)
+
+        with patch("sys.stdout", StringIO()) as stdout:
+            pii_detect.print_results([], "text", stats=stats)
+
+        self.assertIn(
+            "=== Scan Stats ===\nStage read: 0.250 s\nFiles: 1", stdout.getvalue()
+        )
+
+    @patch(
+        "sys.argv",
+        ["pii_detect.py", "--no-daemon", "--since", "main", "--changed-lines", "."],
+    )
+    def test_main_since_changed_lines(self):
+        """Test git mode scans only changed files and lines"""
+        from pathlib import Path
+
+        mock_detector = Mock()
+        mock_detector.analyze_files.return_value = iter(
+            [
+                {
+                    "file": "a.txt",
+                    "pii_found": True,
+                    "pii_count": 1,
+                    "entities": [{"entity_type": "PERSON", "start": 0, "end": 8}],
+                }
+            ]
+        )
+
+        with patch.object(
+            pii_detect.changes,
+            "changed_files",
+            return_value=[Path("a.txt"), Path("image.png")],
+        ):
+            with patch.object(
+                pii_detect.changes,
+                "changed_lines",
+                return_value={Path("a.txt"): [(3, 4)]},
+            ):
+                with patch.object(
+                    pii_detect.changes,
+                    "restrict_to_lines",
+                    side_effect=lambda result, ranges: {**result, "ranges": ranges},
+                ):
+                    with patch.object(
+                        pii_detect, "PIIDetector", return_value=mock_detector
+                    ):
+                        results = []
+                        with patch.object(
+                            pii_detect,
+                            "print_results",
+                            side_effect=lambda r, *_, **__: results.extend(r),
+                        ):
+                            pii_detect.main()
+
+        args, _ = mock_detector.analyze_files.call_args
+        self.assertEqual(args[0], [Path("a.txt")])
+        self.assertEqual(results[0]["ranges"], [(3, 4)])
+
+    def test_main_fail_fast_changed_lines(self):
+        """Test --fail-fast with --changed-lines analyzes files in full, so PII
+        on a changed line after PII on an unchanged one fails the check"""
+        mock_detector = Mock(stats=None, metadata={})
+        mock_detector.analyze_files.return_value = iter(
+            [
+                {
+                    "file": "a.txt",
+                    "pii_found": True,
+                    "pii_count": 2,
+                    "entities": [
+                        {"entity_type": "EMAIL_ADDRESS", "line": 1},
+                        {"entity_type": "EMAIL_ADDRESS", "line": 6},
+                    ],
+                }
+            ]
+        )
+        argv = ["pii_detect.py", "--no-daemon", "--since", "HEAD", "--changed-lines"]
+        printed = []
+
+        with patch("sys.argv", argv + ["--fail-fast", "."]):
+            with patch.object(
+                pii_detect.changes, "changed_files", return_value=[Path("a.txt")]
+            ):
+                with patch.object(
+                    pii_detect.changes,
+                    "changed_lines",
+                    return_value={Path("a.txt"): [(6, 6)]},
+                ):
+                    with patch.object(
+                        pii_detect, "PIIDetector", return_value=mock_detector
+                    ) as mock_detector_class:
+                        with patch.object(
+                            pii_detect,
+                            "print_results",
+                            side_effect=lambda r, *_, **__: printed.extend(r),
+                        ):
+                            with self.assertRaises(SystemExit) as exit_context:
+                                pii_detect.main()
+
+        self.assertFalse(mock_detector_class.call_args.kwargs["first_match"])
+        self.assertEqual(exit_context.exception.code, 1)
+        self.assertEqual([e["line"] for e in printed[0]["entities"]], [6])
+
+    def test_main_staged_scans_index_content(self):
+        """Test --staged scans copies of the staged content, reported under
+        the files' own paths"""
+        copy = Path(self.temp_dir) / "a.txt"
+        mock_detector = Mock(stats=None, metadata={})
+        mock_detector.analyze_files.return_value = iter(
+            [{"file": str(copy), "pii_found": True, "pii_count": 0, "entities": []}]
+        )
+        printed = []
+
+        with patch("sys.argv", ["pii_detect.py", "--no-daemon", "--staged", "."]):
+            with patch.object(
+                pii_detect.changes,
+                "export_staged",
+                return_value=[(copy, Path("a.txt")), (copy, Path("image.png"))],
+            ) as mock_export:
+                with patch.object(
+                    pii_detect, "PIIDetector", return_value=mock_detector
+                ):
+                    with patch.object(
+                        pii_detect,
+                        "print_results",
+                        side_effect=lambda r, *_, **__: printed.extend(r),
+                    ):
+                        pii_detect.main()
+
+        staged_dir = mock_export.call_args[0][1]
+        self.assertFalse(staged_dir.exists())
+        self.assertEqual(mock_detector.analyze_files.call_args[0][0], [copy])
+        self.assertEqual([result["file"] for result in printed], ["a.txt"])
+
+    @patch("sys.argv", ["pii_detect.py", "--no-daemon", "--since", "main", "."])
+    def test_main_since_compressed_files(self):
+        """Test git mode picks files by the same suffixes as a directory walk,
+        including compressed files and archives"""
+        mock_detector = Mock(stats=None, metadata={})
+        mock_detector.analyze_files.return_value = iter([])
+        changed = [Path("app.log.gz"), Path("data.zip"), Path("image.png.gz")]
+
+        with patch.object(pii_detect.changes, "changed_files", return_value=changed):
+            with patch.object(pii_detect, "PIIDetector", return_value=mock_detector):
+                with patch.object(pii_detect, "print_results"):
+                    pii_detect.main()
+
+        args, kwargs = mock_detector.analyze_files.call_args
+        self.assertEqual(args[0], [Path("app.log.gz"), Path("data.zip")])
+        self.assertEqual(kwargs["extensions"], pii_detect.DEFAULT_EXTENSIONS)
+
+    @patch("sys.argv", ["pii_detect.py", "--no-daemon", "--since", "bad", "."])
+    def test_main_since_git_error(self):
+        """Test git failures are reported and exit non-zero"""
+        with patch.object(
+            pii_detect.changes,
+            "changed_files",
+            side_effect=pii_detect.changes.GitError("unknown revision"),
+        ):
+            with patch("sys.stdout", StringIO()) as output:
+                with self.assertRaises(SystemExit):
+                    pii_detect.main()
+
+        self.assertIn("unknown revision", output.getvalue())
+
+    @patch("sys.argv", ["pii_detect.py", "serve", "--socket", "/tmp/test.sock"])
+    def test_main_serve(self):
+        """Test the serve subcommand starts the daemon"""
+        with patch.object(pii_detect, "PIIDetector") as mock_detector_class:
+            with patch.object(pii_detect.daemon, "serve") as mock_serve:
+                with patch("sys.stdout", StringIO()):
+                    pii_detect.main()
+
+                mock_serve.assert_called_once_with(
+                    mock_detector_class.return_value, "/tmp/test.sock"
+                )
+
+
+@unittest.skipUnless(hasattr(pii_detect.daemon.socket, "AF_UNIX"), "Unix sockets")
+class TestCLIWithDaemon(unittest.TestCase):
+    """Test the CLI against a real daemon serving a detector built from the
+    same command line options"""
+
+    @patch("pii_detect.detector._blank_nlp_engine")
+    @patch("pii_detect.detector.AnalyzerEngine")
+    def test_scan_uses_daemon(self, mock_analyzer, mock_blank):
+        """Test a scan with the daemon's options is answered by the daemon"""
+        import argparse
+        import shutil
+        import threading
+
+        from pii_detect.detector import PIIDetector
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        socket_path = os.path.join(temp_dir, "daemon.sock")
+        file_path = os.path.join(temp_dir, "notes.txt")
+        Path(file_path).write_text("Mail jane@example.com")
+        analyzer = mock_analyzer.return_value
+        analyzer.get_supported_entities.return_value = ["EMAIL_ADDRESS"]
+        analyzer.registry.recognizers = []
+        analyzer.analyze.return_value = [
+            Mock(entity_type="EMAIL_ADDRESS", start=5, end=21, score=1.0)
+        ]
+
+        parser = argparse.ArgumentParser()
+        pii_detect._add_detector_arguments(parser)
+        args = parser.parse_args(["--mode", "fast", "--no-cache"])
+        detector = PIIDetector(**pii_detect._detector_options(parser, args))
+        server = pii_detect.daemon.make_server(detector, socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        argv = ["pii-detect", "--mode", "fast", "--no-cache", "--socket"]
+        with patch("sys.argv", [*argv, socket_path, "-f", "json", file_path]):
+            # A scan falling back to an in-process detector fails the test
+            with patch.object(pii_detect, "PIIDetector", side_effect=AssertionError):
+                with patch("sys.stdout", StringIO()) as output:
+                    pii_detect.main()
+
+        [result] = json.loads(output.getvalue())
+        self.assertEqual(result["file"], file_path)
+        self.assertEqual(result["entities"][0]["text"], "jane@example.com")
+
 
 if __name__ == "__main__":
     unittest.main()
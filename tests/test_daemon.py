@@ -0,0 +1,169 @@
+"""
+Tests for the scan daemon and its client. The daemon serves a small fake
+detector so no Presidio model is needed.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect import daemon  # noqa: E402
+
+
+class FakeDetector:
+    """Stand-in for PIIDetector that flags any text containing '@'"""
+
+    _options: dict = {}
+    metadata = {"mode": "fast", "disabled_entities": ["PERSON"]}
+
+    def analyze_text(self, text):
+        if "@" not in text:
+            return []
+        return [{"entity_type": "EMAIL_ADDRESS", "start": 0, "end": len(text)}]
+
+    def analyze_file(self, file_path):
+        entities = self.analyze_text(Path(file_path).read_text())
+        return {
+            "file": str(file_path),
+            "pii_found": bool(entities),
+            "pii_count": len(entities),
+            "entities": entities,
+        }
+
+    def analyze_files(self, file_paths, extensions=None):
+        results = []
+        for file_path in file_paths:
+            if file_path.suffix == ".zip":
+                # Archives are reported member by member
+                results.extend(
+                    {"file": f"{file_path}!{name}", "entities": []}
+                    for name in ["a.txt", "b.txt"]
+                )
+            else:
+                results.append(self.analyze_file(file_path))
+        return results
+
+    def analyze_directory(self, directory_path, extensions=(".txt",)):
+        return [
+            self.analyze_file(file_path)
+            for file_path in sorted(Path(directory_path).rglob("*"))
+            if file_path.suffix in extensions
+        ]
+
+
+@unittest.skipUnless(hasattr(daemon.socket, "AF_UNIX"), "requires Unix sockets")
+class TestDaemon(unittest.TestCase):
+    """Test cases for the daemon server and client"""
+
+    def setUp(self):
+        """Start a daemon on a temporary socket"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, "pii.sock")
+        self.server = daemon.make_server(FakeDetector(), self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the daemon and clean up"""
+        import shutil
+
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.temp_dir)
+
+    def test_connect_and_analyze_text(self):
+        """Test a client can reach the daemon and analyze text"""
+        client = daemon.connect(self.socket_path)
+
+        self.assertIsNotNone(client)
+        results = client.analyze_text("john@example.com")
+        self.assertEqual(results[0]["entity_type"], "EMAIL_ADDRESS")
+        self.assertEqual(client.analyze_text("nothing here"), [])
+
+    def test_metadata(self):
+        """Test the client reports the resident detector's metadata"""
+        client = daemon.connect(self.socket_path)
+
+        self.assertEqual(client.metadata, FakeDetector.metadata)
+
+    def test_analyze_file_keeps_caller_path(self):
+        """Test file results are reported with the path the caller used"""
+        file_path = Path(self.temp_dir) / "a.txt"
+        file_path.write_text("john@example.com")
+
+        result = daemon.connect(self.socket_path).analyze_file(file_path)
+
+        self.assertEqual(result["file"], str(file_path))
+        self.assertTrue(result["pii_found"])
+
+    def test_analyze_files_keeps_caller_paths(self):
+        """Test files and archive members are reported under the caller's path,
+        even when it contains the member separator"""
+        directory = Path(self.temp_dir) / "x!y"
+        directory.mkdir()
+        (directory / "a.txt").write_text("john@example.com")
+        (directory / "logs.zip").write_bytes(b"")
+        relative = Path(os.path.relpath(directory))
+
+        results = daemon.connect(self.socket_path).analyze_files(
+            [relative / "a.txt", relative / "logs.zip"]
+        )
+
+        self.assertEqual(
+            [result["file"] for result in results],
+            [
+                str(relative / "a.txt"),
+                f"{relative / 'logs.zip'}!a.txt",
+                f"{relative / 'logs.zip'}!b.txt",
+            ],
+        )
+
+    def test_analyze_directory(self):
+        """Test directory scans are forwarded with their options"""
+        (Path(self.temp_dir) / "a.txt").write_text("john@example.com")
+        (Path(self.temp_dir) / "b.md").write_text("jane@example.com")
+
+        results = daemon.connect(self.socket_path).analyze_directory(
+            Path(self.temp_dir), extensions=[".md"]
+        )
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["file"], str(Path(self.temp_dir) / "b.md"))
+
+    def test_connect_rejects_mismatched_options(self):
+        """Test a daemon with a different configuration is not used"""
+        self.assertIsNone(daemon.connect(self.socket_path, {"mode": "fast"}))
+
+    def test_connect_ignores_result_neutral_options(self):
+        """Test options that never change the results need not match"""
+        options = {"collect_stats": True, "cache_dir": "/elsewhere"}
+        self.assertIsNotNone(daemon.connect(self.socket_path, options))
+
+    def test_connect_without_daemon(self):
+        """Test connecting to a missing socket falls back to None"""
+        missing = os.path.join(self.temp_dir, "missing.sock")
+        self.assertIsNone(daemon.connect(missing))
+
+    def test_second_daemon_refused(self):
+        """Test a second daemon cannot take over a live socket"""
+        with self.assertRaises(daemon.DaemonError):
+            daemon.make_server(FakeDetector(), self.socket_path)
+
+    def test_socket_removed_on_close(self):
+        """Test the socket file is removed when the daemon stops"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,10 +6,14 @@ and the if we did you use that we would need to download the
 """
 
 import os
+import re
+import shutil
 import sys
+import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import Mock, mock_open, patch
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
 # Add src to path for imports
 src_path = os.path.join(os.path.dirname(__file__), "..", "src")
@@ -17,7 +21,7 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 try:
-    from pii_detect.detector import PIIDetector
+    from pii_detect.detector import DEFAULT_EXTENSIONS, PIIDetector
 except ImportError:
     # Additional fallback for editors
     import importlib.util
@@ -29,27 +33,37 @@ except ImportError:
     detector_module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(detector_module)
     PIIDetector = detector_module.PIIDetector
+    DEFAULT_EXTENSIONS = detector_module.DEFAULT_EXTENSIONS
 
 
-class TestPIIDetector(unittest.TestCase):
-    """Test cases for PIIDetector class"""
+def email_entities(text):
+    """Entity dicts for the example.com email addresses in ``text``"""
+    return [
+        {
+            "entity_type": "EMAIL_ADDRESS",
+            "start": m.start(),
+            "end": m.end(),
+            "score": 1.0,
+            "text": m.group(),
+        }
+        for m in re.finditer(r"[\w.]+@example\.com", text)
+    ]
 
-    def setUp(self):
-        """Set up test fixtures"""
-        # Mock the presidio imports to avoid dependency issues in tests
-        self.presidio_patcher = patch.dict(
-            "sys.modules",
-            {"presidio_analyzer": Mock(), "presidio_analyzer.nlp_engine": Mock()},
-        )
-        self.presidio_patcher.start()
 
-    def tearDown(self):
-        """Clean up after tests"""
-        self.presidio_patcher.stop()
+def fake_analyze_batch(texts, context=None, analysis=None):
+    """Stand-in for ``PIIDetector._analyze_batch`` that finds example.com
+    email addresses"""
+    return [email_entities(text) for text in texts]
+
+
+class TestPIIDetector(unittest.TestCase):
+    """Test cases for PIIDetector class"""
 
+    @patch("pii_detect.detector.SpacyRecognizer", SimpleNamespace)
+    @patch("pii_detect.detector._blank_nlp_engine")
     @patch("pii_detect.detector.AnalyzerEngine")
     @patch("pii_detect.detector.NlpEngineProvider")
-    def test_init_success(self, mock_provider, mock_analyzer):
+    def test_init_success(self, mock_provider, mock_analyzer, mock_blank):
         """Test successful initialization of PIIDetector"""
         # Mock the provider and analyzer
         mock_nlp_engine = Mock()
@@ -58,7 +72,10 @@ class TestPIIDetector(unittest.TestCase):
         mock_provider.return_value = mock_provider_instance
 
         mock_analyzer_instance = Mock()
+        mock_analyzer_instance.get_supported_entities.return_value = ["PERSON"]
         mock_analyzer.return_value = mock_analyzer_instance
+        registry = mock_analyzer_instance.registry
+        registry.recognizers = [SimpleNamespace(supported_entities=["PERSON"])]
 
         # Create detector
         detector = PIIDetector()
@@ -66,7 +83,64 @@ class TestPIIDetector(unittest.TestCase):
         # Verify initialization
         self.assertIsNotNone(detector.analyzer)
         mock_provider.assert_called_once()
-        mock_analyzer.assert_called_once_with(nlp_engine=mock_nlp_engine)
+        mock_analyzer.assert_called_with(nlp_engine=mock_nlp_engine, registry=registry)
+
+    @patch("pii_detect.detector.SpacyRecognizer", SimpleNamespace)
+    @patch("pii_detect.detector._model_installed", return_value=True)
+    @patch("pii_detect.detector._blank_nlp_engine")
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_model_loaded_on_first_use(
+        self, mock_provider, mock_analyzer, mock_blank, mock_installed
+    ):
+        """Test a detector built without loading the model loads it once it
+        analyzes text itself, or up front if it is not installed"""
+        registry = mock_analyzer.return_value.registry
+        registry.recognizers = [SimpleNamespace(supported_entities=["PERSON"])]
+        mock_analyzer.return_value.get_supported_entities.return_value = ["PERSON"]
+        mock_analyzer.return_value.analyze.return_value = []
+
+        detector = PIIDetector(load_model=False)
+
+        mock_provider.assert_not_called()
+        mock_installed.assert_called_once_with("en_core_web_lg")
+        self.assertNotIn("load_model", detector._options)
+        detector.analyze_text("Jane")
+        detector.analyze_text("Jane")
+        mock_provider.assert_called_once()
+        mock_analyzer.assert_called_with(
+            nlp_engine=mock_provider.return_value.create_engine.return_value,
+            registry=registry,
+        )
+
+        mock_provider.reset_mock()
+        mock_installed.return_value = False
+        PIIDetector(load_model=False)
+        mock_provider.assert_called_once()
+
+    @patch("pii_detect.detector.SpacyRecognizer", SimpleNamespace)
+    @patch("pii_detect.detector._blank_nlp_engine")
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_model_only_loaded_for_ner(self, mock_provider, mock_analyzer, mock_blank):
+        """Test full mode skips loading the model when no enabled entity type
+        needs its NER"""
+        registry = mock_analyzer.return_value.registry
+        registry.recognizers = [
+            SimpleNamespace(supported_entities=["PERSON"]),
+            Mock(supported_entities=["EMAIL_ADDRESS"]),
+        ]
+        mock_analyzer.return_value.get_supported_entities.return_value = [
+            "EMAIL_ADDRESS",
+            "PERSON",
+        ]
+
+        detector = PIIDetector(entities=["EMAIL_ADDRESS"])
+
+        mock_provider.assert_not_called()
+        mock_analyzer.assert_called_once_with(nlp_engine=mock_blank.return_value)
+        self.assertEqual(detector.metadata["model"], "en_core_web_lg")
+        self.assertEqual(len(registry.recognizers), 1)
 
     @patch("pii_detect.detector.AnalyzerEngine")
     @patch("pii_detect.detector.NlpEngineProvider")
@@ -89,6 +163,7 @@ class TestPIIDetector(unittest.TestCase):
         mock_analyzer_instance.analyze.return_value = [mock_result]
         mock_analyzer_instance.get_supported_entities.return_value = []
         mock_analyzer.return_value = mock_analyzer_instance
+        mock_analyzer_instance.registry.recognizers = []
 
         # Create detector and analyze text
         detector = PIIDetector()
@@ -116,6 +191,7 @@ class TestPIIDetector(unittest.TestCase):
         mock_analyzer_instance.get_supported_entities.return_value = []
 
         mock_analyzer.return_value = mock_analyzer_instance
+        mock_analyzer_instance.registry.recognizers = []
 
         # Create detector and analyze text
         detector = PIIDetector()
@@ -126,8 +202,7 @@ class TestPIIDetector(unittest.TestCase):
 
     @patch("pii_detect.detector.AnalyzerEngine")
     @patch("pii_detect.detector.NlpEngineProvider")
-    @patch("builtins.open", new_callable=mock_open, read_data="John Doe")
-    def test_analyze_file_success(self, _, mock_provider, mock_analyzer):
+    def test_analyze_file_success(self, mock_provider, mock_analyzer):
         """Test successful file analysis"""
         # Mock setup
         mock_nlp_engine = Mock()
@@ -146,10 +221,14 @@ class TestPIIDetector(unittest.TestCase):
         mock_analyzer_instance.analyze.return_value = [mock_result]
         mock_analyzer_instance.get_supported_entities.return_value = []
         mock_analyzer.return_value = mock_analyzer_instance
+        mock_analyzer_instance.registry.recognizers = []
 
         # Create detector and analyze file
         detector = PIIDetector()
-        file_path = Path("/fake/path/test.txt")
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_path = temp_dir / "test.txt"
+        file_path.write_text("John Doe")
         result = detector.analyze_file(file_path)
 
         # Verify results
@@ -170,7 +249,9 @@ class TestPIIDetector(unittest.TestCase):
         mock_provider.return_value = mock_provider_instance
 
         mock_analyzer_instance = Mock()
+        mock_analyzer_instance.get_supported_entities.return_value = []
         mock_analyzer.return_value = mock_analyzer_instance
+        mock_analyzer_instance.registry.recognizers = []
 
         # Create detector and analyze file
         detector = PIIDetector()
@@ -183,10 +264,725 @@ class TestPIIDetector(unittest.TestCase):
         self.assertIn("error", result)
         self.assertEqual(result["file"], str(file_path))
 
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_analyze_file_in_chunks(self, mock_provider, mock_analyzer):
+        """Test large files are analyzed in windows with absolute offsets"""
+        detector = PIIDetector(
+            chunk_size=200, chunk_overlap=50, batch_size=1, context_width=8
+        )
+        content = "".join(f"Contact user{i}@example.com today\n" for i in range(50))
+
+        def fake_analyze_text(text):
+            self.assertLessEqual(len(text), 400)
+            return email_entities(text)
+
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_path = temp_dir / "big.log"
+        file_path.write_text(content)
+        with patch.object(
+            detector,
+            "_analyze_batch",
+            side_effect=lambda texts, *_: map(fake_analyze_text, texts),
+        ):
+            result = detector.analyze_file(file_path)
+
+        self.assertEqual(result["pii_count"], 50)
+        for line, entity in enumerate(result["entities"], 1):
+            self.assertEqual(content[entity["start"] : entity["end"]], entity["text"])
+            self.assertEqual((entity["line"], entity["column"]), (line, 9))
+            self.assertEqual(entity["end_line"], line)
+            self.assertEqual(entity["context"], f"Contact {entity['text']} today")
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_structured_files(self, mock_provider, mock_analyzer):
+        """Test CSV and JSON values are analyzed by field, with the field name
+        as context, and sampled as configured"""
+        calls = []
+
+        def recording_analyze_batch(texts, context=None, analysis=None):
+            calls.append((list(texts), context))
+            return fake_analyze_batch(texts)
+
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        csv_path = temp_dir / "people.csv"
+        csv_content = "name,email\n" + "".join(
+            f'user {i},"Mail: ""u{i}@example.com"""\n' for i in range(6)
+        )
+        csv_path.write_text(csv_content)
+        json_path = temp_dir / "people.json"
+        json_content = '{"users": [{"email": "a@example.com"}], "note": "hi"}'
+        json_path.write_text(json_content)
+        bad_path = temp_dir / "bad.json"
+        bad_path.write_text("not json, x@example.com")
+
+        detector = PIIDetector(batch_size=4, prefilter=False)
+        with patch.object(
+            detector, "_analyze_batch", side_effect=recording_analyze_batch
+        ):
+            results = list(detector.analyze_files([csv_path, json_path, bad_path]))
+
+        csv_entities = results[0]["entities"]
+        self.assertEqual(len(csv_entities), 6)
+        for line, entity in enumerate(csv_entities, 2):
+            self.assertEqual(entity["field"], "email")
+            self.assertNotIn("path", entity)
+            self.assertEqual(
+                csv_content[entity["start"] : entity["end"]], entity["text"]
+            )
+            self.assertEqual((entity["line"], entity["column"]), (line, 17))
+        self.assertIn(["name"], [context for _, context in calls])
+        self.assertIn(["email"], [context for _, context in calls])
+
+        (json_entity,) = results[1]["entities"]
+        self.assertEqual(json_entity["field"], "$.users[*].email")
+        self.assertEqual(json_entity["path"], "$.users[0].email")
+        self.assertEqual(
+            json_content[json_entity["start"] : json_entity["end"]], "a@example.com"
+        )
+        # Invalid JSON is analyzed as plain text instead
+        self.assertEqual(results[2]["entities"][0]["text"], "x@example.com")
+
+        calls.clear()
+        detector = PIIDetector(batch_size=1, field_sample=3, classify_after=2)
+        with patch.object(
+            detector, "_analyze_batch", side_effect=recording_analyze_batch
+        ):
+            sampled = detector.analyze_file(csv_path)
+        self.assertEqual(
+            [texts[0] for texts, context in calls if context == ["email"]],
+            ['Mail: "u0@example.com"', 'Mail: "u1@example.com"'],
+        )
+        self.assertEqual(len([1 for _, context in calls if context == ["name"]]), 3)
+        self.assertEqual(sampled["pii_count"], 2)
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_archives_and_compressed_files(self, mock_provider, mock_analyzer):
+        """Test compressed files are read decompressed and archive members
+        reported as archive!member, without extracting them"""
+        import gzip
+        import io
+        import tarfile
+        import zipfile
+
+        batches = []
+
+        def recording_analyze_batch(texts, context=None, analysis=None):
+            batches.append(list(texts))
+            return fake_analyze_batch(texts)
+
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        (temp_dir / "app.log.gz").write_bytes(gzip.compress(b"to a@example.com\n"))
+        (temp_dir / "blob.gz").write_bytes(gzip.compress(b"b@example.com"))
+        long_text = "filler line\n" * 20 + "last c@example.com\n"
+        (temp_dir / "long.log.gz").write_bytes(gzip.compress(long_text.encode()))
+        with tarfile.open(temp_dir / "logs.tar.gz", "w:gz") as archive:
+            for name, data in [
+                ("logs/one.log", b"d@example.com"),
+                ("logs/two.log", b"e@example.com"),
+                ("logs/old.log.gz", gzip.compress(b"f@example.com")),
+                ("bin/tool", b"g@example.com"),
+            ]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        with zipfile.ZipFile(temp_dir / "bundle.zip", "w") as archive:
+            archive.writestr("people.csv", "name,email\nH,h@example.com\n")
+            archive.writestr("huge.txt", "x" * 2000)
+        (temp_dir / "broken.zip").write_bytes(b"not a zip")
+
+        detector = PIIDetector(
+            chunk_size=100, chunk_overlap=10, max_file_size=1000, prefilter=False
+        )
+        with patch.object(
+            detector, "_analyze_batch", side_effect=recording_analyze_batch
+        ):
+            results = {
+                result["file"][len(str(temp_dir)) + 1 :]: result
+                for result in detector.iter_directory(temp_dir, extensions=[".log"])
+            }
+
+        self.assertEqual(
+            sorted(results),
+            [
+                "app.log.gz",
+                "broken.zip",
+                "logs.tar.gz!logs/old.log.gz",
+                "logs.tar.gz!logs/one.log",
+                "logs.tar.gz!logs/two.log",
+                "long.log.gz",
+            ],
+        )
+        self.assertEqual(results["app.log.gz"]["entities"][0]["text"], "a@example.com")
+        self.assertIn("invalid zip archive", results["broken.zip"]["error"])
+        self.assertEqual(
+            results["logs.tar.gz!logs/old.log.gz"]["entities"][0]["text"],
+            "f@example.com",
+        )
+        # Small members are analyzed together, without byte offsets
+        self.assertIn(["d@example.com", "e@example.com"], batches)
+        self.assertNotIn(
+            "byte_start", results["logs.tar.gz!logs/one.log"]["entities"][0]
+        )
+        # Content longer than a chunk is streamed in windows
+        (entity,) = results["long.log.gz"]["entities"]
+        self.assertEqual((entity["text"], entity["line"]), ("c@example.com", 21))
+        self.assertEqual(long_text[entity["start"] : entity["end"]], "c@example.com")
+
+        with patch.object(
+            detector, "_analyze_batch", side_effect=recording_analyze_batch
+        ):
+            members = list(detector.analyze_files([temp_dir / "bundle.zip"]))
+        self.assertEqual(members[0]["file"], f"{temp_dir / 'bundle.zip'}!people.csv")
+        self.assertEqual(members[0]["entities"][0]["field"], "email")
+        self.assertIn("exceeds limit", members[1]["skipped"])
+
+        detector = PIIDetector(archives=False)
+        (result,) = detector.analyze_files([temp_dir / "app.log.gz"])
+        self.assertEqual(result["skipped"], "binary content")
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_analyze_texts_in_batches(self, mock_provider, mock_analyzer):
+        """Test many texts are pushed through the batch analyzer together"""
+        mock_analyzer.return_value.get_supported_entities.return_value = []
+        detector = PIIDetector(batch_size=2, prefilter=False)
+
+        mock_result = Mock(entity_type="PERSON", start=0, end=4, score=0.85)
+        detector.batch_analyzer = Mock()
+        detector.batch_analyzer.analyze_iterator.side_effect = lambda texts, **_: [
+            [mock_result] for _ in texts
+        ]
+        detector.analyzer.analyze.return_value = []
+
+        results = detector.analyze_texts(["John", "Jane", "none"])
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0][0]["text"], "John")
+        self.assertEqual(results[1][0]["text"], "Jane")
+        self.assertEqual(results[2], [])
+        batches = [
+            c.args[0] for c in detector.batch_analyzer.analyze_iterator.call_args_list
+        ]
+        self.assertEqual(batches, [["John", "Jane"]])
+        detector.analyzer.analyze.assert_called_once()
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_prefilter_analyzes_candidate_regions(self, mock_provider, mock_analyzer):
+        """Test only lines that could hold PII reach the analyzer"""
+        mock_analyzer.return_value.get_supported_entities.return_value = []
+        detector = PIIDetector()
+        detector.batch_analyzer = Mock()
+        detector.batch_analyzer.analyze_iterator.side_effect = lambda texts, **_: [
+            [Mock(entity_type="PERSON", start=m.start(), end=m.end(), score=0.85)]
+            for m in (re.search("Ann", t) for t in texts)
+        ]
+        filler = "just some lower case words\n" * 20
+        text = filler + "ask Ann\n" + filler + "or Ann\n" + filler
+
+        results = detector.analyze_texts([text, filler])
+
+        analyzed = detector.batch_analyzer.analyze_iterator.call_args.args[0]
+        self.assertEqual(len(analyzed), 2)
+        self.assertLess(sum(map(len, analyzed)), len(text) / 4)
+        self.assertEqual(
+            [(r["start"], r["text"]) for r in results[0]],
+            [(m.start(), "Ann") for m in re.finditer("Ann", text)],
+        )
+        self.assertEqual(results[1], [])
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_analyze_files_batches_small_files(self, mock_provider, mock_analyzer):
+        """Test small files are batched while results keep file order"""
+        detector = PIIDetector(chunk_size=100, chunk_overlap=10, batch_size=8)
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        small_a = temp_dir / "a.txt"
+        small_a.write_text("John")
+        large = temp_dir / "b.txt"
+        large.write_text("Jane\n" * 50)
+        small_c = temp_dir / "c.txt"
+        small_c.write_text("Bob")
+        missing = temp_dir / "missing.txt"
+
+        with patch.object(
+            detector,
+            "_iter_analyze_texts",
+            side_effect=lambda texts, _: iter([[] for _ in texts]),
+        ) as mock_batch:
+            results = list(detector.analyze_files([small_a, large, small_c, missing]))
+
+        self.assertEqual(
+            [r["file"] for r in results],
+            [str(small_a), str(large), str(small_c), str(missing)],
+        )
+        self.assertIn("error", results[3])
+        batched_texts = [c.args[0] for c in mock_batch.call_args_list]
+        self.assertIn(["John"], batched_texts)
+        self.assertIn(["Bob"], batched_texts)
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_iter_stream(self, mock_provider, mock_analyzer):
+        """Test streamed lines are reported in batches with PII, positioned
+        in the whole stream"""
+        analyzer = mock_analyzer.return_value
+        analyzer.get_supported_entities.return_value = ["EMAIL_ADDRESS"]
+        analyzer.registry.recognizers = []
+        analyzer.analyze.side_effect = lambda text, **_: [
+            Mock(entity_type="EMAIL_ADDRESS", start=m.start(), end=m.end(), score=1.0)
+            for m in re.finditer(r"\S+@\S+", text)
+        ]
+        detector = PIIDetector(chunk_size=20, chunk_overlap=0, collect_stats=True)
+        lines = ["hello there\n", "still nothing\n", "mail jane@x.io\n"]
+
+        results = list(detector.iter_stream(lines, max_delay=0))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["file"], "-")
+        [entity] = results[0]["entities"]
+        self.assertEqual((entity["start"], entity["end"]), (31, 40))
+        self.assertEqual((entity["line"], entity["column"]), (3, 6))
+        self.assertEqual(detector.stats.counters["entities"], 1)
+        self.assertNotIn("files", detector.stats.counters)
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_collect_stats(self, mock_provider, mock_analyzer):
+        """Test stages, recognizers and counts are timed only when asked"""
+        recognizer = SimpleNamespace(
+            name="EmailRecognizer",
+            supported_entities=["EMAIL_ADDRESS"],
+            analyze=Mock(return_value=[]),
+        )
+        analyzer = mock_analyzer.return_value
+        analyzer.get_supported_entities.return_value = ["EMAIL_ADDRESS"]
+        analyzer.registry.recognizers = [recognizer]
+
+        def fake_analyze(text, **_):
+            analyzer.nlp_engine.process_text(text, "en")
+            recognizer.analyze(text=text)
+            return [Mock(entity_type="EMAIL_ADDRESS", start=0, end=4, score=1.0)]
+
+        analyzer.analyze.side_effect = fake_analyze
+        self.assertIsNone(PIIDetector().stats)
+        detector = PIIDetector(
+            chunk_size=100, chunk_overlap=10, batch_size=1, collect_stats=True
+        )
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        (temp_dir / "small.txt").write_text("Jane")
+        (temp_dir / "large.txt").write_text("Jane\n" * 30)
+        (temp_dir / "image.txt").write_bytes(b"\0\0\0")
+
+        with patch(
+            "pii_detect.detector.iter_files",
+            return_value=iter(sorted(temp_dir.iterdir())),
+        ):
+            results = detector.analyze_directory(temp_dir)
+
+        stats = detector.stats
+        self.assertEqual(len(results), 3)
+        self.assertEqual(
+            stats.counters,
+            {
+                "bytes": 154,
+                "characters_analyzed": 164,
+                "entities": 2,
+                "files": 2,
+                "skipped_files": 1,
+                "windows": 2,
+            },
+        )
+        self.assertLessEqual(
+            {"walk", "read", "decode", "prefilter", "analyze", "nlp", "recognizers"},
+            set(stats.timings),
+        )
+        self.assertIn("recognizer:EmailRecognizer", stats.timings)
+        self.assertEqual(
+            detector._cache_key("x"),
+            PIIDetector(chunk_size=100, chunk_overlap=10, batch_size=1)._cache_key("x"),
+        )
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_binary_and_oversize_files_skipped(self, mock_provider, mock_analyzer):
+        """Test binary and oversize files are skipped with a reason"""
+        detector = PIIDetector(chunk_size=100, chunk_overlap=10, max_file_size=1000)
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        binary = temp_dir / "small.log"
+        binary.write_bytes(b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR")
+        large_binary = temp_dir / "large.log"
+        large_binary.write_bytes(b"\0" * 500)
+        huge = temp_dir / "huge.json"
+        huge.write_text("{}" * 1000)
+        latin = temp_dir / "latin.txt"
+        latin.write_bytes("Caf\u00e9 Ren\u00e9e".encode("latin-1"))
+
+        with patch.object(
+            detector,
+            "_iter_analyze_texts",
+            side_effect=lambda texts, _: iter([[] for _ in texts]),
+        ) as mock_batch:
+            results = list(detector.analyze_files([binary, large_binary, huge, latin]))
+
+        self.assertEqual(results[0]["skipped"], "binary content")
+        self.assertEqual(results[1]["skipped"], "binary content")
+        self.assertIn("exceeds limit", results[2]["skipped"])
+        self.assertNotIn("skipped", results[3])
+        self.assertFalse(any(r["pii_found"] for r in results))
+        batched_texts = [c.args[0] for c in mock_batch.call_args_list if c.args[0]]
+        self.assertEqual(batched_texts, [["Caf\u00e9 Ren\u00e9e"]])
+
+        streaming = PIIDetector(max_file_size=1000, oversize="stream")
+        with patch.object(streaming, "_analyze_windows", return_value=[]):
+            self.assertNotIn("skipped", streaming.analyze_file(huge))
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_byte_offsets_reported(self, mock_provider, mock_analyzer):
+        """Test entities carry byte offsets for streamed and batched files"""
+        detector = PIIDetector(chunk_size=200, chunk_overlap=50)
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        content = "".join(
+            f"Caf\u00e9 \u65e5\u672c user{i}@example.com\n" for i in range(50)
+        )
+        large = temp_dir / "large.txt"
+        large.write_bytes(b"\xef\xbb\xbf" + content.encode("utf-8"))
+        small = temp_dir / "small.txt"
+        small.write_text(content[:40], encoding="utf-8")
+
+        with patch.object(
+            detector,
+            "_iter_analyze_texts",
+            side_effect=lambda texts, *_, **__: iter(fake_analyze_batch(texts)),
+        ):
+            results = list(detector.analyze_files([large, small]))
+
+        self.assertEqual(results[0]["pii_count"], 50)
+        self.assertEqual(results[1]["pii_count"], 1)
+        for file_path, result in zip([large, small], results):
+            data = file_path.read_bytes()
+            for entity in result["entities"]:
+                self.assertEqual(
+                    data[entity["byte_start"] : entity["byte_end"]].decode("utf-8"),
+                    entity["text"],
+                )
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_cached_files_not_reanalyzed(self, mock_provider, mock_analyzer):
+        """Test unchanged files are answered from the result cache"""
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        mock_analyzer.return_value.get_supported_entities.return_value = ["PERSON"]
+        mock_result = Mock(entity_type="PERSON", start=0, end=8, score=0.85)
+        mock_analyzer.return_value.analyze.return_value = [mock_result]
+        small = temp_dir / "small.txt"
+        small.write_text("John Doe")
+        large = temp_dir / "large.txt"
+        large.write_text("John Doe" + " filler" * 100)
+
+        detector = PIIDetector(
+            chunk_size=100, chunk_overlap=10, cache_dir=str(temp_dir / "cache")
+        )
+        first = list(detector.analyze_files([small, large]))
+        calls = mock_analyzer.return_value.analyze.call_count
+        second = list(detector.analyze_files([small, large]))
+
+        self.assertEqual(first, second)
+        self.assertEqual(second[0]["entities"][0]["text"], "John Doe")
+        self.assertEqual(mock_analyzer.return_value.analyze.call_count, calls)
+
+        small.write_text("Jane Doe")
+        changed = detector.analyze_files([small])
+        self.assertEqual(next(changed)["entities"][0]["text"], "Jane Doe")
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_cached_results_keyed_by_analysis(self, mock_provider, mock_analyzer):
+        """Test the same content is cached separately when parsed as structured
+        data, analyzed as plain text or read from an archive member"""
+        import zipfile
+
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        content = "name,email\nH,h@example.com\n"
+        (temp_dir / "people.csv").write_text(content)
+        (temp_dir / "people.txt").write_text(content)
+        with zipfile.ZipFile(temp_dir / "bundle.zip", "w") as archive:
+            archive.writestr("people.txt", content)
+
+        detector = PIIDetector(cache_dir=str(temp_dir / "cache"), prefilter=False)
+        with patch.object(detector, "_analyze_batch", side_effect=fake_analyze_batch):
+            csv_result, text_result, member_result = detector.analyze_files(
+                [
+                    temp_dir / "people.csv",
+                    temp_dir / "people.txt",
+                    temp_dir / "bundle.zip",
+                ]
+            )
+
+        self.assertEqual(csv_result["entities"][0]["field"], "email")
+        self.assertNotIn("field", text_result["entities"][0])
+        self.assertIn("byte_start", text_result["entities"][0])
+        self.assertNotIn("byte_start", member_result["entities"][0])
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_invalid_chunk_overlap(self, mock_provider, mock_analyzer):
+        """Test the chunk overlap must be smaller than the chunk size"""
+        with self.assertRaises(ValueError):
+            PIIDetector(chunk_size=100, chunk_overlap=100)
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_entities_resolved_and_recognizers_pruned(
+        self, mock_provider, mock_analyzer
+    ):
+        """Test enabled entities are resolved once and unused recognizers dropped"""
+        mock_analyzer.return_value.get_supported_entities.return_value = [
+            "DATE_TIME",
+            "EMAIL_ADDRESS",
+            "PERSON",
+            "PHONE_NUMBER",
+        ]
+        email = Mock(supported_entities=["EMAIL_ADDRESS"])
+        date = Mock(supported_entities=["DATE_TIME"])
+        phone = Mock(supported_entities=["PHONE_NUMBER"])
+        mock_analyzer.return_value.registry.recognizers = [email, date, phone]
+        mock_analyzer.return_value.analyze.return_value = []
+
+        detector = PIIDetector(exclude_entities=["DATE_TIME", "PHONE_NUMBER"])
+        detector.analyze_text("Hello")
+
+        self.assertEqual(detector.entities, ["EMAIL_ADDRESS", "PERSON"])
+        self.assertEqual(mock_analyzer.return_value.registry.recognizers, [email])
+        mock_analyzer.return_value.analyze.assert_called_once_with(
+            text="Hello", entities=["EMAIL_ADDRESS", "PERSON"], language="en"
+        )
+        mock_analyzer.return_value.get_supported_entities.assert_called_once()
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_default_entities_exclude_noisy_types(self, mock_provider, mock_analyzer):
+        """Test the default excluded entity types are not detected"""
+        mock_analyzer.return_value.get_supported_entities.return_value = [
+            "DATE_TIME",
+            "PERSON",
+        ]
+        mock_analyzer.return_value.registry.recognizers = []
+
+        self.assertEqual(PIIDetector().entities, ["PERSON"])
+        self.assertEqual(
+            PIIDetector(entities=["DATE_TIME"], exclude_entities=[]).entities,
+            ["DATE_TIME"],
+        )
+
+    @patch("pii_detect.detector.SpacyRecognizer", SimpleNamespace)
+    @patch("pii_detect.detector._blank_nlp_engine")
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_fast_mode(self, mock_provider, mock_analyzer, mock_blank):
+        """Test fast mode loads no model and drops NER-based recognizers"""
+        ner = SimpleNamespace(supported_entities=["PERSON"])
+        email = Mock(supported_entities=["EMAIL_ADDRESS"])
+        registry = mock_analyzer.return_value.registry
+        registry.recognizers = [ner, email]
+        mock_analyzer.return_value.get_supported_entities.side_effect = lambda **_: [
+            entity for r in registry.recognizers for entity in r.supported_entities
+        ]
+
+        detector = PIIDetector(mode="fast")
+
+        mock_provider.assert_not_called()
+        mock_analyzer.assert_called_once_with(nlp_engine=mock_blank.return_value)
+        self.assertEqual(registry.recognizers, [email])
+        self.assertEqual(detector.entities, ["EMAIL_ADDRESS"])
+        self.assertEqual(detector.metadata["mode"], "fast")
+        self.assertIsNone(detector.metadata["model"])
+        self.assertEqual(detector.metadata["disabled_entities"], ["PERSON"])
+
+        registry.recognizers = [ner, email]
+        with self.assertRaises(ValueError):
+            PIIDetector(mode="fast", entities=["PERSON"])
+        with self.assertRaises(ValueError):
+            PIIDetector(mode="quick")
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_min_score_and_overlaps(self, mock_provider, mock_analyzer):
+        """Test low scoring entities are dropped and overlaps resolved before
+        entities are reported"""
+        analyzer = mock_analyzer.return_value
+        analyzer.get_supported_entities.return_value = ["EMAIL_ADDRESS", "URL"]
+        analyzer.registry.recognizers = []
+        analyzer.analyze.return_value = [
+            Mock(entity_type="URL", start=10, end=21, score=0.5),
+            Mock(entity_type="EMAIL_ADDRESS", start=5, end=21, score=1.0),
+            Mock(entity_type="URL", start=25, end=32, score=0.2),
+        ]
+        text = "Mail jane@example.com or x.io/a"
+
+        self.assertEqual(len(PIIDetector().analyze_text(text)), 3)
+        detector = PIIDetector(min_score=0.3, overlaps="score", collect_stats=True)
+        [entity] = detector.analyze_text(text)
+        self.assertEqual(entity["text"], "jane@example.com")
+        self.assertEqual(detector.stats.counters["entities_dropped"], 2)
+        self.assertNotEqual(
+            detector._cache_key("x"), PIIDetector(min_score=0.3)._cache_key("x")
+        )
+        with self.assertRaises(ValueError):
+            PIIDetector(min_score=2)
+        with self.assertRaises(ValueError):
+            PIIDetector(overlaps="first")
+
+    @patch("pii_detect.detector.SpacyRecognizer", SimpleNamespace)
+    @patch("pii_detect.detector._blank_nlp_engine")
+    @patch("pii_detect.detector.BatchAnalyzerEngine")
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_first_match(self, mock_provider, mock_analyzer, mock_batch, mock_blank):
+        """Test pattern recognizers run before NER, which only runs when they
+        find nothing, and files stop at their first finding"""
+        full, patterns = Mock(), Mock()
+        # The analyzer is built on the tokenizer, then again on the model
+        mock_analyzer.side_effect = [full, full, patterns]
+        full.registry.recognizers = [
+            SimpleNamespace(supported_entities=["PERSON"]),
+            Mock(supported_entities=["EMAIL_ADDRESS"]),
+        ]
+        full.get_supported_entities.return_value = ["EMAIL_ADDRESS", "PERSON"]
+        full.analyze.side_effect = lambda text, **_: [
+            Mock(entity_type="PERSON", start=m.start(), end=m.end(), score=0.85)
+            for m in re.finditer(r"Jane", text)
+        ]
+        patterns.analyze.side_effect = lambda text, **_: [
+            Mock(entity_type="EMAIL_ADDRESS", start=m.start(), end=m.end(), score=1.0)
+            for m in re.finditer(r"\S+@\S+", text)
+        ]
+        detector = PIIDetector(
+            chunk_size=20, chunk_overlap=0, batch_size=1, first_match=True
+        )
+
+        self.assertTrue(detector.contains_pii("Jane at jane@x.io"))
+        full.analyze.assert_not_called()
+        mock_analyzer.assert_called_with(
+            nlp_engine=mock_blank.return_value, registry=full.registry
+        )
+        self.assertEqual(
+            patterns.analyze.call_args.kwargs["entities"], ["EMAIL_ADDRESS"]
+        )
+        self.assertTrue(detector.contains_pii("Call Jane"))
+        self.assertEqual(full.analyze.call_args.kwargs["entities"], ["PERSON"])
+        self.assertFalse(detector.contains_pii("Call Jane", min_score=0.9))
+        self.assertFalse(detector.contains_pii("nothing to see"))
+
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        large = temp_dir / "large.txt"
+        large.write_text("Mail bob@x.io\n" + "Then Jane wrote\n" * 50)
+        full.analyze.reset_mock()
+        patterns.analyze.reset_mock()
+
+        result = detector.analyze_file(large)
+
+        self.assertTrue(result["pii_found"])
+        self.assertEqual([e["text"] for e in result["entities"]], ["bob@x.io"])
+        self.assertEqual(patterns.analyze.call_count, 1)
+        full.analyze.assert_not_called()
+
+    @patch("pii_detect.detector.SpacyRecognizer", SimpleNamespace)
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_model_choice(self, mock_provider, mock_analyzer):
+        """Test the chosen model is loaded, reported and part of the cache key"""
+        mock_analyzer.return_value.get_supported_entities.return_value = ["PERSON"]
+        mock_analyzer.return_value.registry.recognizers = [
+            SimpleNamespace(supported_entities=["PERSON"])
+        ]
+
+        detector = PIIDetector(
+            model="en_core_web_sm", disabled_components=["parser", "lemmatizer"]
+        )
+
+        configuration = mock_provider.call_args.kwargs["nlp_configuration"]
+        self.assertEqual(configuration["models"][0]["model_name"], "en_core_web_sm")
+        self.assertEqual(detector.metadata["model"], "en_core_web_sm")
+        self.assertEqual(
+            detector.metadata["disabled_components"], ["lemmatizer", "parser"]
+        )
+        self.assertEqual(PIIDetector().metadata["model"], "en_core_web_lg")
+        self.assertNotEqual(
+            detector._cache_key("hash"),
+            PIIDetector(model="en_core_web_lg")._cache_key("hash"),
+        )
+
+        with self.assertRaises(ValueError):
+            PIIDetector(mode="fast", model="en_core_web_sm")
+        with self.assertRaises(ValueError):
+            PIIDetector(disabled_components=["ner"])
+
+    def test_pruned_spacy_nlp_engine(self):
+        """Test models are loaded without the disabled components, after
+        Presidio's own checks"""
+        import spacy
+
+        from pii_detect.detector import _pruned_spacy_nlp_engine
+
+        nlp = spacy.blank("en")
+        nlp.add_pipe("parser")
+        nlp.add_pipe("ner")
+        nlp.initialize()
+        model_dir = tempfile.mkdtemp()
+        try:
+            nlp.to_disk(model_dir)
+
+            engine = _pruned_spacy_nlp_engine(["parser"])(
+                models=[{"lang_code": "en", "model_name": model_dir}]
+            )
+            engine.load()
+        finally:
+            shutil.rmtree(model_dir)
+
+        self.assertEqual(engine.nlp["en"].pipe_names, ["ner"])
+
+        # A missing model is downloaded as Presidio would before it is loaded
+        missing = _pruned_spacy_nlp_engine(["parser"])(
+            models=[{"lang_code": "en", "model_name": "en_missing_model"}]
+        )
+        with patch("spacy.cli.download") as mock_download:
+            with self.assertRaises(OSError):
+                missing.load()
+        mock_download.assert_called_once_with("en_missing_model")
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_unsupported_entities(self, mock_provider, mock_analyzer):
+        """Test unknown or empty entity selections are rejected"""
+        mock_analyzer.return_value.get_supported_entities.return_value = ["PERSON"]
+        mock_analyzer.return_value.registry.recognizers = []
+
+        with self.assertRaises(ValueError):
+            PIIDetector(entities=["NOT_AN_ENTITY"])
+        with self.assertRaises(ValueError):
+            PIIDetector(exclude_entities=["PERSON"])
+
     @patch("pii_detect.detector.AnalyzerEngine")
     @patch("pii_detect.detector.NlpEngineProvider")
     def test_analyze_directory(self, mock_provider, mock_analyzer):
         """Test directory analysis"""
+        from pii_detect.archive import CONTAINER_SUFFIXES
+
         # Mock setup
         mock_nlp_engine = Mock()
         mock_provider_instance = Mock()
@@ -195,7 +991,9 @@ class TestPIIDetector(unittest.TestCase):
 
         mock_analyzer_instance = Mock()
         mock_analyzer_instance.analyze.return_value = []
+        mock_analyzer_instance.get_supported_entities.return_value = []
         mock_analyzer.return_value = mock_analyzer_instance
+        mock_analyzer_instance.registry.recognizers = []
 
         # Create detector
         detector = PIIDetector()
@@ -205,17 +1003,26 @@ class TestPIIDetector(unittest.TestCase):
         mock_file1 = Mock()
         mock_file1.is_file.return_value = True
         mock_file1.suffix = ".txt"
+        mock_file1.name = "file1.txt"
+        # Files too large to batch are analyzed one at a time
+        mock_file1.stat.return_value.st_size = 10**6
         mock_file1.__str__ = lambda: "/fake/file1.txt"
 
         mock_file2 = Mock()
         mock_file2.is_file.return_value = True
         mock_file2.suffix = ".py"
+        mock_file2.name = "file2.py"
+        mock_file2.stat.return_value.st_size = 10**6
         mock_file2.__str__ = lambda: "/fake/file2.py"
 
-        mock_directory.rglob.return_value = [mock_file1, mock_file2]
-
-        # Mock the analyze_file method to avoid file I/O
-        with patch.object(detector, "analyze_file") as mock_analyze_file:
+        # Mock the directory walk and analyze_file method to avoid file I/O
+        with (
+            patch(
+                "pii_detect.detector.iter_files",
+                return_value=iter([mock_file1, mock_file2]),
+            ) as mock_iter_files,
+            patch.object(detector, "analyze_file") as mock_analyze_file,
+        ):
             mock_analyze_file.return_value = {
                 "file": "test.txt",
                 "pii_found": False,
@@ -228,6 +1035,35 @@ class TestPIIDetector(unittest.TestCase):
             # Verify results
             self.assertEqual(len(results), 2)
             self.assertEqual(mock_analyze_file.call_count, 2)
+            # Compressed files and archives are found alongside text files
+            mock_iter_files.assert_called_once_with(
+                mock_directory, [*DEFAULT_EXTENSIONS, *CONTAINER_SUFFIXES], (), True
+            )
+
+    @patch("pii_detect.detector.AnalyzerEngine")
+    @patch("pii_detect.detector.NlpEngineProvider")
+    def test_analyze_directory_workers(self, mock_provider, mock_analyzer):
+        """Test directory analysis is handed to the worker pool"""
+        detector = PIIDetector()
+
+        mock_directory = Mock()
+        mock_file = Mock()
+        mock_file.is_file.return_value = True
+        mock_file.suffix = ".txt"
+        mock_file.name = "file.txt"
+        with (
+            patch("pii_detect.detector.iter_files", return_value=iter([mock_file])),
+            patch(
+                "pii_detect.detector.iter_files_parallel", return_value=iter([])
+            ) as mock_parallel,
+        ):
+            results = detector.analyze_directory(mock_directory, workers=4)
+
+        self.assertEqual(results, [])
+        file_paths, workers, factory = mock_parallel.call_args[0]
+        self.assertEqual(list(file_paths), [mock_file])
+        self.assertEqual(workers, 4)
+        self.assertIs(factory.func, PIIDetector)
 
 
 if __name__ == "__main__":
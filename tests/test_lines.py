@@ -0,0 +1,75 @@
+"""
+Unit tests for line positions
+"""
+
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.lines import LineIndex, add_positions  # noqa: E402
+
+TEXT = "first line\nJohn Doe lives here\n\nmail jane@example.com now"
+
+
+class TestLineIndex(unittest.TestCase):
+    """Test cases for LineIndex"""
+
+    def test_positions(self):
+        """Test offsets map to 1-based lines and columns"""
+        index = LineIndex(TEXT)
+
+        self.assertEqual(index.position(0), (1, 1))
+        self.assertEqual(index.position(10), (1, 11))
+        self.assertEqual(index.position(11), (2, 1))
+        self.assertEqual(index.position(TEXT.index("jane")), (4, 6))
+        self.assertEqual(index.position(len(TEXT)), (4, 26))
+
+    def test_window_of_larger_text(self):
+        """Test a window indexed from its own start matches the whole text"""
+        whole = LineIndex(TEXT)
+        offset = TEXT.index("Doe")
+        start = TEXT.index("\n\n") - offset
+        window = LineIndex(TEXT[offset:], start, *whole.position(offset + start))
+
+        for position in range(start, len(TEXT) - offset + 1):
+            self.assertEqual(
+                window.position(position), whole.position(offset + position)
+            )
+
+    def test_context(self):
+        """Test context is bounded by the width and the entity's line"""
+        index = LineIndex(TEXT)
+        start = TEXT.index("jane")
+        end = start + len("jane@example.com")
+
+        self.assertEqual(index.context(start, end, 3), "il jane@example.com no")
+        self.assertEqual(index.context(start, end, 100), "mail jane@example.com now")
+        self.assertEqual(index.context(11, 19, 100), "John Doe lives here")
+
+    def test_add_positions(self):
+        """Test entities gain start and end positions and optional context"""
+        entities = [{"start": 11, "end": 19}]
+
+        add_positions(entities, LineIndex(TEXT))
+        self.assertEqual(
+            entities[0],
+            {
+                "start": 11,
+                "end": 19,
+                "line": 2,
+                "column": 1,
+                "end_line": 2,
+                "end_column": 9,
+            },
+        )
+        add_positions(entities, LineIndex(TEXT), context_width=2)
+        self.assertEqual(entities[0]["context"], "John Doe l")
+
+
+if __name__ == "__main__":
+    unittest.main()
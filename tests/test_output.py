@@ -0,0 +1,193 @@
+"""
+Unit tests for streaming output formats
+"""
+
+import json
+import os
+import sys
+import unittest
+from io import StringIO
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.output import write_ndjson, write_sarif  # noqa: E402
+from pii_detect.stats import ScanStats  # noqa: E402
+
+RESULTS = [
+    {
+        "file": "docs/a.txt",
+        "pii_found": True,
+        "pii_count": 2,
+        "entities": [
+            {
+                "entity_type": "PERSON",
+                "start": 0,
+                "end": 8,
+                "line": 1,
+                "column": 1,
+                "end_line": 1,
+                "end_column": 9,
+                "score": 0.85,
+                "text": "John Doe",
+            },
+            {
+                "entity_type": "EMAIL_ADDRESS",
+                "start": 12,
+                "end": 28,
+                "line": 2,
+                "column": 4,
+                "end_line": 2,
+                "end_column": 20,
+                "score": 1.0,
+                "text": "john@example.com",
+            },
+        ],
+    },
+    {"file": "b.txt", "pii_found": False, "pii_count": 0, "entities": []},
+    {
+        "file": "c.txt",
+        "error": "Permission denied",
+        "pii_found": False,
+        "pii_count": 0,
+        "entities": [],
+    },
+    {
+        "file": "d.bin.log",
+        "skipped": "binary content",
+        "pii_found": False,
+        "pii_count": 0,
+        "entities": [],
+    },
+]
+
+
+class TestNdjson(unittest.TestCase):
+    """Test cases for NDJSON output"""
+
+    def test_one_line_per_file(self):
+        """Test each file result is written as its own JSON line"""
+        stream = StringIO()
+        write_ndjson(iter(RESULTS), stream)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], RESULTS)
+
+    def test_stats_line_last(self):
+        """Test stats follow the results as a final line"""
+        stats = ScanStats()
+        stats.count("files", 4)
+        stream = StringIO()
+        write_ndjson(iter(RESULTS), stream, stats)
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(lines[:-1], RESULTS)
+        self.assertEqual(
+            lines[-1], {"stats": {"timings": {}, "counters": {"files": 4}}}
+        )
+
+    def test_writes_before_input_is_exhausted(self):
+        """Test results are written as soon as they are produced"""
+        stream = StringIO()
+
+        def results():
+            yield RESULTS[0]
+            self.assertEqual(len(stream.getvalue().splitlines()), 1)
+            yield RESULTS[1]
+
+        write_ndjson(results(), stream)
+        self.assertEqual(len(stream.getvalue().splitlines()), 2)
+
+
+class TestSarif(unittest.TestCase):
+    """Test cases for SARIF output"""
+
+    def setUp(self):
+        """Write the sample results as SARIF"""
+        stream = StringIO()
+        write_sarif(iter(RESULTS), stream, "1.0.0")
+        self.log = json.loads(stream.getvalue())
+        self.run = self.log["runs"][0]
+
+    def test_valid_log(self):
+        """Test the log has the SARIF version and tool information"""
+        self.assertEqual(self.log["version"], "2.1.0")
+        self.assertEqual(self.run["tool"]["driver"]["name"], "pii-detect")
+        self.assertEqual(self.run["tool"]["driver"]["version"], "1.0.0")
+
+    def test_one_result_per_entity(self):
+        """Test each entity becomes a SARIF result with a location"""
+        results = self.run["results"]
+        self.assertEqual([r["ruleId"] for r in results], ["PERSON", "EMAIL_ADDRESS"])
+        location = results[1]["locations"][0]["physicalLocation"]
+        self.assertEqual(location["artifactLocation"]["uri"], "docs/a.txt")
+        self.assertEqual(
+            location["region"],
+            {
+                "startLine": 2,
+                "startColumn": 4,
+                "endLine": 2,
+                "endColumn": 20,
+                "charOffset": 12,
+                "charLength": 16,
+            },
+        )
+
+    def test_matched_text_not_copied(self):
+        """Test the PII itself does not appear in the SARIF log"""
+        self.assertNotIn("john@example.com", json.dumps(self.log))
+
+    def test_rules_and_errors(self):
+        """Test rules are listed and file errors become notifications"""
+        rule_ids = [r["id"] for r in self.run["tool"]["driver"]["rules"]]
+        self.assertEqual(rule_ids, ["PERSON", "EMAIL_ADDRESS"])
+        notifications = self.run["invocations"][0]["toolExecutionNotifications"]
+        self.assertEqual(notifications[0]["message"]["text"], "Permission denied")
+        self.assertEqual(notifications[1]["level"], "note")
+        self.assertEqual(notifications[1]["message"]["text"], "Skipped: binary content")
+
+    def test_empty_results(self):
+        """Test a scan without findings is still a valid log"""
+        stream = StringIO()
+        write_sarif([], stream)
+        self.assertEqual(json.loads(stream.getvalue())["runs"][0]["results"], [])
+
+    def test_structured_field_in_result_properties(self):
+        """Test the column or JSON path of an entity is kept in SARIF"""
+        entity = dict(RESULTS[0]["entities"][1], field="$.users[*].email")
+        entity["path"] = "$.users[0].email"
+        result = dict(RESULTS[0], entities=[entity])
+        stream = StringIO()
+
+        write_sarif([result], stream)
+
+        (sarif_result,) = json.loads(stream.getvalue())["runs"][0]["results"]
+        self.assertEqual(
+            sarif_result["properties"],
+            {"score": 1.0, "field": "$.users[*].email", "path": "$.users[0].email"},
+        )
+
+    def test_metadata_in_run_properties(self):
+        """Test detector metadata is recorded on the run"""
+        metadata = {"mode": "fast", "disabled_entities": ["PERSON"]}
+        stream = StringIO()
+        write_sarif(iter(RESULTS), stream, metadata=metadata)
+        run = json.loads(stream.getvalue())["runs"][0]
+        self.assertEqual(run["properties"], metadata)
+        self.assertNotIn("properties", self.run)
+
+    def test_stats_in_run_properties(self):
+        """Test scan stats are recorded on the run"""
+        stats = ScanStats()
+        stats.record("nlp", 1.0)
+        stream = StringIO()
+        write_sarif(iter(RESULTS), stream, metadata={"mode": "full"}, stats=stats)
+        properties = json.loads(stream.getvalue())["runs"][0]["properties"]
+        self.assertEqual(properties["mode"], "full")
+        self.assertEqual(properties["stats"]["timings"], {"nlp": 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
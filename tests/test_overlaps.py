@@ -0,0 +1,109 @@
+"""
+Unit tests for overlap resolution
+"""
+
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.overlaps import resolve_overlaps  # noqa: E402
+
+TEXT = "Mail jane@example.com or John Smith at 10 Downing St"
+
+
+def entity(entity_type, value, score, occurrence=0):
+    start = -1
+    for _ in range(occurrence + 1):
+        start = TEXT.index(value, start + 1)
+    return {
+        "entity_type": entity_type,
+        "start": start,
+        "end": start + len(value),
+        "score": score,
+        "text": value,
+    }
+
+
+EMAIL = entity("EMAIL_ADDRESS", "jane@example.com", 1.0)
+URL = entity("URL", "example.com", 0.5)
+JOHN = entity("PERSON", "John", 0.85)
+SMITH = entity("PERSON", "Smith", 0.85)
+NAME = entity("PERSON", "John Smith", 0.6)
+ADDRESS = entity("LOCATION", "10 Downing St", 0.7)
+
+
+def texts(entities):
+    return [entity["text"] for entity in entities]
+
+
+class TestResolveOverlaps(unittest.TestCase):
+    """Test cases for each overlap policy"""
+
+    def test_keep(self):
+        """Test every entity is kept as found"""
+        entities = [URL, EMAIL]
+
+        self.assertIs(resolve_overlaps(entities, "keep", TEXT), entities)
+
+    def test_score(self):
+        """Test the highest scoring entity of overlapping ones is kept"""
+        entities = [ADDRESS, NAME, URL, SMITH, EMAIL, JOHN]
+
+        resolved = resolve_overlaps(entities, "score", TEXT)
+
+        self.assertEqual(
+            texts(resolved), ["jane@example.com", "John", "Smith", "10 Downing St"]
+        )
+
+    def test_longest(self):
+        """Test the longest entity of overlapping ones is kept"""
+        entities = [JOHN, SMITH, NAME, URL, EMAIL]
+
+        resolved = resolve_overlaps(entities, "longest", TEXT)
+
+        self.assertEqual(texts(resolved), ["jane@example.com", "John Smith"])
+
+    def test_chained_overlaps(self):
+        """Test an entity is only dropped for overlapping one that is kept"""
+        text = "abcdefghij"
+        first = {"entity_type": "A", "start": 0, "end": 4, "score": 0.9}
+        middle = {"entity_type": "B", "start": 3, "end": 7, "score": 0.5}
+        last = {"entity_type": "C", "start": 6, "end": 10, "score": 0.9}
+
+        resolved = resolve_overlaps([first, middle, last], "score", text)
+
+        self.assertEqual(resolved, [first, last])
+
+    def test_merge(self):
+        """Test entities of a type that overlap or are separated by spaces are
+        merged, keeping the highest score"""
+        entities = [SMITH, JOHN, NAME, EMAIL, URL, ADDRESS]
+
+        resolved = resolve_overlaps(entities, "merge", TEXT)
+
+        self.assertEqual(
+            texts(resolved),
+            ["jane@example.com", "example.com", "John Smith", "10 Downing St"],
+        )
+        self.assertEqual(resolved[2]["score"], 0.85)
+        self.assertEqual(JOHN["text"], "John")
+
+    def test_merge_leaves_separate_entities(self):
+        """Test entities separated by other text or lines are not merged"""
+        text = "Jane and Bob\nAlice"
+        found = [
+            {"entity_type": "PERSON", "start": 0, "end": 4, "score": 1.0},
+            {"entity_type": "PERSON", "start": 9, "end": 12, "score": 1.0},
+            {"entity_type": "PERSON", "start": 13, "end": 18, "score": 1.0},
+        ]
+
+        self.assertEqual(resolve_overlaps(found, "merge", text), found)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for process-pool scanning. The worker processes use a small fake
+detector so no Presidio model has to be loaded in each process.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.parallel import iter_files_parallel  # noqa: E402
+from pii_detect.stats import ScanStats  # noqa: E402
+
+
+class FakeDetector:
+    """Stand-in for PIIDetector that reports the file length as its PII count"""
+
+    def analyze_file(self, file_path):
+        if file_path.name.startswith("crash"):
+            os._exit(3)
+        content = file_path.read_text()
+        return {
+            "file": str(file_path),
+            "pii_found": bool(content),
+            "pii_count": len(content),
+            "entities": [],
+        }
+
+
+class CountingDetector(FakeDetector):
+    """Stand-in for a PIIDetector that collects stats"""
+
+    def __init__(self):
+        self.stats = ScanStats()
+
+    def analyze_file(self, file_path):
+        self.stats.count("files")
+        self.stats.record("read", 0.5)
+        return super().analyze_file(file_path)
+
+
+class BrokenDetector:
+    """Stand-in for a detector whose model cannot be loaded"""
+
+    def __init__(self):
+        sys.exit(1)
+
+
+def analyze_twice(detector, file_path):
+    """Report a file as two members, as an archive would be"""
+    result = detector.analyze_file(file_path)
+    return [dict(result, file=f"{result['file']}!{n}") for n in (1, 2)]
+
+
+class TestParallel(unittest.TestCase):
+    """Test cases for iter_files_parallel"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, content):
+        file_path = Path(self.temp_dir) / name
+        file_path.write_text(content)
+        return file_path
+
+    def test_results_in_file_order(self):
+        """Test results come back in input order regardless of worker timing"""
+        file_paths = [self._write(f"f{i}.txt", "x" * i) for i in range(20)]
+
+        results = list(iter_files_parallel(file_paths, 4, FakeDetector))
+
+        self.assertEqual([r["file"] for r in results], [str(p) for p in file_paths])
+        self.assertEqual([r["pii_count"] for r in results], list(range(20)))
+
+    def test_worker_stats_forwarded(self):
+        """Test stats collected in workers reach the parent"""
+        file_paths = [self._write(f"f{i}.txt", "x") for i in range(5)]
+        stats = ScanStats()
+
+        results = list(
+            iter_files_parallel(file_paths, 2, CountingDetector, on_stats=stats.merge)
+        )
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(stats.counters, {"files": 5})
+        self.assertEqual(stats.timings, {"read": 2.5})
+
+    def test_worker_crash_reported_as_error(self):
+        """Test a crashing worker produces an error result and the scan continues"""
+        file_paths = [
+            self._write("a.txt", "a"),
+            self._write("crash.txt", "boom"),
+            self._write("b.txt", "bb"),
+        ]
+
+        results = list(iter_files_parallel(file_paths, 2, FakeDetector))
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["pii_count"], 1)
+        self.assertIn("crashed", results[1]["error"])
+        self.assertFalse(results[1]["pii_found"])
+        self.assertEqual(results[2]["pii_count"], 2)
+
+    def test_several_results_per_file(self):
+        """Test an analyze function may give several results for one path"""
+        file_paths = [self._write("a.txt", "a"), self._write("b.txt", "bb")]
+
+        results = list(
+            iter_files_parallel(file_paths, 2, FakeDetector, analyze=analyze_twice)
+        )
+
+        self.assertEqual(
+            [result["file"] for result in results],
+            [f"{path}!{n}" for path in file_paths for n in (1, 2)],
+        )
+
+    def test_empty_file_list(self):
+        """Test no work produces no results"""
+        self.assertEqual(list(iter_files_parallel([], 2, FakeDetector)), [])
+
+    def test_worker_start_failure(self):
+        """Test a detector that cannot initialise aborts the scan"""
+        with self.assertRaises(RuntimeError):
+            list(iter_files_parallel([self._write("a.txt", "a")], 1, BrokenDetector))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Unit tests for the PII prefilter
+"""
+
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.prefilter import candidate_regions  # noqa: E402
+
+# One sample of each kind of entity the detector reports, embedded in a line
+# of otherwise unremarkable text
+PII_SAMPLES = [
+    ("please contact jane.doe@example.com for access", "jane.doe@example.com"),
+    ("my name is John Smith and i work here", "John Smith"),
+    ("she moved to Paris last year", "Paris"),
+    ("call me on 212-555-0143 after lunch", "212-555-0143"),
+    ("card number 4111 1111 1111 1111 expires soon", "4111 1111 1111 1111"),
+    ("transfer to gb82west12345698765432 today", "gb82west12345698765432"),
+    ("the server is at 192.168.10.4 behind the proxy", "192.168.10.4"),
+    ("see https://example.org/about for details", "https://example.org/about"),
+    ("docs live at example.org now", "example.org"),
+    ("ssn 078-05-1120 was leaked", "078-05-1120"),
+    ("device mac 00:1a:2b:3c:4d:5e is new", "00:1a:2b:3c:4d:5e"),
+    ("wallet 1lbcfr7sahtd9cgdqo3htmtkv8lk4znx71 received it", "1lbcfr7sahtd9cgd"),
+    ("Élodie sent the report", "Élodie"),
+]
+
+FILLER = "nothing to see on this line, only lower case words.\n"
+
+
+class TestCandidateRegions(unittest.TestCase):
+    """Test cases for candidate region selection"""
+
+    def test_recall_on_corpus(self):
+        """Test every PII sample lies inside a candidate region"""
+        text = ""
+        spans = []
+        for line, pii in PII_SAMPLES:
+            text += FILLER * 10
+            start = len(text) + line.index(pii)
+            spans.append((start, start + len(pii)))
+            text += line + "\n"
+        text += FILLER * 10
+
+        regions = candidate_regions(text)
+
+        for start, end in spans:
+            self.assertTrue(
+                any(r_start <= start and end <= r_end for r_start, r_end in regions),
+                text[start:end],
+            )
+        covered = sum(end - start for start, end in regions)
+        self.assertLess(covered, len(text) / 2)
+
+    def test_no_candidates(self):
+        """Test text without candidate lines needs no analysis"""
+        self.assertEqual(candidate_regions(FILLER * 5), [])
+        self.assertEqual(candidate_regions(""), [])
+
+    def test_context_lines(self):
+        """Test regions are whole lines with context either side"""
+        lines = ["a\n", "b\n", "c\n", "Dave\n", "e\n", "f\n", "g\n"]
+        text = "".join(lines)
+
+        start, end = candidate_regions(text, context_lines=1)[0]
+        self.assertEqual(text[start:end], "c\nDave\ne\n")
+        start, end = candidate_regions(text, context_lines=0)[0]
+        self.assertEqual(text[start:end], "Dave\n")
+
+    def test_regions_merged(self):
+        """Test nearby candidates share one region, distant ones do not"""
+        text = "Ann\nb\nBob\n" + FILLER * 10 + "Cy"
+
+        regions = candidate_regions(text, context_lines=1)
+
+        self.assertEqual(len(regions), 2)
+        self.assertEqual(text[slice(*regions[0])], "Ann\nb\nBob\n" + FILLER)
+        self.assertEqual(text[slice(*regions[1])], FILLER + "Cy")
+
+    def test_context_follows_later_candidates(self):
+        """Test a candidate inside another's context extends the region"""
+        text = "Ann\nBob\nc\nd\ne\n"
+
+        start, end = candidate_regions(text, context_lines=1)[0]
+        self.assertEqual(text[start:end], "Ann\nBob\nc\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Unit tests for the streaming window reader
+"""
+
+import io
+import mmap
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.reader import (  # noqa: E402
+    byte_offsets,
+    detect_encoding,
+    iter_mapped_windows,
+    iter_windows,
+)
+
+
+def find_owned(windows, pattern):
+    """Return absolute spans of ``pattern`` matches as reported by windows"""
+    spans = []
+    for window in windows:
+        for match in re.finditer(pattern, window.text):
+            if window.own_start <= match.start() < window.own_end:
+                spans.append(
+                    (match.start() + window.offset, match.end() + window.offset)
+                )
+    return spans
+
+
+class TestIterWindows(unittest.TestCase):
+    """Test cases for iter_windows"""
+
+    def test_small_text_single_window(self):
+        """Test text smaller than a chunk is returned as one window"""
+        windows = list(iter_windows(io.StringIO("hello\nworld\n"), 100, 10))
+
+        self.assertEqual(len(windows), 1)
+        self.assertEqual(windows[0].offset, 0)
+        self.assertEqual(windows[0].text, "hello\nworld\n")
+        self.assertEqual((windows[0].own_start, windows[0].own_end), (0, 12))
+
+    def test_empty_text(self):
+        """Test empty input yields no windows"""
+        self.assertEqual(list(iter_windows(io.StringIO(""), 100, 10)), [])
+
+    def test_windows_match_source_text(self):
+        """Test every window is the slice of the source at its offset"""
+        text = "".join(f"line {i} with some words\n" for i in range(500))
+        windows = list(iter_windows(io.StringIO(text), 1000, 100))
+
+        self.assertGreater(len(windows), 1)
+        for window in windows:
+            self.assertEqual(
+                text[window.offset : window.offset + len(window.text)], window.text
+            )
+
+    def test_ownership_covers_text_once(self):
+        """Test owned regions tile the whole text without gaps or overlaps"""
+        text = "".join(f"line {i} with some words\n" for i in range(500))
+        windows = list(iter_windows(io.StringIO(text), 1000, 100))
+
+        position = 0
+        for window in windows:
+            self.assertEqual(window.offset + window.own_start, position)
+            position = window.offset + window.own_end
+        self.assertEqual(position, len(text))
+
+    def test_windows_are_line_aligned(self):
+        """Test windows start at the beginning of a line"""
+        text = "".join(f"line {i} with some words\n" for i in range(500))
+        for window in iter_windows(io.StringIO(text), 1000, 100):
+            self.assertTrue(window.offset == 0 or text[window.offset - 1] == "\n")
+
+    def test_entities_on_boundaries_found_once(self):
+        """Test matches straddling window boundaries are reported exactly once"""
+        text = " ".join(f"user{i}@example.com" for i in range(2000))
+        windows = list(iter_windows(io.StringIO(text), 997, 64))
+
+        expected = [m.span() for m in re.finditer(r"\S+@example\.com", text)]
+        self.assertGreater(len(windows), 10)
+        self.assertEqual(find_owned(windows, r"\S+@example\.com"), expected)
+
+    def test_long_lines_are_split(self):
+        """Test a single huge line does not become a single huge window"""
+        text = "x" * 10_000
+        windows = list(iter_windows(io.StringIO(text), 1000, 100))
+
+        self.assertTrue(all(len(w.text) <= 2000 for w in windows))
+        self.assertEqual(windows[-1].offset + len(windows[-1].text), len(text))
+
+    def test_invalid_overlap(self):
+        """Test overlap must be smaller than the chunk size"""
+        with self.assertRaises(ValueError):
+            list(iter_windows(io.StringIO("text"), 100, 100))
+
+
+class TestIterMappedWindows(unittest.TestCase):
+    """Test cases for windows decoded from encoded bytes"""
+
+    TEXT = " ".join(f"caf\u00e9 user{i}@example.com \u65e5\u672c" for i in range(800))
+
+    def windows(self, data, encoding="utf-8", chunk_size=997, overlap=64):
+        return list(iter_mapped_windows(data, encoding, chunk_size, overlap))
+
+    def test_windows_match_source_text(self):
+        """Test windows are the decoded text at their character and byte offsets"""
+        data = self.TEXT.encode("utf-8")
+        windows = self.windows(data)
+
+        self.assertGreater(len(windows), 10)
+        for window in windows:
+            self.assertEqual(
+                self.TEXT[window.offset : window.offset + len(window.text)],
+                window.text,
+            )
+            self.assertEqual(
+                data[window.byte_offset :].decode("utf-8")[: len(window.text)],
+                window.text,
+            )
+
+    def test_entities_on_boundaries_found_once(self):
+        """Test ownership tiles the text and boundary matches are found once"""
+        windows = self.windows(self.TEXT.encode("utf-8"))
+
+        position = 0
+        for window in windows:
+            self.assertEqual(window.offset + window.own_start, position)
+            position = window.offset + window.own_end
+        self.assertEqual(position, len(self.TEXT))
+        expected = [m.span() for m in re.finditer(r"\S+@example\.com", self.TEXT)]
+        self.assertEqual(find_owned(windows, r"\S+@example\.com"), expected)
+
+    def test_byte_order_mark_and_latin1(self):
+        """Test a UTF-8 BOM is skipped and Latin-1 is windowed byte for byte"""
+        text = "caf\u00e9 line\n" * 300
+        bom_windows = self.windows(b"\xef\xbb\xbf" + text.encode("utf-8"), "utf-8-sig")
+        latin_windows = self.windows(text.encode("latin-1"), "latin-1")
+
+        self.assertEqual(bom_windows[0].byte_offset, 3)
+        self.assertEqual(bom_windows[0].text[:4], "caf\u00e9")
+        for window in latin_windows:
+            self.assertEqual(window.byte_offset, window.offset)
+
+    def test_empty_and_unsupported(self):
+        """Test empty input yields nothing and other encodings are refused"""
+        self.assertEqual(self.windows(b""), [])
+        with self.assertRaises(ValueError):
+            self.windows(b"text", "utf-16")
+
+    def test_file_truncated_while_mapped(self):
+        """Test windows of a mapped file stop at its new end once it is
+        truncated, rather than reading pages no longer backed by it"""
+        data = self.TEXT.encode("utf-8")
+        with tempfile.TemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                windows = iter_mapped_windows(
+                    mapped, "utf-8", 997, 64, fileno=f.fileno()
+                )
+                first = next(windows)
+                f.truncate(1500)
+                rest = list(windows)
+
+        self.assertEqual(first.byte_offset, 0)
+        self.assertEqual(len(rest), 1)
+        self.assertEqual(rest[0].text, data[rest[0].byte_offset : 1500].decode())
+
+    def test_byte_offsets(self):
+        """Test character positions map to UTF-8 byte positions"""
+        self.assertEqual(
+            byte_offsets("caf\u00e9 x@y", [8, 0, 5], "utf-8"), {0: 0, 5: 6, 8: 9}
+        )
+
+
+class TestDetectEncoding(unittest.TestCase):
+    """Test cases for sniffing file encodings"""
+
+    def test_text_encodings(self):
+        """Test common text encodings are recognized"""
+        self.assertEqual(detect_encoding(b"plain ascii\n"), "utf-8")
+        self.assertEqual(detect_encoding("caf\u00e9".encode("utf-8")), "utf-8")
+        self.assertEqual(detect_encoding(b"\xef\xbb\xbfbom"), "utf-8-sig")
+        self.assertEqual(detect_encoding("text".encode("utf-16")), "utf-16")
+        self.assertEqual(
+            detect_encoding("caf\u00e9 au lait".encode("latin-1")), "latin-1"
+        )
+        self.assertEqual(detect_encoding(b""), "utf-8")
+
+    def test_truncated_character(self):
+        """Test a sample cut part way through a UTF-8 character is still text"""
+        self.assertEqual(detect_encoding("caf\u00e9".encode("utf-8")[:-1]), "utf-8")
+
+    def test_binary(self):
+        """Test NUL bytes or many control characters mean binary content"""
+        self.assertIsNone(detect_encoding(b"ELF\0\x01\x02"))
+        self.assertIsNone(detect_encoding(bytes(range(1, 32)) * 4 + b"\xff"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+"""
+Unit tests for the HTTP scanning service. Requests are sent over a real local
+socket, with a small fake detector standing in for PIIDetector.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import unittest
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.async_detector import AsyncPIIDetector  # noqa: E402
+from pii_detect.server import LatencyHistogram, PIIServer  # noqa: E402
+
+
+class FakeDetector:
+    """Reports each text's length. While ``gate`` is clear, analysis blocks."""
+
+    _options = {"mode": "fast"}
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def analyze_texts(self, texts, batch_size=None):
+        self.gate.wait(5)
+        if "boom" in texts:
+            raise RuntimeError("analysis failed")
+        return [[{"entity_type": "LENGTH", "start": 0, "end": len(t)}] for t in texts]
+
+
+async def request(port, method, path, body=None, headers=None):
+    """Send one request and return the status, headers and body"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        await send(writer, method, path, body, headers)
+        return await receive(reader)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def send(writer, method, path, body=None, headers=None):
+    data = b"" if body is None else body
+    if isinstance(data, (dict, list)):
+        data = json.dumps(data).encode()
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost"]
+    if body is not None:
+        lines.append(f"Content-Length: {len(data)}")
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + data)
+    await writer.drain()
+
+
+async def receive(reader):
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return status, headers, body
+
+
+class TestPIIServer(unittest.IsolatedAsyncioTestCase):
+    """Test cases for PIIServer"""
+
+    async def asyncSetUp(self):
+        self.fake = FakeDetector()
+        self.server = PIIServer(
+            AsyncPIIDetector(self.fake, max_batch_delay=0.01),
+            max_request_size=1024,
+            max_batch_texts=3,
+            request_timeout=1.0,
+        )
+        self.listener = await self.server.start("127.0.0.1", 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.fake.gate.set()
+        self.listener.close()
+        await self.listener.wait_closed()
+        await self.server.close()
+
+    async def test_analyze(self):
+        """Test a single text is analyzed"""
+        status, headers, body = await request(
+            self.port, "POST", "/analyze", {"text": "hello"}
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"], "application/json")
+        self.assertEqual(json.loads(body)["entities"][0]["end"], 5)
+
+    async def test_analyze_batch(self):
+        """Test results come back in the order of the texts"""
+        status, _, body = await request(
+            self.port, "POST", "/analyze-batch", {"texts": ["a", "abc", "ab"]}
+        )
+
+        self.assertEqual(status, 200)
+        results = json.loads(body)["results"]
+        self.assertEqual([r[0]["end"] for r in results], [1, 3, 2])
+
+    async def test_concurrent_requests(self):
+        """Test concurrent requests are all answered"""
+        responses = await asyncio.gather(
+            *(
+                request(self.port, "POST", "/analyze", {"text": "a" * i})
+                for i in range(1, 9)
+            )
+        )
+
+        ends = [json.loads(body)["entities"][0]["end"] for _, _, body in responses]
+        self.assertEqual(ends, list(range(1, 9)))
+
+    async def test_request_too_large(self):
+        """Test oversized bodies and batches are refused with 413"""
+        status, _, body = await request(
+            self.port, "POST", "/analyze", {"text": "a" * 2000}
+        )
+        self.assertEqual(status, 413)
+        self.assertIn("1024 bytes", json.loads(body)["error"])
+
+        status, _, _ = await request(
+            self.port, "POST", "/analyze-batch", {"texts": ["a"] * 4}
+        )
+        self.assertEqual(status, 413)
+
+    async def test_bad_requests(self):
+        """Test malformed bodies are refused with 400"""
+        for path, body in [
+            ("/analyze", b"{not json"),
+            ("/analyze", [1, 2]),
+            ("/analyze", {"text": 1}),
+            ("/analyze-batch", {"texts": "abc"}),
+            ("/analyze-batch", {"texts": ["a", 2]}),
+        ]:
+            with self.subTest(path=path, body=body):
+                status, _, _ = await request(self.port, "POST", path, body)
+                self.assertEqual(status, 400)
+
+    async def test_length_required(self):
+        """Test POST without Content-Length is refused"""
+        status, _, _ = await request(self.port, "POST", "/analyze")
+
+        self.assertEqual(status, 411)
+
+    async def test_unknown_path_and_method(self):
+        """Test unknown paths give 404 and wrong methods 405"""
+        status, _, _ = await request(self.port, "GET", "/nowhere")
+        self.assertEqual(status, 404)
+
+        status, _, _ = await request(self.port, "GET", "/analyze")
+        self.assertEqual(status, 405)
+
+    async def test_timeout(self):
+        """Test analysis over the request timeout gives 504"""
+        self.server.request_timeout = 0.05
+        self.fake.gate.clear()
+
+        status, _, _ = await request(self.port, "POST", "/analyze", {"text": "a"})
+
+        self.assertEqual(status, 504)
+
+    async def test_analysis_error(self):
+        """Test a failed analysis gives 500 and is counted"""
+        with self.assertLogs("pii_detect.server", "ERROR"):
+            status, _, body = await request(
+                self.port, "POST", "/analyze", {"text": "boom"}
+            )
+
+        self.assertEqual(status, 500)
+        self.assertEqual(json.loads(body)["error"], "Internal Server Error")
+        self.assertEqual(self.server.requests[("/analyze", 500)], 1)
+
+    async def test_health_and_readiness(self):
+        """Test health is always reported and readiness once started"""
+        status, _, _ = await request(self.port, "GET", "/healthz")
+        self.assertEqual(status, 200)
+        status, _, body = await request(self.port, "GET", "/readyz")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["status"], "ready")
+
+        self.server.ready = False
+        status, _, _ = await request(self.port, "GET", "/readyz")
+        self.assertEqual(status, 503)
+
+    async def test_metrics(self):
+        """Test request counts and latency histograms are exported"""
+        await request(self.port, "POST", "/analyze", {"text": "a"})
+        await request(self.port, "GET", "/nowhere")
+
+        status, headers, body = await request(self.port, "GET", "/metrics")
+
+        self.assertEqual(status, 200)
+        self.assertTrue(headers["content-type"].startswith("text/plain"))
+        text = body.decode()
+        self.assertIn("pii_detect_ready 1", text)
+        self.assertIn(
+            'pii_detect_http_requests_total{endpoint="/analyze",status="200"} 1',
+            text,
+        )
+        self.assertIn(
+            'pii_detect_http_requests_total{endpoint="other",status="404"} 1', text
+        )
+        self.assertIn(
+            'pii_detect_http_request_duration_seconds_count{endpoint="/analyze"} 1',
+            text,
+        )
+
+    async def test_keep_alive(self):
+        """Test several requests are answered over one connection"""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        try:
+            for text in ["a", "ab", "abc"]:
+                await send(writer, "POST", "/analyze", {"text": text})
+                status, headers, body = await receive(reader)
+                self.assertEqual(status, 200)
+                self.assertEqual(headers["connection"], "keep-alive")
+                self.assertEqual(json.loads(body)["entities"][0]["end"], len(text))
+
+            await send(writer, "GET", "/healthz", headers={"Connection": "close"})
+            _, headers, _ = await receive(reader)
+            self.assertEqual(headers["connection"], "close")
+            self.assertEqual(await reader.read(), b"")
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test cases for LatencyHistogram"""
+
+    def test_buckets_are_cumulative(self):
+        """Test each observation counts in every bucket at or above it"""
+        histogram = LatencyHistogram([0.1, 1.0])
+        histogram.observe("/analyze", 0.05)
+        histogram.observe("/analyze", 0.5)
+        histogram.observe("/analyze", 5.0)
+
+        lines = histogram.to_prometheus("latency")
+
+        self.assertIn('latency_bucket{endpoint="/analyze",le="0.1"} 1', lines)
+        self.assertIn('latency_bucket{endpoint="/analyze",le="1.0"} 2', lines)
+        self.assertIn('latency_bucket{endpoint="/analyze",le="+Inf"} 3', lines)
+        self.assertIn('latency_count{endpoint="/analyze"} 3', lines)
+        self.assertIn('latency_sum{endpoint="/analyze"} 5.550000', lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Startup tests: trivial CLI invocations must not import Presidio or spaCy, and
+the package must import within a small budget
+"""
+
+import os
+import subprocess  # nosec B404
+import sys
+import unittest
+
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+
+# Seconds `import pii_detect.cli` may take, as reported by -X importtime
+IMPORT_BUDGET = 0.1
+
+HEAVY_MODULES = ["presidio_analyzer", "spacy", "thinc"]
+
+
+def run_python(code, *args):
+    """Run ``code`` in a fresh interpreter with -X importtime, returning the
+    process and the names of the modules it imported"""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(src_path))
+    process = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", code, *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+    imported = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            if cumulative.strip().isdigit():
+                imported[name.strip()] = int(cumulative) / 1e6
+    return process, imported
+
+
+def run_cli(*args):
+    return run_python(
+        "import sys; from pii_detect.cli import main; "
+        "sys.argv[0] = 'pii-detect'; main()",
+        *args,
+    )
+
+
+class TestStartup(unittest.TestCase):
+    """Test cases for import-time cost"""
+
+    def assertNotImported(self, imported):
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, imported)
+
+    def test_package_import_is_light(self):
+        """Test importing the package and CLI leaves Presidio unloaded"""
+        process, imported = run_python("import pii_detect, pii_detect.cli")
+
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertIn("pii_detect.cli", imported)
+        self.assertNotImported(imported)
+
+    def test_import_budget(self):
+        """Test importing the CLI stays within the startup budget"""
+        # Best of three, so one slow run on a busy machine does not fail
+        best = min(
+            run_python("import pii_detect.cli")[1]["pii_detect.cli"] for _ in range(3)
+        )
+
+        self.assertLess(best, IMPORT_BUDGET)
+
+    def test_help_does_not_import_presidio(self):
+        """Test --help and its subcommands skip the detector's dependencies"""
+        for args in [["--help"], ["bench", "--help"], ["server", "--help"]]:
+            with self.subTest(args=args):
+                process, imported = run_cli(*args)
+
+                self.assertEqual(process.returncode, 0)
+                self.assertIn("usage:", process.stdout)
+                self.assertNotImported(imported)
+
+    def test_missing_path_does_not_import_presidio(self):
+        """Test a path that does not exist is reported without loading Presidio"""
+        process, imported = run_cli("/nonexistent/path/to/scan", "--no-daemon")
+
+        self.assertEqual(process.returncode, 1)
+        self.assertIn("does not exist", process.stdout)
+        self.assertNotImported(imported)
+
+
+if __name__ == "__main__":
+    unittest.main()
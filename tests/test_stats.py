@@ -0,0 +1,110 @@
+"""
+Unit tests for scan statistics
+"""
+
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.stats import ScanStats  # noqa: E402
+
+
+class TestScanStats(unittest.TestCase):
+    """Test cases for ScanStats"""
+
+    def test_timings_and_hooks(self):
+        """Test timings accumulate per stage and every timing reaches hooks"""
+        calls = []
+        stats = ScanStats(hooks=[lambda stage, seconds: calls.append(stage)])
+
+        stats.record("read", 0.25)
+        stats.record("read", 0.5)
+        with stats.time("nlp"):
+            pass
+        double = stats.timed("prefilter", lambda x: 2 * x)
+
+        self.assertEqual(double(4), 8)
+        self.assertEqual(stats.timings["read"], 0.75)
+        self.assertGreaterEqual(stats.timings["nlp"], 0)
+        self.assertEqual(calls, ["read", "read", "nlp", "prefilter"])
+
+    def test_timed_iter(self):
+        """Test only the work of producing items is timed, not the consumer"""
+        stats = ScanStats()
+
+        items = list(stats.timed_iter("walk", iter([1, 2, 3])))
+
+        self.assertEqual(items, [1, 2, 3])
+        self.assertIn("walk", stats.timings)
+
+    def test_timed_recognizer(self):
+        """Test recognizer calls count towards their own and the stage total"""
+        stats = ScanStats()
+        analyze = stats.timed_recognizer("EmailRecognizer", lambda text: [text])
+
+        self.assertEqual(analyze("a@b.co"), ["a@b.co"])
+        self.assertEqual(
+            set(stats.timings), {"recognizer:EmailRecognizer", "recognizers"}
+        )
+
+    def test_pop_and_merge(self):
+        """Test stats from another process add to the totals"""
+        worker = ScanStats()
+        worker.record("read", 1.0)
+        worker.count("files", 2)
+        merged = []
+        stats = ScanStats(hooks=[lambda stage, seconds: merged.append(seconds)])
+        stats.record("read", 0.5)
+
+        stats.merge(worker.pop())
+        stats.merge({"counters": {"files": 1}})
+
+        self.assertEqual(stats.to_dict()["timings"], {"read": 1.5})
+        self.assertEqual(stats.counters, {"files": 3})
+        self.assertEqual(worker.to_dict(), {"timings": {}, "counters": {}})
+        self.assertEqual(merged, [0.5, 1.0])
+
+    def test_summary(self):
+        """Test the summary lists the slowest stages and recognizers first"""
+        stats = ScanStats()
+        stats.record("read", 0.1)
+        stats.record("nlp", 2.0)
+        stats.record("recognizer:PhoneRecognizer", 0.5)
+        stats.count("cache_hits", 3)
+
+        self.assertEqual(
+            stats.summary(),
+            [
+                "Stage nlp: 2.000 s",
+                "Stage read: 0.100 s",
+                "Recognizer PhoneRecognizer: 0.500 s",
+                "Cache hits: 3",
+            ],
+        )
+
+    def test_prometheus(self):
+        """Test the Prometheus text format"""
+        stats = ScanStats()
+        stats.record("nlp", 1.5)
+        stats.record('recognizer:My "Custom"', 0.25)
+        stats.count("files", 4)
+
+        text = stats.to_prometheus()
+
+        self.assertIn('pii_detect_stage_seconds_total{stage="nlp"} 1.500000\n', text)
+        self.assertIn(
+            'pii_detect_recognizer_seconds_total{recognizer="My \\"Custom\\""} '
+            "0.250000\n",
+            text,
+        )
+        self.assertIn("# TYPE pii_detect_files_total counter\n", text)
+        self.assertTrue(text.endswith("pii_detect_files_total 4\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Unit tests for the structured data readers
+"""
+
+import io
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.structured import (  # noqa: E402
+    StructuredFormatError,
+    context_words,
+    iter_csv_values,
+    iter_json_values,
+    iter_jsonl_values,
+    structured_format,
+)
+
+
+def raw_text(value):
+    """Return the text a value was read from, through its offsets"""
+    return value.record[value.record_offset(0) : value.record_offset(len(value.text))]
+
+
+class TestCSVValues(unittest.TestCase):
+    """Test cases for iter_csv_values"""
+
+    def read(self, text):
+        return list(iter_csv_values(io.StringIO(text, newline="")))
+
+    def test_values_by_column(self):
+        """Test values are named by their header and located in their row"""
+        values = self.read("name,email\r\nJane,jane@example.com\r\nBob,\r\n")
+
+        self.assertEqual(
+            [(v.field, v.text, v.record_line) for v in values],
+            [("name", "Jane", 2), ("email", "jane@example.com", 2), ("name", "Bob", 3)],
+        )
+        self.assertEqual(values[1].record_start, len("name,email\r\n"))
+        self.assertEqual(values[1].offset, 5)
+
+    def test_quoted_values(self):
+        """Test escaped quotes and line breaks in quoted values are mapped back
+        to the raw row"""
+        values = self.read('id,note\n1,"say ""hi"" to\njo@example.com"\n2,x\n')
+
+        note = values[1]
+        self.assertEqual(note.text, 'say "hi" to\njo@example.com')
+        self.assertEqual(raw_text(note), 'say ""hi"" to\njo@example.com')
+        self.assertEqual(values[2].record_line, 4)
+
+    def test_delimiter_and_column_names(self):
+        """Test the delimiter is sniffed and blank or repeated headers numbered"""
+        values = self.read("a;;a\n1;2;3\n")
+
+        self.assertEqual([v.field for v in values], ["a", "column 2", "a 3"])
+
+
+class TestJSONValues(unittest.TestCase):
+    """Test cases for the JSON and JSON Lines readers"""
+
+    def test_paths(self):
+        """Test values get their path, and their field with indices starred"""
+        text = '{"users": [{"email": "a@example.com", "id": 12}], "first name": "Jo"}'
+
+        values = list(iter_json_values(text))
+
+        self.assertEqual(
+            [(v.path, v.field, v.text) for v in values],
+            [
+                ("$.users[0].email", "$.users[*].email", "a@example.com"),
+                ("$.users[0].id", "$.users[*].id", "12"),
+                ('$["first name"]', '$["first name"]', "Jo"),
+            ],
+        )
+        for value in values:
+            self.assertEqual(raw_text(value), value.text)
+
+    def test_keys_and_escapes(self):
+        """Test keys matching a value are skipped and escapes mapped back"""
+        text = '{"email": "email", "bio": "caf\\u00e9 \\"jo\\"", "n": "12", "m": 12}'
+
+        values = list(iter_json_values(text))
+
+        self.assertEqual(values[0].offset, text.index('"email",') + 1)
+        self.assertEqual(values[1].text, 'café "jo"')
+        self.assertEqual(raw_text(values[1]), 'caf\\u00e9 \\"jo\\"')
+        self.assertEqual(values[2].offset, text.index('"12"') + 1)
+        self.assertEqual(values[3].offset, text.rindex("12"))
+
+    def test_json_lines(self):
+        """Test each line is a document of its own"""
+        stream = io.StringIO('{"a": "x"}\n\n{"a": "y"}\n')
+
+        values = list(iter_jsonl_values(stream))
+
+        self.assertEqual([v.path for v in values], ["$[0].a", "$[1].a"])
+        self.assertEqual([v.field for v in values], ["$[*].a", "$[*].a"])
+        self.assertEqual([v.record_line for v in values], [1, 3])
+        self.assertEqual(values[1].record_start, len('{"a": "x"}\n\n'))
+
+    def test_invalid_json(self):
+        """Test documents that do not parse are reported"""
+        with self.assertRaises(StructuredFormatError):
+            iter_json_values("{not json")
+        with self.assertRaises(StructuredFormatError):
+            list(iter_jsonl_values(io.StringIO('{"a": 1}\nnope\n')))
+
+
+class TestHelpers(unittest.TestCase):
+    """Test cases for the structured data helpers"""
+
+    def test_context_words(self):
+        """Test field names are split into lower case words"""
+        self.assertEqual(context_words("$.users[*].homePhone"), ["home", "phone"])
+        self.assertEqual(context_words("E-mail Address"), ["e", "mail", "address"])
+        self.assertEqual(context_words('$["first name"]'), ["first", "name"])
+        self.assertEqual(context_words("$[*]"), [])
+
+    def test_structured_format(self):
+        """Test formats are chosen by suffix"""
+        self.assertEqual(structured_format(".CSV"), "csv")
+        self.assertEqual(structured_format(".ndjson"), "jsonl")
+        self.assertIsNone(structured_format(".txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Unit tests for the live input readers
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.tail import (  # noqa: E402
+    RESTART,
+    LineBatch,
+    follow_lines,
+    iter_line_batches,
+)
+
+
+class TestLineBatches(unittest.TestCase):
+    """Test cases for grouping lines into batches"""
+
+    def test_batches_fill_to_max_chars(self):
+        """Test lines share a batch until it holds max_chars characters"""
+        lines = ["aaaa\n", "bb\n", "cccc\n", "d\n"]
+
+        batches = list(iter_line_batches(lines, max_chars=8, max_delay=60))
+
+        self.assertEqual(
+            batches, [LineBatch(0, 1, "aaaa\nbb\n"), LineBatch(8, 3, "cccc\nd\n")]
+        )
+
+    def test_slow_lines_are_not_held(self):
+        """Test a batch is yielded after max_delay while its source waits"""
+        more = threading.Event()
+
+        def lines():
+            yield "first\n"
+            more.wait(5)
+            yield "second\n"
+
+        batches = iter_line_batches(lines(), max_chars=1000, max_delay=0.01)
+        started = time.monotonic()
+        self.assertEqual(next(batches), LineBatch(0, 1, "first\n"))
+        self.assertLess(time.monotonic() - started, 2)
+        more.set()
+        self.assertEqual(list(batches), [LineBatch(6, 2, "second\n")])
+
+    def test_restart(self):
+        """Test a restart ends the batch and positions start again"""
+        lines = ["one\n", RESTART, "two\n"]
+
+        batches = list(iter_line_batches(lines, max_chars=1000, max_delay=60))
+
+        self.assertEqual(batches, [LineBatch(0, 1, "one\n"), LineBatch(0, 1, "two\n")])
+
+    def test_source_errors_are_raised(self):
+        """Test an error reading lines is raised after the lines before it"""
+
+        def lines():
+            yield "one\n"
+            raise OSError("gone")
+
+        batches = iter_line_batches(lines(), max_chars=1000, max_delay=60)
+
+        self.assertEqual(next(batches), LineBatch(0, 1, "one\n"))
+        with self.assertRaises(OSError):
+            next(batches)
+
+
+class TestFollowLines(unittest.TestCase):
+    """Test cases for following a growing file"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = self.temp_dir / "app.log"
+        self.stop = threading.Event()
+        self.addCleanup(self.stop.set)
+
+    def follow(self):
+        return follow_lines(self.path, poll_interval=0.01, stop=self.stop)
+
+    def test_appended_lines(self):
+        """Test complete lines are yielded as they are appended"""
+        self.path.write_bytes(b"one\ntw")
+        lines = self.follow()
+        self.assertEqual(next(lines), "one\n")
+
+        with open(self.path, "ab") as f:
+            f.write(b"o\n")
+        self.assertEqual(next(lines), "two\n")
+
+        self.stop.set()
+        self.assertEqual(list(lines), [])
+
+    def test_rotation(self):
+        """Test a replaced or truncated file is read again from its start"""
+        self.path.write_bytes(b"old\n")
+        lines = self.follow()
+        self.assertEqual(next(lines), "old\n")
+
+        self.path.rename(self.temp_dir / "app.log.1")
+        self.path.write_bytes(b"new\n")
+        self.assertEqual([next(lines), next(lines)], [RESTART, "new\n"])
+
+        self.path.write_bytes(b"")
+        self.assertEqual(next(lines), RESTART)
+
+
+if __name__ == "__main__":
+    unittest.main()
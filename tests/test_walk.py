@@ -0,0 +1,160 @@
+"""
+Unit tests for directory traversal
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+src_path = os.path.join(os.path.dirname(__file__), "..", "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from pii_detect.walk import is_excluded, iter_files  # noqa: E402
+
+
+class TestIterFiles(unittest.TestCase):
+    """Test cases for the directory walker"""
+
+    def setUp(self):
+        """Create a temporary tree"""
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def make(self, *names):
+        for name in names:
+            file_path = self.root / name
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text("text")
+
+    def walk(self, **kwargs):
+        return [
+            file_path.relative_to(self.root).as_posix()
+            for file_path in iter_files(self.root, **kwargs)
+        ]
+
+    def test_extensions_and_order(self):
+        """Test only matching suffixes are yielded, in a stable order"""
+        self.make("b.txt", "a.TXT", "c.bin", "sub/d.md")
+
+        self.assertEqual(
+            self.walk(extensions=[".txt", ".md"]), ["a.TXT", "b.txt", "sub/d.md"]
+        )
+
+    def test_default_excluded_directories(self):
+        """Test tool, dependency and virtualenv directories are pruned"""
+        self.make(
+            "keep.txt",
+            ".git/config.txt",
+            "node_modules/pkg/readme.txt",
+            "env/pyvenv.cfg",
+            "env/lib/site.txt",
+        )
+
+        self.assertEqual(self.walk(extensions=[".txt"]), ["keep.txt"])
+
+    def test_ignore_files(self):
+        """Test .gitignore and .piiignore patterns, including nested ones"""
+        self.make("a.log", "b.txt", "build/out.txt", "sub/c.txt", "sub/d.txt")
+        (self.root / ".gitignore").write_text("# comment\n*.log\nbuild/\n")
+        (self.root / "sub" / ".piiignore").write_text("*.txt\n!d.txt\n")
+
+        self.assertEqual(self.walk(extensions=[".txt", ".log"]), ["b.txt", "sub/d.txt"])
+        self.assertEqual(
+            len(self.walk(extensions=[".txt", ".log"], use_ignore_files=False)), 5
+        )
+
+    def test_anchored_patterns(self):
+        """Test patterns with a slash only match relative to their directory"""
+        self.make("docs/a.txt", "src/docs/b.txt", "src/deep/x/c.txt")
+        (self.root / ".gitignore").write_text("/docs\nsrc/**/c.txt\n")
+
+        self.assertEqual(self.walk(extensions=[".txt"]), ["src/docs/b.txt"])
+
+    def test_exclude_patterns(self):
+        """Test exclude patterns win over ignore file negations"""
+        self.make("a.txt", "fixtures/b.txt", "c.txt")
+        (self.root / ".gitignore").write_text("!c.txt\n")
+
+        self.assertEqual(
+            self.walk(extensions=[".txt"], exclude=["fixtures", "c.txt"]), ["a.txt"]
+        )
+
+    def test_ignore_files_above_root(self):
+        """Test ignore files between the repository top and the root apply"""
+        self.make("sub/a.txt", "sub/b.log")
+        (self.root / ".git").mkdir()
+        (self.root / ".gitignore").write_text("sub/*.log\n")
+
+        walked = [
+            file_path.name
+            for file_path in iter_files(self.root / "sub", extensions=[".txt", ".log"])
+        ]
+        self.assertEqual(walked, ["a.txt"])
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "requires symlinks")
+    def test_symlink_loop(self):
+        """Test a symlink back to an ancestor is not walked again"""
+        self.make("sub/a.txt")
+        try:
+            os.symlink(self.root, self.root / "sub" / "loop")
+        except OSError:
+            self.skipTest("cannot create symlinks")
+
+        self.assertEqual(self.walk(extensions=[".txt"]), ["sub/a.txt"])
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "requires symlinks")
+    def test_symlinked_directories_not_followed(self):
+        """Test a link into the tree neither hides its target from exclude
+        patterns nor is walked in its place"""
+        self.make("real/s.txt", "b.txt")
+        try:
+            os.symlink(self.root / "real", self.root / "a_link")
+        except OSError:
+            self.skipTest("cannot create symlinks")
+
+        self.assertEqual(self.walk(extensions=[".txt"]), ["b.txt", "real/s.txt"])
+        self.assertEqual(self.walk(extensions=[".txt"], exclude=["real/"]), ["b.txt"])
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "requires symlinks")
+    def test_symlink_outside_root(self):
+        """Test a link to a parent directory does not escape the walk root"""
+        self.make("top.txt", "sub/a.txt")
+        try:
+            os.symlink("..", self.root / "sub" / "loop")
+        except OSError:
+            self.skipTest("cannot create symlinks")
+
+        walked = [
+            file_path.relative_to(self.root / "sub").as_posix()
+            for file_path in iter_files(self.root / "sub", extensions=[".txt"])
+        ]
+        self.assertEqual(walked, ["a.txt"])
+
+    def test_streams_before_walk_finishes(self):
+        """Test files are yielded while later directories are still unread"""
+        self.make("a/1.txt", "b/2.txt")
+        walker = iter_files(self.root, extensions=[".txt"])
+
+        self.assertEqual(next(walker).name, "1.txt")
+        shutil.rmtree(self.root / "b")
+        self.assertEqual(list(walker), [])
+
+
+class TestIsExcluded(unittest.TestCase):
+    """Test cases for matching single paths against exclude patterns"""
+
+    def test_directory_patterns_exclude_contents(self):
+        """Test a pattern naming a directory excludes the files inside it"""
+        self.assertTrue(is_excluded(["fixtures/"], Path("tests/fixtures/a.txt")))
+        self.assertTrue(is_excluded(["*.log"], Path("logs/app.log")))
+        self.assertFalse(is_excluded(["fixtures/"], Path("tests/fixtures.txt")))
+        self.assertFalse(is_excluded([], Path("a.txt")))
+
+
+if __name__ == "__main__":
+    unittest.main()